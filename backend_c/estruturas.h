@@ -7,6 +7,7 @@
 #include <ctype.h> 
 #include <errno.h> 
 #include <stddef.h> // Para size_t
+#include <stdint.h> // Para os inteiros de tamanho fixo do cabeçalho binário
 
 // --- Headers condicionais para gerenciamento de diretórios ---
 #ifdef _WIN32
@@ -45,6 +46,20 @@
 #define PASTA_DADOS "dados/"
 #define TAMANHO_CAMINHO 256
 
+// --- Formato binário opcional (.bin ao lado de cada .csv) ---
+// Cabeçalho de 16 bytes seguido dos structs gravados exatamente como estão na memória.
+// Lido pelo frontend Python via mmap (frontend_python/formato_binario.py).
+#define EXPORTAR_BINARIO 1 // 0 desativa a gravação dos arquivos .bin
+#define MAGICO_BINARIO "PIMB"
+#define VERSAO_BINARIO 1
+
+#define REGISTRO_ALUNO 1
+#define REGISTRO_PROFESSOR 2
+#define REGISTRO_TURMA 3
+#define REGISTRO_ATIVIDADE 4
+#define REGISTRO_MATRICULA 5
+#define REGISTRO_NOTA 6
+
 
 // =================================================================
 // --- 2. ESTRUTURAS DE DADOS (STRUCTS) ---
@@ -95,6 +110,15 @@ typedef struct {
     float nota;
 } Nota;
 
+// Cabeçalho dos arquivos .bin (16 bytes, little-endian na prática)
+typedef struct {
+    char magico[4];            // "PIMB"
+    uint16_t versao;           // VERSAO_BINARIO
+    uint16_t tipo_registro;    // REGISTRO_*
+    uint32_t tamanho_registro; // sizeof do struct
+    uint32_t num_registros;
+} CabecalhoBinario;
+
 // Struct para o Usuário/Admin
 typedef struct {
     int id;
@@ -137,6 +161,7 @@ extern Usuario admin_master;
 void limpa_buffer();
 int obter_proximo_id(const char *nome_arquivo, size_t tamanho_struct);
 int salvar_dados_csv(const char *nome_arquivo, const void *dados, int num_registros, size_t tamanho_struct, int tipo_acesso);
+int salvar_dados_binario(const char *nome_arquivo, const void *dados, int num_registros, size_t tamanho_struct);
 int carregar_dados_csv();
 void liberar_memoria();
 void inicializar_sistema(); 
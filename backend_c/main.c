@@ -219,6 +219,57 @@ int salvar_dados_csv(const char *nome_arquivo, const void *dados, int num_regist
     }
     
     fclose(f);
+
+#if EXPORTAR_BINARIO
+    // O .bin é gravado DEPOIS do CSV: assim ele nunca é mais antigo que o CSV que representa
+    salvar_dados_binario(nome_arquivo, dados, num_registros, tamanho_struct);
+#endif
+    return 1;
+}
+
+static int tipo_registro_por_arquivo(const char *nome_arquivo) {
+    if (strcmp(nome_arquivo, "alunos.csv") == 0) return REGISTRO_ALUNO;
+    if (strcmp(nome_arquivo, "professores.csv") == 0) return REGISTRO_PROFESSOR;
+    if (strcmp(nome_arquivo, "turmas.csv") == 0) return REGISTRO_TURMA;
+    if (strcmp(nome_arquivo, "atividades.csv") == 0) return REGISTRO_ATIVIDADE;
+    if (strcmp(nome_arquivo, "matriculas.csv") == 0) return REGISTRO_MATRICULA;
+    if (strcmp(nome_arquivo, "notas.csv") == 0) return REGISTRO_NOTA;
+    return 0;
+}
+
+// Grava "<nome>.bin": cabeçalho + os structs como estão na memória (sem conversão para texto)
+int salvar_dados_binario(const char *nome_arquivo, const void *dados, int num_registros, size_t tamanho_struct) {
+    int tipo = tipo_registro_por_arquivo(nome_arquivo);
+    if (tipo == 0) return 0;
+
+    char caminho[TAMANHO_CAMINHO];
+    char caminho_tmp[TAMANHO_CAMINHO + 8];
+    size_t tamanho_base = strlen(nome_arquivo) - strlen(".csv");
+    snprintf(caminho, TAMANHO_CAMINHO, "%s%.*s.bin", PASTA_DADOS, (int)tamanho_base, nome_arquivo);
+    snprintf(caminho_tmp, sizeof(caminho_tmp), "%s.tmp", caminho);
+
+    CabecalhoBinario cabecalho;
+    memcpy(cabecalho.magico, MAGICO_BINARIO, 4);
+    cabecalho.versao = VERSAO_BINARIO;
+    cabecalho.tipo_registro = (uint16_t)tipo;
+    cabecalho.tamanho_registro = (uint32_t)tamanho_struct;
+    cabecalho.num_registros = (uint32_t)num_registros;
+
+    FILE *f = fopen(caminho_tmp, "wb");
+    if (!f) return 0;
+    int ok = fwrite(&cabecalho, sizeof(cabecalho), 1, f) == 1
+        && (num_registros == 0 || fwrite(dados, tamanho_struct, (size_t)num_registros, f) == (size_t)num_registros);
+    fclose(f);
+
+    // Troca pelo arquivo temporário: o leitor nunca vê um .bin pela metade
+#ifdef _WIN32
+    remove(caminho); // No Windows, rename() não substitui um arquivo existente
+#endif
+    if (!ok || rename(caminho_tmp, caminho) != 0) {
+        remove(caminho_tmp);
+        printf("⚠️ Falha ao gravar %s (o CSV foi salvo normalmente).\n", caminho);
+        return 0;
+    }
     return 1;
 }
 
@@ -1,26 +1,25 @@
 import os
 from dotenv import load_dotenv
-import re
+import time
+import hashlib
+import sqlite3
+import threading
 from typing import Dict, Any, Optional, Union, Callable
 from decimal import Decimal, InvalidOperation
 
+from dados_relatorio import (
+    DadosRelatorio, DadosRelatorioAdmin, DadosRelatorioAluno, DadosRelatorioProfessor, texto_para_ia,
+)
+
 # =================================================================
 # --- CARREGAR VARIÁVEIS DE AMBIENTE ---
 # =================================================================
 load_dotenv()  
 
-# Importação condicional e mock para robustez
-try:
-    from google import genai
-    from google.genai import types
-    from google.genai.client import Client as GeminiClient
-    from google.genai.errors import APIError
-except ImportError:
-    genai = None
-    types = None
-    # Define o mock da classe
-    GeminiClient = Any 
-    APIError = type('APIError', (Exception,), {}) 
+# O SDK google.genai é importado apenas quando o cliente é criado (ver obter_cliente_gemini):
+# o import é pesado e não deve atrasar a abertura da interface.
+types = None
+APIError = type('APIError', (Exception,), {})  # Substituída pela classe do SDK quando ele é carregado
 
 # =================================================================
 # --- CONFIGURAÇÕES E CONSTANTES ---
@@ -29,6 +28,21 @@ except ImportError:
 # 🚨 CHAVE DE API 🚨
 API_KEY = os.environ.get("GEMINI_API_KEY", "PLACEHOLDER_NOT_FOUND")
 
+# Modelo e temperatura usados na chamada (também fazem parte da chave do cache)
+MODELO_GEMINI = 'gemini-2.5-flash'
+TEMPERATURA_GEMINI = 0.1 # Temperatura baixa para resultados mais factuais e menos criativos
+
+# Cache persistente de relatórios (SQLite), endereçado pelo conteúdo da requisição.
+# Entradas expiram após o TTL; acima do limite, as menos usadas recentemente saem primeiro.
+DIRETORIO_AI_MODULE = os.path.dirname(os.path.abspath(__file__))
+CAMINHO_CACHE_RELATORIOS = os.environ.get(
+    "CACHE_RELATORIOS_IA",
+    os.path.normpath(os.path.join(DIRETORIO_AI_MODULE, '..', 'backend_c', 'dados', '.cache', 'relatorios_ia.sqlite3'))
+)
+TTL_CACHE_RELATORIOS_S = 7 * 24 * 3600   # 7 dias
+MAX_ENTRADAS_CACHE_RELATORIOS = 500
+VERSAO_MOTOR_MANUAL = 3  # Incrementar ao mudar as regras do relatório offline (invalida o cache)
+
 # Constantes para a lógica da IA Manual (Offline)
 LIMITE_ALERTA = 6.0              # Notas abaixo disso indicam risco de reprovação
 LIMITE_MARGINAL = 7.0            # Notas entre 6.0 e 7.0 precisam de consolidação
@@ -37,52 +51,50 @@ LIMITE_DESTAQUE = 9.0            # Nota acima disso é excelência (Melhorado de
 LIMITE_EVASAO_ALERTA_MONITOR = 0.08 # 8% - Monitoramento Necessário
 LIMITE_EVASAO_ALERTA_CRISE = 0.15    # 15% - Crise de Retenção
 
-# --- Inicialização do Cliente Gemini ---
-CLIENTE_GEMINI: Optional['GeminiClient'] = None  # type: ignore
+# --- Inicialização do Cliente Gemini (sob demanda) ---
+CLIENTE_GEMINI: Optional[Any] = None
+_CLIENTE_INICIALIZADO = False
+_TRAVA_CLIENTE = threading.Lock()
 
-# Verifica se a biblioteca está instalada e se a chave NÃO é o placeholder
-if genai and API_KEY and API_KEY != "PLACEHOLDER_NOT_FOUND":
-    try:
-        CLIENTE_GEMINI = genai.Client(api_key=API_KEY)
-        # print("INFO: Cliente Gemini inicializado com sucesso. Modo ONLINE ativo.")
-    except Exception as e:
-        # print(f"ERRO ao inicializar o cliente Gemini com a chave fornecida: {e}")
-        CLIENTE_GEMINI = None
-# elif API_KEY == "PLACEHOLDER_NOT_FOUND":
-#     print("AVISO: Variável de ambiente GEMINI_API_KEY não encontrada (Verifique o .env). Apenas o motor manual estará disponível.")
-# elif not genai:
-#     print("AVISO: Biblioteca Google GenAI (google-genai) não encontrada. Apenas o motor manual estará disponível.")
+
+def obter_cliente_gemini() -> Optional[Any]:
+    """
+    Importa o SDK e cria o cliente na primeira chamada (thread-safe). Retorna None
+    (modo manual) sem chave configurada, sem a biblioteca ou se a criação falhar.
+    """
+    global CLIENTE_GEMINI, _CLIENTE_INICIALIZADO, types, APIError
+    if _CLIENTE_INICIALIZADO:
+        return CLIENTE_GEMINI
+    with _TRAVA_CLIENTE:
+        if _CLIENTE_INICIALIZADO:
+            return CLIENTE_GEMINI
+        # Verifica se a chave NÃO é o placeholder antes de carregar a biblioteca
+        if API_KEY and API_KEY != "PLACEHOLDER_NOT_FOUND":
+            try:
+                from google import genai
+                from google.genai import types as tipos_genai
+                from google.genai.errors import APIError as ErroApiGenai
+                CLIENTE_GEMINI = genai.Client(api_key=API_KEY)
+                types, APIError = tipos_genai, ErroApiGenai
+            except Exception:
+                # Biblioteca ausente (ImportError) ou chave rejeitada: apenas o motor manual
+                CLIENTE_GEMINI = None
+        _CLIENTE_INICIALIZADO = True
+    return CLIENTE_GEMINI
 
 
 # =================================================================
 # --- FUNÇÕES DE IA MANUAL (OFFLINE) ---
 # =================================================================
 
-def _analisar_dados_aluno(dados_para_ia: str) -> str:
+def _analisar_dados_aluno(dados_para_ia: Union[DadosRelatorioAluno, str]) -> str:
     """
-    Analisa a string de dados do aluno e gera o resumo com base nas regras (Melhorado).
+    Analisa as médias do aluno e gera o resumo com base nas regras (Melhorado).
     """
-    linhas = dados_para_ia.strip().split('\n')
-    notas: Dict[str, float] = {}
-
-    regex_nota = re.compile(r'([^:]+):\s*([\d\.\,]+)') 
-    
-    # 1. Parsing dos dados (DISCIPLINA: NOTA)
-    for linha in linhas:
-        if 'RELATORIO_NOTAS:' in linha:
-            continue
-            
-        match = regex_nota.search(linha)
-        if match:
-            disciplina, nota_str = match.groups()
-            disciplina = disciplina.strip()
-            
-            try:
-                # Converte para float, garantindo que vírgulas sejam pontos
-                nota = float(nota_str.replace(',', '.').strip())
-                notas[disciplina] = nota
-            except ValueError:
-                pass # Ignora notas inválidas
+    if isinstance(dados_para_ia, str):
+        dados_para_ia = DadosRelatorioAluno.de_texto(dados_para_ia)
+    # Disciplina repetida: vale a última média, como no texto "DISCIPLINA: NOTA"
+    notas: Dict[str, float] = dict(dados_para_ia.notas)
 
     if not notas:
         return "**Relatório de Aluno:** Não foram encontradas notas válidas para análise."
@@ -143,37 +155,16 @@ def _analisar_dados_aluno(dados_para_ia: str) -> str:
         
     return "\n".join(relatorio)
 
-def _analisar_dados_professor(dados_para_ia: str) -> str:
+def _analisar_dados_professor(dados_para_ia: Union[DadosRelatorioProfessor, str]) -> str:
     """
-    Analisa dados de professor com parsing mais robusto para média e desvio padrão.
+    Analisa média e desvio padrão das turmas do professor e a distribuição das notas por atividade.
     """
-    
-    # 1. BUSCA E TRATAMENTO DA MÉDIA DA TURMA
-    match_media = re.search(r'Media_Turma:\s*([\d\.\,]+)', dados_para_ia)
-    media_turma = 0.0
-    if match_media:
-        try:
-            # Substitui vírgula por ponto (caso venha no formato brasileiro) e converte para float
-            media_turma = float(match_media.group(1).replace(',', '.'))
-        except ValueError:
-             # Se a conversão falhar, mantém 0.0
-             pass 
-
-    # 2. BUSCA E TRATAMENTO DO DESVIO PADRÃO
-    match_desvio_padrao = re.search(r'Desvio_Padrao:\s*([\d\.\,]+)', dados_para_ia)
-    desvio_padrao = 0.0
-    if match_desvio_padrao:
-        try:
-            desvio_padrao = float(match_desvio_padrao.group(1).replace(',', '.'))
-        except ValueError:
-            # Se a conversão falhar, mantém 0.0
-            pass 
-
-    # 3. BUSCA DO TOTAL DE TURMAS
-    match_turmas = re.search(r'Total_Turmas:\s*(\d+)', dados_para_ia)
-    total_turmas = int(match_turmas.group(1)) if match_turmas else 0
-    
-    
+    if isinstance(dados_para_ia, str):
+        dados_para_ia = DadosRelatorioProfessor.de_texto(dados_para_ia)
+    media_turma = dados_para_ia.media_turma
+    desvio_padrao = dados_para_ia.desvio_padrao
+    total_turmas = dados_para_ia.total_turmas or 0
+
     # 4. LÓGICA DE ANÁLISE 
     
     # Ajustando limites para consistência com o restante do código
@@ -198,6 +189,21 @@ def _analisar_dados_professor(dados_para_ia: str) -> str:
     else:
         alerta_variacao = "Variação normal."
 
+    # 5. Distribuição por atividade (entregas faltantes e menor mediana)
+    analise_atividades = ""
+    recomendacoes_atividades = ""
+    pendentes = [a for a in dados_para_ia.atividades if a.faltantes > 0]
+    if pendentes:
+        lista = "; ".join(f"{a.nome} ({a.disciplina}): {a.faltantes}" for a in pendentes)
+        analise_atividades += f" * **Notas Não Lançadas:** {sum(a.faltantes for a in pendentes)} em {len(pendentes)} atividade(s) - {lista}.\n"
+        recomendacoes_atividades += " * Lançar as notas pendentes ou acompanhar os alunos sem entrega.\n"
+    com_notas = [a for a in dados_para_ia.atividades if a.mediana is not None]
+    if com_notas:
+        critica = min(com_notas, key=lambda a: a.mediana)
+        analise_atividades += (f" * **Atividade com Menor Mediana:** {critica.nome} ({critica.disciplina}) - "
+                               f"mediana {critica.mediana:.2f} (Q1 {critica.q1:.2f}, Q3 {critica.q3:.2f}).\n")
+        if critica.mediana < LIMITE_ALERTA:
+            recomendacoes_atividades += f" * Revisar conteúdo e critérios de '{critica.nome}': metade das notas ficou abaixo de {LIMITE_ALERTA:.1f}.\n"
             
     resumo_analise = (
         f"**VISÃO GERAL DO PROFESSOR:**\n"
@@ -206,50 +212,45 @@ def _analisar_dados_professor(dados_para_ia: str) -> str:
         f" * **Variação (Desvio Padrão):** {desvio_padrao:.2f}\n"
         f" * **Análise de Média:** {alerta_media}\n"
         f" * **Análise de Variação:** {alerta_variacao}\n"
+        f"{analise_atividades}"
         f"\n**RECOMENDAÇÕES:**\n"
+        f"{recomendacoes_atividades}"
         f" * Focar em atividades de recuperação para o quartil de baixo desempenho.\n"
         f" * Promover a troca de boas práticas com professores de turmas de alto desempenho."
     )
     return resumo_analise
 
-def _analisar_dados_admin(dados_para_ia: str) -> str:
+def _analisar_dados_admin(dados_para_ia: Union[DadosRelatorioAdmin, str]) -> str:
     """
     Analisa dados de administrador (placeholder) com base em regras (Melhorado).
     """
+    if isinstance(dados_para_ia, str):
+        dados_para_ia = DadosRelatorioAdmin.de_texto(dados_para_ia)
     
     # Constantes 
     LIMITE_EVASAO_ALERTA_CRISE = 0.15
     LIMITE_EVASAO_ALERTA_MONITOR = 0.08
     
-    # 1. Busca de Taxa de Evasão 
-    match_evasao = re.search(r'Taxa_Evasao_Ultimo_Semestre:\s*([\d\.]+)', dados_para_ia)
-    taxa_evasao_float = 0.0
+    # 1. Taxa de Evasão (coorte do semestre mais recente já medido)
+    taxa_evasao_float = dados_para_ia.taxa_evasao
     taxa_evasao = 'N/A'
-    alerta_evasao = "KPIs de retenção em controle."
+    rotulo_evasao = 'N/A'
+    alerta_evasao = "Evasão ainda não mensurável: não há matrículas em um semestre seguinte."
     
-    if match_evasao:
-        try:
-            taxa_evasao_float = float(match_evasao.group(1)) 
-            taxa_evasao = f"{taxa_evasao_float * 100:.2f}%"
-            
-            if taxa_evasao_float > LIMITE_EVASAO_ALERTA_CRISE:
-                alerta_evasao = f"**ALERTA DE CRISE DE RETENÇÃO!** Evasão ({taxa_evasao}) acima de {LIMITE_EVASAO_ALERTA_CRISE * 100:.0f}%."
-            elif taxa_evasao_float > LIMITE_EVASAO_ALERTA_MONITOR:
-                alerta_evasao = f"**ALERTA DE MONITORAMENTO!** Evasão ({taxa_evasao}) acima do limite de {LIMITE_EVASAO_ALERTA_MONITOR * 100:.0f}%."
-                
-        except ValueError:
-            pass 
-
-    # 2. Busca de Totais Administrativos 
-    
-    # Função auxiliar para busca segura de inteiros
-    def buscar_total(chave: str, dados: str) -> int:
-        match = re.search(rf'{chave}:\s*(\d+)', dados)
-        return int(match.group(1)) if match else 0
+    if taxa_evasao_float is not None:
+        taxa_evasao = f"{taxa_evasao_float * 100:.2f}%"
+        rotulo_evasao = taxa_evasao if dados_para_ia.semestre_evasao is None else f"{taxa_evasao} (coorte {dados_para_ia.semestre_evasao})"
+        alerta_evasao = "KPIs de retenção em controle."
+        
+        if taxa_evasao_float > LIMITE_EVASAO_ALERTA_CRISE:
+            alerta_evasao = f"**ALERTA DE CRISE DE RETENÇÃO!** Evasão ({taxa_evasao}) acima de {LIMITE_EVASAO_ALERTA_CRISE * 100:.0f}%."
+        elif taxa_evasao_float > LIMITE_EVASAO_ALERTA_MONITOR:
+            alerta_evasao = f"**ALERTA DE MONITORAMENTO!** Evasão ({taxa_evasao}) acima do limite de {LIMITE_EVASAO_ALERTA_MONITOR * 100:.0f}%."
 
-    total_alunos = buscar_total('Total_Alunos', dados_para_ia)
-    total_professores = buscar_total('Total_Professores', dados_para_ia)
-    total_turmas = buscar_total('Total_Turmas', dados_para_ia)
+    # 2. Totais Administrativos 
+    total_alunos = dados_para_ia.total_alunos
+    total_professores = dados_para_ia.total_professores
+    total_turmas = dados_para_ia.total_turmas
 
     # 3. Geração do Relatório 
     resumo_analise = (
@@ -257,7 +258,7 @@ def _analisar_dados_admin(dados_para_ia: str) -> str:
         f" * **Total de Alunos:** {total_alunos}\n"
         f" * **Total de Professores:** {total_professores}\n"
         f" * **Total de Turmas:** {total_turmas}\n"
-        f" * **Taxa de Evasão Semestral:** {taxa_evasao}\n"
+        f" * **Taxa de Evasão Semestral:** {rotulo_evasao}\n"
         f" * **Status de Retenção:** {alerta_evasao}\n"
         f"\n**RECOMENDAÇÕES:**\n"
         f" * Investigar a correlação entre as disciplinas com menor média geral e os dados de evasão.\n"
@@ -265,15 +266,16 @@ def _analisar_dados_admin(dados_para_ia: str) -> str:
     )
     return resumo_analise
 
-def gerar_relatorio_manual(nome_usuario: str, dados_para_ia: str, tipo_usuario: str) -> str:
+def gerar_relatorio_manual(nome_usuario: str, dados_para_ia: Union[DadosRelatorio, str], tipo_usuario: str) -> str:
     """
     Motor de Análise de IA Manual/Offline. Implementa a lógica de regras para diferentes usuários.
+    Os analisadores leem os objetos de dados_relatorio diretamente (texto no formato antigo também é aceito).
     """
     
     tipo_usuario = tipo_usuario.lower()
     
     # Mapeamento para evitar grandes blocos if/elif
-    analisadores: Dict[str, Callable[[str], str]] = {
+    analisadores: Dict[str, Callable[[Any], str]] = {
         'aluno': _analisar_dados_aluno,
         'professor': _analisar_dados_professor,
         'admin': _analisar_dados_admin
@@ -293,20 +295,113 @@ def gerar_relatorio_manual(nome_usuario: str, dados_para_ia: str, tipo_usuario:
         f"{resumo_analise}\n"
     )
 
+# =================================================================
+# --- CACHE DE RELATÓRIOS (SQLite com TTL e LRU) ---
+# =================================================================
+
+def _chave_cache(*partes: Any) -> str:
+    """SHA-256 das partes que determinam o relatório (modo, modelo, prompt, dados...)."""
+    sha = hashlib.sha256()
+    for parte in partes:
+        sha.update(str(parte).encode('utf-8'))
+        sha.update(b'\x1f')  # Separador: evita colisões entre partes concatenadas
+    return sha.hexdigest()
+
+
+def _conectar_cache() -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(CAMINHO_CACHE_RELATORIOS), exist_ok=True)
+    conexao = sqlite3.connect(CAMINHO_CACHE_RELATORIOS, timeout=5)
+    conexao.execute(
+        "CREATE TABLE IF NOT EXISTS relatorios ("
+        " chave TEXT PRIMARY KEY, relatorio TEXT NOT NULL, criado_em REAL NOT NULL, acessado_em REAL NOT NULL)"
+    )
+    conexao.execute("CREATE INDEX IF NOT EXISTS idx_relatorios_acesso ON relatorios (acessado_em)")
+    return conexao
+
+
+def _ler_cache(chave: str) -> Optional[str]:
+    """Retorna o relatório guardado (se ainda válido) e marca o acesso para o LRU."""
+    agora = time.time()
+    try:
+        conexao = _conectar_cache()
+        try:
+            with conexao:
+                linha = conexao.execute(
+                    "SELECT relatorio FROM relatorios WHERE chave = ? AND criado_em >= ?",
+                    (chave, agora - TTL_CACHE_RELATORIOS_S)
+                ).fetchone()
+                if linha is not None:
+                    conexao.execute("UPDATE relatorios SET acessado_em = ? WHERE chave = ?", (agora, chave))
+        finally:
+            conexao.close()
+    except (sqlite3.Error, OSError):
+        return None  # Cache indisponível: segue sem cache
+    return linha[0] if linha is not None else None
+
+
+def _gravar_cache(chave: str, relatorio: str) -> None:
+    """Guarda o relatório e remove entradas expiradas e excedentes (menos usadas primeiro)."""
+    agora = time.time()
+    try:
+        conexao = _conectar_cache()
+        try:
+            with conexao:
+                conexao.execute(
+                    "INSERT OR REPLACE INTO relatorios (chave, relatorio, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                    (chave, relatorio, agora, agora)
+                )
+                conexao.execute("DELETE FROM relatorios WHERE criado_em < ?", (agora - TTL_CACHE_RELATORIOS_S,))
+                conexao.execute(
+                    "DELETE FROM relatorios WHERE chave IN ("
+                    " SELECT chave FROM relatorios ORDER BY acessado_em DESC LIMIT -1 OFFSET ?)",
+                    (MAX_ENTRADAS_CACHE_RELATORIOS,)
+                )
+        finally:
+            conexao.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def limpar_cache_relatorios() -> None:
+    """Apaga todos os relatórios guardados."""
+    try:
+        conexao = _conectar_cache()
+        try:
+            with conexao:
+                conexao.execute("DELETE FROM relatorios")
+        finally:
+            conexao.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def _gerar_relatorio_manual_com_cache(nome_usuario: str, dados_para_ia: Union[DadosRelatorio, str], tipo_usuario: str) -> str:
+    # repr() do objeto (ou o próprio texto) identifica os dados sem gerar o texto do prompt
+    chave = _chave_cache('manual', VERSAO_MOTOR_MANUAL, nome_usuario, tipo_usuario.lower(), repr(dados_para_ia))
+    relatorio = _ler_cache(chave)
+    if relatorio is None:
+        relatorio = gerar_relatorio_manual(nome_usuario, dados_para_ia, tipo_usuario)
+        _gravar_cache(chave, relatorio)
+    return relatorio
+
 # =================================================================
 # --- FUNÇÃO PRINCIPAL (API ou Manual) ---
 # =================================================================
 
-def gerar_relatorio_ia(nome_usuario: str, dados_para_ia: str, tipo_usuario: str) -> str:
+def gerar_relatorio_ia(nome_usuario: str, dados_para_ia: Union[DadosRelatorio, str], tipo_usuario: str,
+                       aguardar_vez: Optional[Callable[[], None]] = None) -> str:
     """
     Gera um relatório de análise de dados. Tenta usar o modelo Gemini e, 
     em caso de falha de inicialização ou indisponibilidade, usa o motor manual.
+    `aguardar_vez`, se informado, é chamado logo antes de cada requisição à API
+    (ex: limitador de taxa da geração em lote); acertos no cache não o acionam.
     """
 
     # 1. VERIFICAÇÃO INICIAL (Chave inválida, biblioteca ausente ou erro de inicialização)
-    if CLIENTE_GEMINI is None:
+    cliente = obter_cliente_gemini()
+    if cliente is None:
         # print("INFO: Cliente Gemini não disponível ou chave não configurada. Gerando relatório manualmente (OFFLINE).")
-        return gerar_relatorio_manual(nome_usuario, dados_para_ia, tipo_usuario)
+        return _gerar_relatorio_manual_com_cache(nome_usuario, dados_para_ia, tipo_usuario)
 
     # --- Construção do Prompt ---
     
@@ -339,18 +434,26 @@ def gerar_relatorio_ia(nome_usuario: str, dados_para_ia: str, tipo_usuario: str)
 {contexto}
 
 --- DADOS ACADÊMICOS BRUTOS PARA ANÁLISE ---
-{dados_para_ia}
+{texto_para_ia(dados_para_ia)}
 """
 
+    # Mesmo prompt, modelo e temperatura => mesmo relatório: evita uma nova chamada à API
+    chave_cache = _chave_cache('gemini', MODELO_GEMINI, TEMPERATURA_GEMINI, prompt)
+    relatorio_em_cache = _ler_cache(chave_cache)
+    if relatorio_em_cache is not None:
+        return relatorio_em_cache
+
     # --- Chamada à API (com Fallback em caso de erro de rede ou API) ---
     try:
+        if aguardar_vez is not None:
+            aguardar_vez()
         # print(f"INFO: Tentando gerar relatório via API Gemini (ONLINE)...")
         # Define o modelo e faz a chamada
-        response = CLIENTE_GEMINI.models.generate_content(
-            model='gemini-2.5-flash',
+        response = cliente.models.generate_content(
+            model=MODELO_GEMINI,
             contents=prompt,
             config=types.GenerateContentConfig(
-                temperature=0.1, # Temperatura baixa para resultados mais factuais e menos criativos
+                temperature=TEMPERATURA_GEMINI,
             )
         )
         
@@ -364,21 +467,24 @@ def gerar_relatorio_ia(nome_usuario: str, dados_para_ia: str, tipo_usuario: str)
             # Tenta encontrar a primeira ocorrência do cabeçalho obrigatório para garantir o início limpo
             relatorio_limpo = relatorio_limpo[format_index:].strip()
 
-        return (
+        relatorio = (
             f"--- RELATÓRIO DE ANÁLISE DE DADOS PARA {nome_usuario} ({tipo_usuario.upper()}) ---\n"
             f"***Este relatório foi gerado ONLINE pelo modelo Gemini-2.5-Flash.***\n\n"
             f"{relatorio_limpo}"
         )
+        _gravar_cache(chave_cache, relatorio)
+        return relatorio
     
     except APIError as e:
         # 2. FALLBACK: ERRO NA API
         # print(f"ALERTA: Erro na API Gemini. Detalhes: {e}. Executando fallback manual...")
-        return gerar_relatorio_manual(nome_usuario, dados_para_ia, tipo_usuario)
+        return _gerar_relatorio_manual_com_cache(nome_usuario, dados_para_ia, tipo_usuario)
         
     except Exception as e:
         # 3. FALLBACK: ERRO DE CONEXÃO ou OUTROS ERROS
         # print(f"ALERTA: Erro desconhecido (provavelmente de conexão/rede): {e}. Executando fallback manual...")
-        return gerar_relatorio_manual(nome_usuario, dados_para_ia, tipo_usuario)
+        # O fallback fica no cache apenas com a chave do modo manual: a próxima chamada tenta a API de novo
+        return _gerar_relatorio_manual_com_cache(nome_usuario, dados_para_ia, tipo_usuario)
 
 # =================================================================
 # --- EXEMPLO DE USO ---
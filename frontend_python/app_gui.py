@@ -1,12 +1,28 @@
+from __future__ import annotations # Anotações como texto: pd.DataFrame não dispara o import do pandas
+
+from carregamento_tardio import ModuloTardio, aquecer, marcar, relatorio_inicializacao
 import customtkinter as ctk
-from data_manager import get_dados_academicos, preparar_dados_para_ia
-from ai_module import gerar_relatorio_ia
-import pandas as pd
-from fpdf import FPDF
+from tkinter import filedialog
+from tarefas_ia import ExecutorTarefasIA, TarefaIA, ESTADO_CONCLUIDA, ESTADO_CANCELADA
+from dados_relatorio import DadosRelatorio, eh_dado_insuficiente
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from typing import Optional, Dict, Any, Tuple 
+from typing import Optional, Dict, Any, Callable, Tuple, Union
+
+# --- Módulos pesados: importados no primeiro uso (ou pelo aquecimento após a janela abrir) ---
+pd = ModuloTardio('pandas')
+data_manager = ModuloTardio('data_manager')
+ai_module = ModuloTardio('ai_module')
+tabela_virtual = ModuloTardio('tabela_virtual')
+importar_notas = ModuloTardio('importar_notas')
+relatorio_pdf = ModuloTardio('relatorio_pdf')
+graficos = ModuloTardio('graficos')
+motor_regras = ModuloTardio('motor_regras')
+
+# Ordem do aquecimento: dependências primeiro (o import de cada módulo é medido separadamente)
+MODULOS_AQUECIMENTO = (
+    'pandas', 'data_manager', 'matplotlib.figure', 'matplotlib.backends.backend_tkagg', 'graficos',
+    'tabela_virtual', 'importar_notas', 'fpdf', 'relatorio_pdf', 'ai_module', 'motor_regras',
+)
 
 # --- Configurações Iniciais do CTk ---
 ctk.set_appearance_mode("System")
@@ -20,6 +36,13 @@ ERROR_RED = "#DC143C"
 SUCCESS_GREEN = "#28a745"
 DARK_GRAY = "#333333"
 
+# Intervalo em que a tela aberta verifica se os CSVs foram recarregados
+INTERVALO_ATUALIZACAO_TELA_MS = 1000
+# Intervalo de consulta das análises de IA em segundo plano
+INTERVALO_ACOMPANHAMENTO_IA_MS = 200
+# Quantidade de análises de IA mantidas na barra lateral (as finalizadas mais antigas saem)
+MAX_TAREFAS_PAINEL = 5
+
 # =================================================================
 # --- CLASSE 1: App (Janela Principal) ---
 # =================================================================
@@ -41,6 +64,26 @@ class App(ctk.CTk):
         self.login_frame = LoginFrame(self, self.callback_login_sucesso)
         self.login_frame.grid(row=0, column=0, sticky="nsew")
 
+        # O aquecimento começa quando a janela aparece (o <Map> da raiz dispara também para os filhos)
+        self._aquecimento_iniciado = False
+        self.bind("<Map>", self._ao_exibir_janela, add="+")
+
+    def _ao_exibir_janela(self, event=None):
+        if self._aquecimento_iniciado:
+            return
+        self._aquecimento_iniciado = True
+        marcar('janela de login visível')
+        aquecer(
+            MODULOS_AQUECIMENTO,
+            tarefas=[
+                ('dados acadêmicos', lambda: data_manager.carregar_dados_academicos()),
+                # Recarrega os CSVs alterados pelo backend C sem reiniciar a aplicação
+                ('monitoramento dos CSVs', lambda: data_manager.iniciar_monitoramento_dados()),
+                ('cliente Gemini', lambda: ai_module.obter_cliente_gemini()),
+            ],
+            ao_concluir=lambda: print(relatorio_inicializacao()),
+        )
+
     def callback_login_sucesso(self, id_usuario, nivel, dados):
         """Callback chamado após a autenticação bem-sucedida."""
         self.id_usuario = id_usuario
@@ -131,7 +174,8 @@ class LoginFrame(ctk.CTkFrame):
             )
             return
 
-        from data_manager import autenticar_usuario, DADOS_ACADEMICOS, USUARIOS_CREDENCIAS
+        import data_manager
+        from data_manager import autenticar_usuario
 
         self.info_label.configure(text="Verificando credenciais...", text_color=DARK_GRAY)
         self.master_app.update_idletasks()
@@ -141,9 +185,10 @@ class LoginFrame(ctk.CTkFrame):
 
             if resultado_auth is None:
                 # Diagnóstico detalhado
-                if not DADOS_ACADEMICOS:
+                # Lidos do módulo após a autenticação (as globais são recriadas na carga)
+                if not data_manager.DADOS_ACADEMICOS:
                     msg = "⚠️ Nenhum dado foi carregado. Verifique os arquivos CSV."
-                elif not any(USUARIOS_CREDENCIAS.values()):
+                elif not data_manager.INDICE_LOGIN:
                     msg = "⚠️ Nenhum usuário encontrado nos dados carregados."
                 else:
                     msg = "❌ Login ou senha incorretos."
@@ -152,7 +197,7 @@ class LoginFrame(ctk.CTkFrame):
 
             # Desempacota o retorno
             tipo_usuario, id_usuario, nome_usuario = resultado_auth
-            dados = get_dados_academicos()
+            dados = data_manager.get_dados_academicos()
 
             # Verifica o nível de acesso (o tipo_usuario retornado DEVE ser o singular ('aluno', 'professor', 'admin'))
             if tipo_usuario != tipo_selecionado:
@@ -191,16 +236,35 @@ class MainFrame(ctk.CTkFrame):
     def __init__(self, master, id_usuario, nivel_acesso, dados, callback_logout):
         super().__init__(master, fg_color=LIGHT_GRAY_BG)
         self.id_usuario = id_usuario
+        self.id_numerico = data_manager.converter_id(id_usuario) # IDs nas tabelas já são inteiros (esquema do data_manager)
         self.nivel_acesso = nivel_acesso
         self.dados = dados
+        self.indice = data_manager.get_indice_academico() # Buscas O(1) por ID (evita varrer DataFrames inteiros)
+        self.visao_notas = data_manager.get_visao_notas() # Médias ponderadas já calculadas no carregamento
         self.callback_logout = callback_logout
         self.grafico_canvas = None 
+        self.graficos = graficos.GerenciadorGraficos() # Uma figura por painel, reutilizada entre visitas
         self.content_container_table = None 
 
+        # Tela atual (função, argumentos), redesenhada quando os dados são recarregados
+        self._visao_atual = None
+        self._versao_dados = data_manager.get_versao_dados()
+        self._id_verificacao_dados = self.after(INTERVALO_ATUALIZACAO_TELA_MS, self._verificar_dados_atualizados)
+
+        # Resultados já calculados nesta sessão: (consulta, usuário, versão dos dados) -> resultado
+        self._resultados_sessao: Dict[Tuple[str, Any, int], Any] = {}
+
         # Variáveis de Estado para IA/PDF
         self.last_ia_report_name = ""
         self.last_ia_report_data = ""
         self.last_ia_report_type = ""
+
+        # Análises de IA rodam em threads; a tela acompanha via after()
+        self.tarefas_ia = ExecutorTarefasIA()
+        self._tarefa_exibida: Optional[TarefaIA] = None
+        self._status_tarefa_label = None
+        self._entradas_tarefas: Dict[int, Tuple[TarefaIA, Any]] = {}
+        self._id_acompanhamento_ia = None
         
         self.grid_columnconfigure(0, weight=0)
         self.grid_columnconfigure(1, weight=1)
@@ -211,15 +275,9 @@ class MainFrame(ctk.CTkFrame):
         self.sidebar_frame.grid(row=0, column=0, sticky="nswe")
         self.sidebar_frame.grid_rowconfigure(7, weight=1)
 
-        # Nome do Usuário na Sidebar
-        nome_display = id_usuario.upper()
-        df_display = self.dados.get(nivel_acesso, pd.DataFrame()) # Busca no df de aluno/professor/admin
-        
+        # Nome do Usuário na Sidebar (busca no índice de aluno/professor/admin)
         # A coluna de Nome é 'Nome' em alunos/admin/professores.
-        if not df_display.empty and 'ID' in df_display.columns and 'Nome' in df_display.columns:
-            user_info = df_display[df_display['ID'].astype(str) == str(self.id_usuario)]
-            if not user_info.empty:
-                nome_display = user_info.iloc[0]['Nome']
+        nome_display = self.indice.nome(nivel_acesso, self.id_numerico, id_usuario.upper())
         
         self.logo_label = ctk.CTkLabel(self.sidebar_frame, text=f"Sistema Acadêmico\n {nome_display}", font=ctk.CTkFont(size=18, weight="bold"), text_color="white")
         self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
@@ -240,6 +298,7 @@ class MainFrame(ctk.CTkFrame):
             ctk.CTkButton(self.sidebar_frame, text="Meus Alunos", command=lambda: self.exibir_dados_prof_detalhado('alunos'), fg_color=LIGHT_GRAY_BG, text_color=DARK_GRAY, font=button_font).grid(row=3, column=0, padx=20, pady=10)
             ctk.CTkButton(self.sidebar_frame, text="Minhas Atividades", command=lambda: self.exibir_dados_prof_detalhado('atividades'), fg_color=LIGHT_GRAY_BG, text_color=DARK_GRAY, font=button_font).grid(row=4, column=0, padx=20, pady=10)
             ctk.CTkButton(self.sidebar_frame, text="Análise Turma (IA)", command=lambda: self.analisar_dados_ia('professor'), fg_color=ERROR_RED, font=button_font).grid(row=5, column=0, padx=20, pady=10)
+            ctk.CTkButton(self.sidebar_frame, text="Importar Notas", command=self.importar_notas_planilha, fg_color=LIGHT_GRAY_BG, text_color=DARK_GRAY, font=button_font).grid(row=6, column=0, padx=20, pady=10)
 
         # Botões de Navegação (Admin)
         elif nivel_acesso == 'admin':
@@ -250,6 +309,11 @@ class MainFrame(ctk.CTkFrame):
             ctk.CTkButton(self.sidebar_frame, text="Análise Geral (IA)", command=lambda: self.analisar_dados_ia('admin'), fg_color=ERROR_RED, font=button_font).grid(row=5, column=0, padx=20, pady=10)
 
 
+        # Lista das análises de IA da sessão (em andamento e concluídas)
+        self.painel_tarefas_ia = ctk.CTkFrame(self.sidebar_frame, fg_color=PRIMARY_BLUE)
+        self.painel_tarefas_ia.grid(row=7, column=0, padx=10, pady=10, sticky="new")
+        self.painel_tarefas_ia.grid_columnconfigure(0, weight=1)
+
         ctk.CTkButton(self.sidebar_frame, text="Sair", command=self.callback_logout, fg_color=ERROR_RED, font=button_font).grid(row=8, column=0, padx=20, pady=(10, 20)) 
 
         # --- Main Content ---
@@ -272,6 +336,8 @@ class MainFrame(ctk.CTkFrame):
     
     def _limpar_container(self):
         """Limpa todos os widgets do content_container e destrói o gráfico."""
+        self._tarefa_exibida = None
+        self._status_tarefa_label = None
         for widget in self.content_container.winfo_children():
             widget.destroy()
         
@@ -281,9 +347,49 @@ class MainFrame(ctk.CTkFrame):
             self.main_content_frame.grid_rowconfigure(2, weight=0) 
 
         if self.grafico_canvas:
-            self.grafico_canvas.get_tk_widget().destroy()
+            self.graficos.remover_widget() # A figura fica com o gerenciador, para reuso
             self.grafico_canvas = None
 
+    def destroy(self):
+        if self._id_verificacao_dados is not None:
+            self.after_cancel(self._id_verificacao_dados)
+            self._id_verificacao_dados = None
+        if self._id_acompanhamento_ia is not None:
+            self.after_cancel(self._id_acompanhamento_ia)
+            self._id_acompanhamento_ia = None
+        self.tarefas_ia.encerrar()
+        self.graficos.fechar()
+        super().destroy()
+
+    def _verificar_dados_atualizados(self):
+        """Troca as referências de dados e redesenha a tela atual após uma recarga a quente."""
+        self._id_verificacao_dados = None
+        versao = data_manager.get_versao_dados()
+        if versao != self._versao_dados:
+            with data_manager.TRAVA_DADOS:  # Versão, tabelas, índice e visão da mesma recarga
+                versao = data_manager.get_versao_dados()
+                self.dados = data_manager.get_dados_academicos()
+                self.indice = data_manager.get_indice_academico()
+                self.visao_notas = data_manager.get_visao_notas()
+            self._versao_dados = versao
+            # Resultados de versões anteriores não valem mais
+            self._resultados_sessao = {chave: valor for chave, valor in self._resultados_sessao.items() if chave[2] == versao}
+            if self._visao_atual is not None:
+                funcao, argumentos = self._visao_atual
+                funcao(*argumentos)
+        self._id_verificacao_dados = self.after(INTERVALO_ATUALIZACAO_TELA_MS, self._verificar_dados_atualizados)
+
+    def _resultado_sessao(self, consulta: str, calcular: Callable[[], Any], versao: Optional[int] = None) -> Any:
+        """
+        Resultado de `calcular` guardado por (consulta, usuário, versão dos dados): navegar
+        entre as telas não refaz o cálculo. Sem `versao`, vale a versão das referências da
+        tela (self.dados/indice/visao_notas). Quem chama não deve alterar o resultado.
+        """
+        chave = (consulta, self.id_numerico, self._versao_dados if versao is None else versao)
+        if chave not in self._resultados_sessao:
+            self._resultados_sessao[chave] = calcular()
+        return self._resultados_sessao[chave]
+
     def _criar_kpi_card_custom(self, frame, label_text, value_text, color=PRIMARY_BLUE):
         """Cria um cartão de KPI."""
         card = ctk.CTkFrame(frame, fg_color=CARD_BG, corner_radius=10, height=80)
@@ -308,48 +414,26 @@ class MainFrame(ctk.CTkFrame):
         return None
     
     def _exibir_tabela_formatada(self, df: pd.DataFrame, title: str, parent_frame: ctk.CTkFrame):
-        """Exibe um DataFrame como uma tabela formatada."""
+        """Exibe um DataFrame como uma tabela paginada (apenas as linhas visíveis são desenhadas)."""
         
         # Limpa o frame de destino (se for o content_container, será limpo antes)
         for widget in parent_frame.winfo_children():
             widget.destroy()
         
-        table_frame = ctk.CTkFrame(parent_frame, fg_color=CARD_BG, corner_radius=10)
-        table_frame.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
+        tabela = tabela_virtual.TabelaVirtual(parent_frame, df, title, cor_titulo=PRIMARY_BLUE, cor_texto=DARK_GRAY, cor_fundo=CARD_BG, cor_alternada=LIGHT_GRAY_BG)
+        tabela.grid(row=0, column=0, padx=10, pady=10, sticky="nsew")
         parent_frame.grid_columnconfigure(0, weight=1) # Faz a tabela se expandir
         parent_frame.grid_rowconfigure(0, weight=1)
 
-        # Título
-        ctk.CTkLabel(table_frame, text=title, font=ctk.CTkFont(size=16, weight="bold"), text_color=PRIMARY_BLUE).grid(row=0, column=0, padx=15, pady=10, sticky="w")
-        
-        if df.empty:
-            ctk.CTkLabel(table_frame, text="Nenhum dado para exibir.", text_color=DARK_GRAY).grid(row=1, column=0, padx=15, pady=10, sticky="w")
-            return
-
-        max_cols = min(len(df.columns), 8) 
-        for j in range(max_cols):
-            table_frame.grid_columnconfigure(j, weight=1)
-
-        # Cabeçalho
-        for j, col_name in enumerate(df.columns[:max_cols]):
-            header = ctk.CTkLabel(table_frame, text=col_name.upper(), font=ctk.CTkFont(size=10, weight="bold"), text_color=DARK_GRAY, fg_color=LIGHT_GRAY_BG, corner_radius=5)
-            header.grid(row=1, column=j, padx=2, pady=2, sticky="ew")
-
-        # Dados
-        for i, row in df.iterrows():
-            for j, value in enumerate(row.iloc[:max_cols]):
-                bg_color = CARD_BG if i % 2 == 0 else LIGHT_GRAY_BG
-                cell = ctk.CTkLabel(table_frame, text=str(value), font=ctk.CTkFont(size=12), text_color=DARK_GRAY, fg_color=bg_color, corner_radius=0)
-                cell.grid(row=i + 2, column=j, padx=2, pady=1, sticky="ew")
-
     def exibir_dados(self, tipo):
         """Função unificada para exibir diferentes tipos de dados em tabela."""
+        self._visao_atual = (self.exibir_dados, (tipo,))
         self._limpar_container()
         dfs = self.dados
         
         # --- LÓGICA DE TURMAS (Professor filtra, Admin vê todas) ---
         if tipo.startswith('turmas') and 'turmas' in dfs:
-            df_turmas_orig = dfs['turmas'].copy()
+            df_turmas_orig = dfs['turmas']
             id_prof_col = 'ID_Professor_Responsavel'
             
             df_display = df_turmas_orig
@@ -360,11 +444,8 @@ class MainFrame(ctk.CTkFrame):
                 self.current_display_label.configure(text="Visualizando: MINHAS TURMAS")
                 
                 if id_prof_col in df_turmas_orig.columns:
-                    # Garante que a coluna ID seja string para comparação 
-                    df_turmas_orig[id_prof_col] = df_turmas_orig[id_prof_col].astype(str)
-                    
                     # Aplica o filtro para mostrar APENAS as turmas do professor logado
-                    df_display = df_turmas_orig[df_turmas_orig[id_prof_col].str.strip() == str(self.id_usuario)]
+                    df_display = self.indice.turmas_do_professor(self.id_numerico)
                     display_name = f"Minhas Turmas (Prof. {self.id_usuario})"
                 else:
                     self._exibir_tabela_formatada(pd.DataFrame(), "ERRO: Coluna de ID de Professor ('ID_Professor_Responsavel') não encontrada em Turmas.", self.content_container)
@@ -391,13 +472,9 @@ class MainFrame(ctk.CTkFrame):
                 ctk.CTkLabel(self.content_container, text="Erro: Coluna 'ID_Aluno' não encontrada na tabela de matrículas.", text_color=ERROR_RED).grid(row=0, column=0, padx=10, pady=10)
                 return
 
-            minhas_matriculas = dfs['matriculas'][dfs['matriculas'][id_aluno_col].astype(str) == str(self.id_usuario)]
+            minhas_matriculas = self.indice.matriculas_do_aluno(self.id_numerico)
             turmas_info = dfs.get('turmas', pd.DataFrame())
             
-            # Garante que as colunas de merge sejam strings
-            turmas_info['ID'] = turmas_info['ID'].astype(str) 
-            minhas_matriculas['ID_Turma'] = minhas_matriculas['ID_Turma'].astype(str) 
-            
             # Merge usando as chaves corrigidas
             df_display = pd.merge(minhas_matriculas, turmas_info, left_on='ID_Turma', right_on='ID', how='left', suffixes=('_mat', '_turma'))
             
@@ -437,102 +514,53 @@ class MainFrame(ctk.CTkFrame):
                  self.current_display_label.configure(text=f"Dados de {tipo} Indisponíveis.")
 
     def _calcular_medias(self) -> Tuple[Dict[str, float], str]:
+        """Médias do aluno logado (calculadas uma vez por versão dos dados na sessão)."""
+        return self._resultado_sessao('medias_aluno', self._calcular_medias_aluno)
+
+    def _calcular_medias_aluno(self) -> Tuple[Dict[str, float], str]:
         """Calcula a média ponderada do aluno de forma robusta."""
         dfs = self.dados
+        indice = self.indice
         
         # Verifica se as tabelas necessárias existem
         required = ['matriculas', 'turmas', 'atividades', 'notas']
         if any(k not in dfs for k in required):
              return {}, "ERRO: Dados incompletos (tabelas faltando no CSV)."
 
-        aluno_id_str = str(self.id_usuario).strip()
-        
-        # 1. Encontrar nomes corretos das colunas na tabela de Matrículas
-        col_id_aluno_mat = self._encontrar_coluna(dfs['matriculas'], ['ID_Aluno', 'Aluno_ID', 'RA'])
-        col_id_turma_mat = self._encontrar_coluna(dfs['matriculas'], ['ID_Turma', 'Turma_ID'])
-        
-        if not col_id_aluno_mat or not col_id_turma_mat:
+        # 1. Verifica as colunas de ligação na tabela de Matrículas
+        if not {'ID_Aluno', 'ID_Turma'}.issubset(dfs['matriculas'].columns):
              return {}, "ERRO: Colunas de ID de Aluno ou Turma não encontradas no arquivo matriculas.csv."
 
-        # 2. Filtrar matrículas do aluno logado
-        minhas_matriculas = dfs['matriculas'][dfs['matriculas'][col_id_aluno_mat].astype(str) == aluno_id_str]
+        # 2. Busca direta das matrículas do aluno logado
+        minhas_matriculas = indice.matriculas_do_aluno(self.id_numerico)
         
         if minhas_matriculas.empty:
             return {}, "AVISO: Nenhuma matrícula encontrada para este aluno."
 
+        if not {'ID', 'Peso'}.issubset(dfs['atividades'].columns) or not {'ID_Atividade', 'Nota'}.issubset(dfs['notas'].columns):
+            return {}, "ERRO: Colunas de Atividade (ID/Peso) ou Nota não encontradas nos CSVs."
+
+        visao = self.visao_notas
         medias = {}
         relatorio_detalhado = ""
 
         # 3. Iterar sobre cada turma que o aluno está matriculado
-        for id_turma in minhas_matriculas[col_id_turma_mat].unique():
-            id_turma_str = str(id_turma)
-            
-            # Busca nome da Turma para exibir no relatório
-            turma_row = dfs['turmas'][dfs['turmas']['ID'].astype(str) == id_turma_str]
-            nome_turma = f"Turma {id_turma_str}"
-            if not turma_row.empty:
-                col_nome = self._encontrar_coluna(dfs['turmas'], ['Nome', 'Disciplina', 'Materia'])
-                if col_nome:
-                    nome_turma = turma_row.iloc[0][col_nome]
-
-            # 4. Filtrar ATIVIDADES desta turma específica
-            df_atividades = dfs['atividades']
-            col_id_turma_ativ = self._encontrar_coluna(df_atividades, ['ID_Turma', 'Turma_ID'])
-            
-            if not col_id_turma_ativ: continue
-            
-            # Pega todas as atividades cadastradas para essa turma
-            atividades_turma = df_atividades[df_atividades[col_id_turma_ativ].astype(str) == id_turma_str]
-            
-            if atividades_turma.empty:
+        for id_turma in minhas_matriculas['ID_Turma'].unique():
+            # Turmas sem nenhuma atividade cadastrada não entram no relatório
+            if not visao.turma_tem_atividades(id_turma):
                 continue
 
-            # Identifica colunas de ID e Peso na tabela de Atividades
-            col_id_ativ = self._encontrar_coluna(atividades_turma, ['ID', 'Codigo'])
-            col_peso = self._encontrar_coluna(atividades_turma, ['Peso', 'Ponderacao'])
-            
-            # Identifica colunas na tabela de Notas
-            df_notas = dfs['notas']
-            col_id_aluno_nota = self._encontrar_coluna(df_notas, ['ID_Aluno', 'Aluno_ID'])
-            col_id_ativ_nota = self._encontrar_coluna(df_notas, ['ID_Atividade', 'Atividade_ID'])
-            col_nota_valor = self._encontrar_coluna(df_notas, ['Nota', 'Valor', 'Score'])
-            
-            if not all([col_id_aluno_nota, col_id_ativ_nota, col_nota_valor, col_id_ativ, col_peso]):
-                continue
+            # Busca nome da Turma para exibir no relatório
+            nome_turma = indice.nome('turmas', id_turma, f"Turma {id_turma}")
 
-            # 5. Filtrar NOTAS apenas deste aluno
-            notas_do_aluno = df_notas[df_notas[col_id_aluno_nota].astype(str) == aluno_id_str]
-
-            # 6. Cruzar (Merge) as Notas do Aluno com as Atividades da Turma
-            # Aqui cruzamos ID_Atividade (da nota) com ID (da atividade)
-            df_calculo = pd.merge(
-                notas_do_aluno,
-                atividades_turma,
-                left_on=col_id_ativ_nota,
-                right_on=col_id_ativ,
-                how='inner',
-                suffixes=('_nota', '_ativ')
-            )
+            # 4. Média ponderada Σ(Nota×Peso)/ΣPeso já calculada na visão de notas
+            media_final = visao.media(self.id_numerico, id_turma)
 
-            if df_calculo.empty:
+            if media_final is None:
                 medias[nome_turma] = 0.0
                 relatorio_detalhado += f"{nome_turma}: 0.0 (Sem notas lançadas)\n"
                 continue
-            
-            # Resolve nomes de colunas após o merge (caso haja duplicidade)
-            c_nota = col_nota_valor if col_nota_valor in df_calculo.columns else f"{col_nota_valor}_nota"
-            c_peso = col_peso if col_peso in df_calculo.columns else f"{col_peso}_ativ"
-
-            # Converte para números (para evitar erro de cálculo com texto)
-            df_calculo['val_nota'] = pd.to_numeric(df_calculo[c_nota], errors='coerce').fillna(0)
-            df_calculo['val_peso'] = pd.to_numeric(df_calculo[c_peso], errors='coerce').fillna(0)
 
-            # 7. Cálculo Matemático da Média Ponderada
-            soma_pond = (df_calculo['val_nota'] * df_calculo['val_peso']).sum()
-            soma_pesos = df_calculo['val_peso'].sum()
-            
-            media_final = (soma_pond / soma_pesos) if soma_pesos > 0 else 0.0
-            
             medias[nome_turma] = media_final
             relatorio_detalhado += f"{nome_turma}: {media_final:.2f}\n"
 
@@ -541,79 +569,18 @@ class MainFrame(ctk.CTkFrame):
     def _calcular_medias_turmas_professor(self) -> Dict[str, float]:
         """Calcula a média geral de cada turma do professor."""
         dfs = self.dados
+        indice = self.indice
         if 'turmas' not in dfs or 'atividades' not in dfs or 'notas' not in dfs:
             return {}
 
-        prof_id_str = str(self.id_usuario).strip()
-        
-        # Identifica colunas essenciais em Turmas
-        df_turmas = dfs['turmas']
-        col_id_prof = self._encontrar_coluna(df_turmas, ['ID_Professor_Responsavel', 'ID_Professor', 'Professor_ID'])
-        col_id_turma = self._encontrar_coluna(df_turmas, ['ID', 'Codigo'])
-        col_nome_turma = self._encontrar_coluna(df_turmas, ['Nome', 'Disciplina'])
-        
-        if not col_id_prof: return {}
-
-        # Filtra turmas do professor
-        minhas_turmas = df_turmas[df_turmas[col_id_prof].astype(str) == prof_id_str]
+        # Busca direta das turmas do professor
+        minhas_turmas = indice.turmas_do_professor(self.id_numerico)
         if minhas_turmas.empty: return {}
 
+        # Média da turma = média das médias ponderadas dos alunos (visão de notas)
         medias_por_turma = {}
-
-        for _, row in minhas_turmas.iterrows():
-            turma_id = str(row[col_id_turma])
-            turma_nome = row[col_nome_turma] if col_nome_turma else f"Turma {turma_id}"
-            
-            # Filtra atividades da turma
-            df_atividades = dfs['atividades']
-            col_turma_fk = self._encontrar_coluna(df_atividades, ['ID_Turma', 'Turma_ID'])
-            if not col_turma_fk: continue
-            
-            atividades_turma = df_atividades[df_atividades[col_turma_fk].astype(str) == turma_id]
-            
-            if atividades_turma.empty:
-                medias_por_turma[turma_nome] = 0.0
-                continue
-                
-            # Merge Notas + Atividades
-            df_notas = dfs['notas']
-            col_ativ_id = self._encontrar_coluna(df_atividades, ['ID', 'Codigo'])
-            col_ativ_peso = self._encontrar_coluna(df_atividades, ['Peso', 'Ponderacao'])
-            col_nota_fk = self._encontrar_coluna(df_notas, ['ID_Atividade', 'Atividade_ID'])
-            col_nota_valor = self._encontrar_coluna(df_notas, ['Nota', 'Valor'])
-            
-            if not all([col_ativ_id, col_ativ_peso, col_nota_fk, col_nota_valor]):
-                continue
-                
-            df_merge = pd.merge(
-                df_notas,
-                atividades_turma,
-                left_on=col_nota_fk,
-                right_on=col_ativ_id,
-                how='inner',
-                suffixes=('_nota', '_ativ')
-            )
-            
-            if df_merge.empty:
-                medias_por_turma[turma_nome] = 0.0
-                continue
-                
-            # Resolve nomes após merge
-            c_nota = col_nota_valor if col_nota_valor in df_merge.columns else f"{col_nota_valor}_nota"
-            c_peso = col_ativ_peso if col_ativ_peso in df_merge.columns else f"{col_ativ_peso}_ativ"
-            
-            # Converte e calcula
-            df_merge['n'] = pd.to_numeric(df_merge[c_nota], errors='coerce').fillna(0)
-            df_merge['p'] = pd.to_numeric(df_merge[c_peso], errors='coerce').fillna(0)
-            
-            # Média simples de todos os registros (média da turma)
-            # Idealmente: calcula média de cada aluno, depois média da turma.
-            # Simplificação funcional: (Soma de todas as notas ponderadas) / (Soma de todos os pesos lançados)
-            soma_notas = (df_merge['n'] * df_merge['p']).sum()
-            soma_pesos = df_merge['p'].sum()
-            
-            media_turma = (soma_notas / soma_pesos) if soma_pesos > 0 else 0.0
-            medias_por_turma[turma_nome] = media_turma
+        for turma_id, turma_nome in zip(minhas_turmas['ID'], minhas_turmas['Nome']):
+            medias_por_turma[turma_nome] = self.visao_notas.estatisticas_turma(turma_id)[0]
 
         return medias_por_turma
 
@@ -622,15 +589,12 @@ class MainFrame(ctk.CTkFrame):
         """Gera um gráfico de desempenho por turma para o professor."""
         
         # Limpa o gráfico anterior se existir
-        if self.grafico_canvas:
-            self.grafico_canvas.get_tk_widget().destroy()
+        self.graficos.remover_widget()
         
         if not medias:
             ctk.CTkLabel(parent_frame, text="Não há médias disponíveis para gerar o gráfico.", text_color=DARK_GRAY).grid(row=row, column=0, columnspan=2, padx=10, pady=10, sticky="n")
             return
             
-        fig, ax = plt.subplots(figsize=(8, 4))
-        
         turmas = list(medias.keys())
         valores = list(medias.values())
         
@@ -644,33 +608,21 @@ class MainFrame(ctk.CTkFrame):
             else:
                 colors.append(SUCCESS_GREEN) # Verde (Bom Desempenho)
                 
-        ax.bar(turmas, valores, color=colors)
-        ax.axhline(6.0, color='red', linestyle=':', linewidth=1, label='Risco (6.0)')
-        ax.axhline(7.5, color='green', linestyle=':', linewidth=1, label='Alto (7.5)')
-        ax.set_title("Média de Desempenho por Turma (Professor)")
-        ax.set_ylabel("Média da Turma")
-        ax.set_ylim(0, 10)
-        plt.xticks(rotation=25, ha="right", fontsize=8)
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-        canvas_widget = canvas.get_tk_widget()
-        # Coloca o gráfico na linha especificada
-        canvas_widget.grid(row=row, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
-        self.grafico_canvas = canvas 
+        # Figura reutilizada entre visitas; só é redesenhada se as médias mudarem
+        self.grafico_canvas = self.graficos.desenhar_barras(
+            'professor', parent_frame, row, 2, turmas, valores, colors,
+            titulo="Média de Desempenho por Turma (Professor)", rotulo_y="Média da Turma", limite_y=(0, 10),
+            linhas_referencia=[(6.0, 'red', ':', 'Risco (6.0)'), (7.5, 'green', ':', 'Alto (7.5)')],
+            rotacao=25, tamanho_fonte=8
+        )
 
     # Dashboard do Professor com Gráfico
     def exibir_dashboard_professor(self):
+        self._visao_atual = (self.exibir_dashboard_professor, ())
         self._limpar_container()
         
         # 1. Título
-        nome_professor = self.id_usuario 
-        df_professor = self.dados.get('professor', pd.DataFrame())
-        
-        if not df_professor.empty and 'ID' in df_professor.columns and 'Nome' in df_professor.columns:
-            prof_info = df_professor[df_professor['ID'].astype(str) == str(self.id_usuario)]
-            if not prof_info.empty:
-                nome_professor = prof_info.iloc[0]['Nome']
+        nome_professor = self.indice.nome('professor', self.id_numerico, self.id_usuario)
         
         self.current_display_label.configure(text=f"🎓 Início do(a) Professor(a): {nome_professor}")
 
@@ -683,16 +635,14 @@ class MainFrame(ctk.CTkFrame):
         turmas_prof_df = pd.DataFrame()
 
         if 'ID_Professor_Responsavel' in df_turmas.columns:
-            df_turmas['ID_Professor_Responsavel'] = df_turmas['ID_Professor_Responsavel'].astype(str)
-            turmas_prof_df = df_turmas[df_turmas['ID_Professor_Responsavel'] == str(self.id_usuario)].copy()
+            turmas_prof_df = self.indice.turmas_do_professor(self.id_numerico)
             num_turmas = len(turmas_prof_df)
 
         if not turmas_prof_df.empty and 'ID_Turma' in df_matriculas.columns:
             # Obtém IDs das turmas do professor
-            ids_turmas_prof = turmas_prof_df['ID'].astype(str).tolist()
+            ids_turmas_prof = turmas_prof_df['ID'].tolist()
             # Filtra matrículas que correspondem às turmas do professor
-            df_matriculas['ID_Turma'] = df_matriculas['ID_Turma'].astype(str)
-            matriculas_prof = df_matriculas[df_matriculas['ID_Turma'].isin(ids_turmas_prof)]
+            matriculas_prof = self.indice.matriculas_das_turmas(ids_turmas_prof)
             # Conta o número de alunos
             if 'ID_Aluno' in matriculas_prof.columns:
                 num_alunos = matriculas_prof['ID_Aluno'].nunique()
@@ -732,9 +682,27 @@ class MainFrame(ctk.CTkFrame):
                                      "Visão Geral das Turmas", 
                                      turmas_table_frame)
 
+        # 5. Distribuição das notas por atividade (quartis e entregas faltantes)
+        if not turmas_prof_df.empty:
+            self._exibir_distribuicao_notas_professor(turmas_prof_df, row=3)
+
+    def _exibir_distribuicao_notas_professor(self, turmas_prof_df: pd.DataFrame, row: int):
+        """Tabela com a distribuição pré-calculada das notas de cada atividade das turmas do professor."""
+        estatisticas = data_manager.get_estatisticas_notas().atividades_das_turmas(turmas_prof_df['ID'].tolist())
+        if estatisticas.empty:
+            return
+        nomes_turmas = dict(zip(turmas_prof_df['ID'], turmas_prof_df['Nome']))
+        tabela = estatisticas.assign(Disciplina=estatisticas['ID_Turma'].map(nomes_turmas))
+        tabela = tabela[['Disciplina', 'Atividade', 'Notas', 'Faltantes', 'Minima', 'Q1', 'Mediana', 'Q3', 'Maxima', 'Media']].round(2)
+
+        distribuicao_frame = ctk.CTkFrame(self.content_container, fg_color=LIGHT_GRAY_BG)
+        distribuicao_frame.grid(row=row, column=0, padx=10, pady=10, sticky="nsew")
+        self._exibir_tabela_formatada(tabela, "Distribuição das Notas por Atividade", distribuicao_frame)
+
 
     # Abas de detalhe do Professor (Alunos / Atividades)
     def exibir_dados_prof_detalhado(self, tipo_dado: str):
+        self._visao_atual = (self.exibir_dados_prof_detalhado, (tipo_dado,))
         self._limpar_container()
         
         # 1. Título
@@ -742,8 +710,7 @@ class MainFrame(ctk.CTkFrame):
         self.current_display_label.configure(text=f"Visualizando: {title.upper()}")
         
         # 2. Obter turmas do professor
-        df_turmas = self.dados.get('turmas', pd.DataFrame())
-        df_prof_turmas = df_turmas[df_turmas['ID_Professor_Responsavel'].astype(str) == str(self.id_usuario)]
+        df_prof_turmas = self.indice.turmas_do_professor(self.id_numerico)
         
         if df_prof_turmas.empty:
             ctk.CTkLabel(self.content_container, text="Aviso: Nenhuma turma encontrada para este professor.", text_color=DARK_GRAY).grid(row=0, column=0, padx=10, pady=10)
@@ -756,14 +723,8 @@ class MainFrame(ctk.CTkFrame):
         
         # 4. Preencher as Abas
         
-        # DataFrame de todos os alunos/atividades do professor
-        df_alunos = self.dados.get('aluno', pd.DataFrame())
-        df_matriculas = self.dados.get('matriculas', pd.DataFrame())
-        df_atividades = self.dados.get('atividades', pd.DataFrame())
-
-        
         for _, turma in df_prof_turmas.iterrows():
-            turma_id = str(turma['ID'])
+            turma_id = turma['ID']
             turma_nome = turma.get('Nome', f"Turma ID {turma_id}") 
             tab = tab_view.add(turma_nome)
             tab.grid_columnconfigure(0, weight=1)
@@ -771,11 +732,11 @@ class MainFrame(ctk.CTkFrame):
 
             if tipo_dado == 'alunos':
                 # Filtra matrículas da turma
-                matriculas_turma = df_matriculas[df_matriculas['ID_Turma'].astype(str) == turma_id]
+                matriculas_turma = self.indice.matriculas_da_turma(turma_id)
                 ids_alunos = matriculas_turma['ID_Aluno'].unique()
                 
-                # Filtra alunos
-                df_alunos_turma = df_alunos[df_alunos['ID'].astype(str).isin(ids_alunos)].copy()
+                # Busca os alunos diretamente pelo ID
+                df_alunos_turma = self.indice.registros('aluno', ids_alunos)
                 
                 if not df_alunos_turma.empty:
                     # Colunas de Aluno
@@ -787,14 +748,16 @@ class MainFrame(ctk.CTkFrame):
 
             elif tipo_dado == 'atividades':
                 # Filtra atividades da turma
-                df_atividades_turma = df_atividades[df_atividades['ID_Turma'].astype(str) == turma_id].copy()
+                df_atividades_turma = self.indice.atividades_da_turma(turma_id)
                 
                 if not df_atividades_turma.empty:
                     # Colunas de Atividades. NOVO CABEÇALHO: 'Nome_Atividade'
                     cols_to_show = ['ID', 'Nome_Atividade', 'Tipo', 'Peso', 'Data_Entrega']
                     df_display = df_atividades_turma[[c for c in cols_to_show if c in df_atividades_turma.columns]]
-                    # Renomeia para exibição
+                    # Renomeia para exibição (a data é guardada como datetime desde o carregamento)
                     df_display = df_display.rename(columns={'Nome_Atividade': 'Nome'})
+                    if 'Data_Entrega' in df_display.columns:
+                        df_display = df_display.assign(Data_Entrega=df_display['Data_Entrega'].dt.strftime('%d/%m/%Y'))
                     
                     self._exibir_tabela_formatada(df_display, f"Atividades de {turma_nome}", tab)
                 else:
@@ -805,7 +768,39 @@ class MainFrame(ctk.CTkFrame):
             first_tab_name = df_prof_turmas.iloc[0].get('Nome', f"Turma ID {df_prof_turmas.iloc[0]['ID']}")
             tab_view.set(first_tab_name)
 
+    def importar_notas_planilha(self):
+        """Importa notas de uma planilha (RA, Atividade, Nota) para as turmas do professor."""
+        caminho = filedialog.askopenfilename(
+            title="Importar Notas",
+            filetypes=[("Planilhas", "*.csv *.xlsx"), ("Todos os arquivos", "*.*")]
+        )
+        if not caminho:
+            return
+
+        self._visao_atual = None # O resultado da importação não é refeito na recarga
+        self._limpar_container()
+        self.current_display_label.configure(text=f"Visualizando: IMPORTAÇÃO DE NOTAS ({os.path.basename(caminho)})")
+
+        try:
+            resultado = importar_notas.importar_notas(caminho, self.id_numerico)
+        except (OSError, ValueError) as e:
+            ctk.CTkLabel(self.content_container, text=f"❌ Erro ao importar notas: {e}", text_color=ERROR_RED, wraplength=600, justify="left").grid(row=0, column=0, padx=10, pady=10, sticky="w")
+            return
+
+        cor = SUCCESS_GREEN if resultado.rejeitadas.empty else ERROR_RED
+        ctk.CTkLabel(self.content_container, text=f"✅ {resultado.resumo()}", font=ctk.CTkFont(size=14, weight="bold"), text_color=cor).grid(row=0, column=0, padx=10, pady=(10, 0), sticky="w")
+
+        if resultado.rejeitadas.empty:
+            return
+        ctk.CTkLabel(self.content_container, text=f"Linhas recusadas salvas em: {resultado.caminho_rejeitadas}", text_color=DARK_GRAY, wraplength=600, justify="left").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+
+        self.content_container.grid_rowconfigure(2, weight=1)
+        rejeitadas_frame = ctk.CTkFrame(self.content_container, fg_color=LIGHT_GRAY_BG)
+        rejeitadas_frame.grid(row=2, column=0, padx=10, pady=10, sticky="nsew")
+        self._exibir_tabela_formatada(resultado.rejeitadas, "Linhas Recusadas", rejeitadas_frame)
+
     def exibir_dashboard_admin(self):
+        self._visao_atual = (self.exibir_dashboard_admin, ())
         self._limpar_container()
         self.current_display_label.configure(text="📊 Painel do Administrador")
 
@@ -848,7 +843,33 @@ class MainFrame(ctk.CTkFrame):
         else:
             ctk.CTkLabel(self.content_container, text="Sem dados de matrículas para gerar gráfico.", text_color=DARK_GRAY).grid(row=1, column=0, padx=10, pady=10)
 
+        # --- 3. Risco Acadêmico (motor de regras vetorizado) ---
+        self._exibir_riscos_admin(row=2)
+
+    def _exibir_riscos_admin(self, row: int):
+        """Contagens de médias por faixa (risco, marginal, regular, destaque) por turma e alunos em alerta."""
+        tabela_riscos = motor_regras.obter_tabela_riscos()
+        if tabela_riscos.por_turma.empty:
+            ctk.CTkLabel(self.content_container, text="Sem notas lançadas para a análise de risco.", text_color=DARK_GRAY).grid(row=row, column=0, padx=10, pady=10)
+            return
+
+        frame_turmas = ctk.CTkFrame(self.content_container, fg_color=CARD_BG, corner_radius=10)
+        frame_turmas.grid(row=row, column=0, padx=10, pady=10, sticky="nsew")
+        self._exibir_tabela_formatada(tabela_riscos.por_turma.drop(columns=['ID_Turma']), "Risco Acadêmico por Turma", frame_turmas)
+
+        alertas = tabela_riscos.alertas()
+        if alertas.empty:
+            ctk.CTkLabel(self.content_container, text="✅ Nenhum aluno com disciplinas em risco.", text_color=SUCCESS_GREEN).grid(row=row + 1, column=0, padx=10, pady=10, sticky="w")
+            return
+        frame_alertas = ctk.CTkFrame(self.content_container, fg_color=CARD_BG, corner_radius=10)
+        frame_alertas.grid(row=row + 1, column=0, padx=10, pady=10, sticky="nsew")
+        self._exibir_tabela_formatada(alertas.drop(columns=['ID_Aluno']), f"⚠️ Alunos em Risco ({len(alertas)})", frame_alertas)
+
     def _preparar_tabela_notas_detalhada(self) -> pd.DataFrame:
+        """Notas detalhadas do aluno logado (montadas uma vez por versão dos dados na sessão)."""
+        return self._resultado_sessao('notas_detalhadas', self._montar_tabela_notas_detalhada)
+
+    def _montar_tabela_notas_detalhada(self) -> pd.DataFrame:
         """Prepara um DataFrame com as notas detalhadas do aluno por atividade e disciplina."""
         dfs = self.dados
         required = ['matriculas', 'turmas', 'atividades', 'notas']
@@ -857,25 +878,18 @@ class MainFrame(ctk.CTkFrame):
         if any(k not in dfs for k in required) or dfs.get('notas', pd.DataFrame()).empty:
              return pd.DataFrame()
 
-        aluno_id_str = str(self.id_usuario).strip()
-        
-        # 1. Filtrar notas do aluno logado
-        col_id_aluno_nota = self._encontrar_coluna(dfs['notas'], ['ID_Aluno', 'Aluno_ID'])
-        if not col_id_aluno_nota: return pd.DataFrame()
-        df_notas_aluno = dfs['notas'][dfs['notas'][col_id_aluno_nota].astype(str).str.strip() == aluno_id_str].copy()
+        # 1. Busca direta das notas do aluno logado
+        df_notas_aluno = self.indice.notas_do_aluno(self.id_numerico)
         
         if df_notas_aluno.empty:
             return pd.DataFrame()
         
         # 2. Merge Notas com Atividades (para obter o nome e peso da atividade)
-        atividades_info = dfs.get('atividades', pd.DataFrame()).copy()
+        atividades_info = dfs.get('atividades', pd.DataFrame())
         col_ativ_id = self._encontrar_coluna(atividades_info, ['ID', 'Codigo'])
         col_nota_ativ = self._encontrar_coluna(df_notas_aluno, ['ID_Atividade', 'Atividade_ID'])
         
         if not col_ativ_id or not col_nota_ativ: return pd.DataFrame()
-        
-        atividades_info[col_ativ_id] = atividades_info[col_ativ_id].astype(str)
-        df_notas_aluno[col_nota_ativ] = df_notas_aluno[col_nota_ativ].astype(str)
 
         df_merged = pd.merge(
             df_notas_aluno,
@@ -887,15 +901,12 @@ class MainFrame(ctk.CTkFrame):
         )
         
         # 3. Merge com Turmas (para obter o nome da disciplina/turma)
-        turmas_info = dfs.get('turmas', pd.DataFrame()).copy()
+        turmas_info = dfs.get('turmas', pd.DataFrame())
         col_ativ_turma = self._encontrar_coluna(atividades_info, ['ID_Turma', 'Turma_ID']) 
         col_turma_nome = self._encontrar_coluna(turmas_info, ['Nome', 'Disciplina', 'Materia'])
         col_turma_id_ativ = col_ativ_turma if col_ativ_turma in df_merged.columns else f"{col_ativ_turma}_ativ"
         
         if col_turma_id_ativ and 'ID' in turmas_info.columns and col_turma_nome:
-            turmas_info['ID'] = turmas_info['ID'].astype(str)
-            df_merged[col_turma_id_ativ] = df_merged[col_turma_id_ativ].astype(str)
-
             df_merged = pd.merge(
                 df_merged,
                 turmas_info,
@@ -922,20 +933,18 @@ class MainFrame(ctk.CTkFrame):
         df_final = df_merged[[c for c in cols_to_show.keys() if c in df_merged.columns]].copy()
         df_final = df_final.rename(columns={k: v for k, v in cols_to_show.items() if k in df_final.columns})
 
+        # Peso e Nota são numéricos desde o carregamento: formata apenas para exibição
+        df_final['Peso'] = df_final['Peso'].map(lambda v: f"{v:g}" if pd.notna(v) else '-')
+        df_final['Nota'] = df_final['Nota'].map(lambda v: f"{v:.2f}" if pd.notna(v) else '-')
+
         return df_final[['Disciplina', 'Atividade', 'Peso', 'Nota']].fillna('-')        
 
     def exibir_dashboard_aluno(self):
+        self._visao_atual = (self.exibir_dashboard_aluno, ())
         self._limpar_container()
         
-        df_aluno = self.dados.get('aluno', pd.DataFrame())
-        nome_aluno = self.id_usuario 
-        
         # Busca pelo nome
-        if not df_aluno.empty and 'ID' in df_aluno.columns and 'Nome' in df_aluno.columns:
-            aluno_info = df_aluno[df_aluno['ID'].astype(str) == str(self.id_usuario)]
-            if not aluno_info.empty:
-                nome_col = next((col for col in aluno_info.columns if col.lower() == 'nome'), 'Nome')
-                nome_aluno = aluno_info.iloc[0].get(nome_col, self.id_usuario)
+        nome_aluno = self.indice.nome('aluno', self.id_numerico, self.id_usuario)
         
         self.current_display_label.configure(text=f"🏠 Início do Aluno: {nome_aluno}")
         
@@ -967,32 +976,24 @@ class MainFrame(ctk.CTkFrame):
 
     def _gerar_grafico_desempenho_aluno(self, parent_frame, medias, row):
         """Gera um gráfico de desempenho por disciplina para o aluno."""
-        if self.grafico_canvas:
-            self.grafico_canvas.get_tk_widget().destroy()
-        
-        fig, ax = plt.subplots(figsize=(8, 4))
+        self.graficos.remover_widget()
         
         disciplinas = list(medias.keys())[:10]
         valores = list(medias.values())[:10]
         
-        ax.bar(disciplinas, valores, color=[SUCCESS_GREEN if v >= 7.0 else ERROR_RED if v < 6.0 else PRIMARY_BLUE for v in valores])
-        ax.axhline(6.0, color='gray', linestyle='--', linewidth=1, label='Corte (6.0)')
-        ax.set_title("Desempenho por Disciplina")
-        ax.set_ylabel("Média")
-        ax.set_ylim(0, 10)
-        plt.xticks(rotation=15, ha="right")
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.grid(row=row, column=0, columnspan=2, padx=10, pady=10, sticky="nsew")
-        self.grafico_canvas = canvas 
+        self.grafico_canvas = self.graficos.desenhar_barras(
+            'aluno', parent_frame, row, 2, disciplinas, valores,
+            [SUCCESS_GREEN if v >= 7.0 else ERROR_RED if v < 6.0 else PRIMARY_BLUE for v in valores],
+            titulo="Desempenho por Disciplina", rotulo_y="Média", limite_y=(0, 10),
+            linhas_referencia=[(6.0, 'gray', '--', 'Corte (6.0)')], rotacao=15
+        )
 
     def exibir_notas_aluno_com_grafico(self):
         """
         Exibe o dashboard de desempenho do aluno: KPIs, Gráfico e Tabela de notas detalhadas.
         Tudo dentro de um único CTkScrollableFrame (self.content_container).
         """
+        self._visao_atual = (self.exibir_notas_aluno_com_grafico, ())
         self._limpar_container()
         self.current_display_label.configure(text="📈 Meu Desempenho Acadêmico")
         
@@ -1055,148 +1056,184 @@ class MainFrame(ctk.CTkFrame):
         if not col_turma_id_mat or not col_turma_id:
             return {}
         
-        # Força conversão para string para evitar erro (ex: 1 vs "1")
-        df_mat = dfs['matriculas'].copy()
-        df_mat[col_turma_id_mat] = df_mat[col_turma_id_mat].astype(str).str.strip()
-        
-        # Conta ocorrências de matrículas por ID de turma
-        contagem = df_mat[col_turma_id_mat].value_counts()
+        # Conta ocorrências de matrículas por ID de turma (IDs já são inteiros)
+        contagem = dfs['matriculas'][col_turma_id_mat].value_counts()
         
         resultado = {}
         for id_turma, qtd in contagem.items():
-            id_turma_str = str(id_turma)
-            
-            # Busca o nome da turma
-            nome_turma = f"Turma {id_turma_str}"
-            turma_row = dfs['turmas'][dfs['turmas'][col_turma_id].astype(str).str.strip() == id_turma_str]
-            
-            if not turma_row.empty and col_turma_nome:
-                nome_turma = str(turma_row.iloc[0][col_turma_nome])
-                
+            # Busca o nome da turma no índice (O(1) por turma)
+            nome_turma = self.indice.nome('turmas', id_turma, f"Turma {id_turma}", col_turma_nome or 'Nome')
             resultado[nome_turma] = qtd
             
         return resultado
 
     def _gerar_grafico_admin(self, parent_frame, dados: Dict[str, int], row):
         """Gera o gráfico de barras para o Admin."""
-        if self.grafico_canvas:
-            self.grafico_canvas.get_tk_widget().destroy()
+        self.graficos.remover_widget()
             
         if not dados:
             return          
 
-        # Configuração do Gráfico
-        fig, ax = plt.subplots(figsize=(8, 4))
-        
-        turmas = list(dados.keys())
-        qtds = list(dados.values())
-        
-        # Cria barras
-        bars = ax.bar(turmas, qtds, color=PRIMARY_BLUE)
-        
-        ax.set_title("Distribuição de Alunos por Turma")
-        ax.set_ylabel("Qtd. Alunos")
-        
-        # Adiciona o valor em cima da barra (try/except para versões antigas do matplotlib)
-        try:
-            ax.bar_label(bars)
-        except AttributeError:
-            # Fallback para matplotlib antigo
-            for rect in bars:
-                height = rect.get_height()
-                ax.annotate(f'{height}',
-                            xy=(rect.get_x() + rect.get_width() / 2, height),
-                            xytext=(0, 3), textcoords="offset points",
-                            ha='center', va='bottom')
-        
-        plt.xticks(rotation=30, ha="right", fontsize=9)
-        plt.tight_layout()
-
-        canvas = FigureCanvasTkAgg(fig, master=parent_frame)
-        canvas_widget = canvas.get_tk_widget()
-        canvas_widget.grid(row=row, column=0, columnspan=3, padx=10, pady=10, sticky="nsew")
-        self.grafico_canvas = canvas    
+        # Configuração do Gráfico (valor em cima de cada barra)
+        self.grafico_canvas = self.graficos.desenhar_barras(
+            'admin', parent_frame, row, 3, list(dados.keys()), list(dados.values()), PRIMARY_BLUE,
+            titulo="Distribuição de Alunos por Turma", rotulo_y="Qtd. Alunos",
+            rotacao=30, tamanho_fonte=9, rotular_barras=True
+        )
         
     # ==========================================================
     # --- FUNÇÕES DE IA E PDF ---
     # ==========================================================
     
-    def _preparar_dados_para_ia(self, tipo_analise: str) -> str:
-        """Prepara e formata os dados para serem enviados ao módulo de IA."""
-        
-        # O data_manager.py agora faz todo o trabalho de mesclagem e formatação
-        # Assume que o data_manager.py foi atualizado para usar os novos cabeçalhos
-        data_string = preparar_dados_para_ia(self.id_usuario, tipo_analise)
-        
-        dfs = self.dados
-        nome_display = self.id_usuario 
+    def _preparar_dados_para_ia(self, tipo_analise: str) -> Union[DadosRelatorio, str]:
+        """Prepara os dados (objeto de dados_relatorio ou mensagem de erro) para o módulo de IA."""
+        
+        # O data_manager.py faz todo o trabalho de mesclagem e cálculo; ele lê os dados
+        # globais, então o resultado fica guardado pela versão atual (não a da tela)
+        dados_relatorio = self._resultado_sessao(
+            f'dados_ia_{tipo_analise}',
+            lambda: data_manager.preparar_dados_para_ia(self.id_usuario, tipo_analise),
+            versao=data_manager.get_versao_dados(),
+        )
         
         if tipo_analise == 'aluno':
-            df_aluno = dfs.get('aluno', pd.DataFrame()) 
-            if not df_aluno.empty and 'ID' in df_aluno.columns:
-                 user_info = df_aluno[df_aluno['ID'].astype(str) == str(self.id_usuario)]
-                 if not user_info.empty:
-                     # A coluna de nome é 'Nome'
-                     nome_col = next((col for col in user_info.columns if col.lower() == 'nome'), None)
-                     nome_display = user_info.iloc[0].get(nome_col, self.id_usuario) if nome_col else self.id_usuario
-                     
+            nome_display = self.indice.nome('aluno', self.id_numerico, self.id_usuario)
             self.last_ia_report_name = f"Relatório de Desempenho do Aluno: {nome_display}"
             self.last_ia_report_type = "aluno"
             
         elif tipo_analise == 'admin' or tipo_analise == 'professor':
-            df_user = dfs.get(tipo_analise, pd.DataFrame()) 
-            if not df_user.empty and 'ID' in df_user.columns:
-                 user_info = df_user[df_user['ID'].astype(str) == str(self.id_usuario)]
-                 if not user_info.empty:
-                     # A coluna de nome é 'Nome'
-                     nome_col = next((col for col in user_info.columns if col.lower() == 'nome'), None)
-                     nome_display = user_info.iloc[0].get(nome_col, self.id_usuario) if nome_col else self.id_usuario
-
+            nome_display = self.indice.nome(tipo_analise, self.id_numerico, self.id_usuario)
             self.last_ia_report_name = f"Relatório Gerencial: {tipo_analise.capitalize()} ({nome_display})"
             self.last_ia_report_type = tipo_analise
         
-        return data_string
+        return dados_relatorio
 
     def analisar_dados_ia(self, tipo_analise: str):
-        """Chama a IA, exibe o resultado e armazena para geração de PDF."""
-        self._limpar_container()
-        self.current_display_label.configure(text=f"🧠 Análise de Dados via IA - {tipo_analise.upper()}")
-
-        status_label = ctk.CTkLabel(self.content_container, text="Aguarde, a IA está gerando o relatório...", text_color=PRIMARY_BLUE)
-        status_label.grid(row=0, column=0, padx=20, pady=20, sticky="n")
-        self.content_container.grid_columnconfigure(0, weight=1)
-        self.update_idletasks() 
+        """Prepara os dados e envia a análise para uma thread; o resultado chega via after()."""
+        self._visao_atual = None # Relatórios de IA não são refeitos automaticamente
 
         raw_data = self._preparar_dados_para_ia(tipo_analise)
 
-        if not raw_data or raw_data.strip().startswith('AVISO:') or raw_data.strip().startswith('ERRO:'):
-            status_label.configure(text=f"❌ Erro: Dados insuficientes para análise de IA. Detalhe: {raw_data.strip()}", text_color=ERROR_RED)
+        if eh_dado_insuficiente(raw_data):
+            self._limpar_container()
+            self.current_display_label.configure(text=f"🧠 Análise de Dados via IA - {tipo_analise.upper()}")
+            ctk.CTkLabel(self.content_container, text=f"❌ Erro: Dados insuficientes para análise de IA. Detalhe: {raw_data.strip()}", text_color=ERROR_RED).grid(row=0, column=0, padx=20, pady=20, sticky="n")
             return
 
-        try:
-            relatorio_ia_texto = gerar_relatorio_ia(
-                nome_usuario=self.last_ia_report_name, 
-                dados_para_ia=raw_data, 
-                tipo_usuario=tipo_analise
-            )
-            self.last_ia_report_data = relatorio_ia_texto 
-            
-            status_label.destroy()
-            
-            report_box = ctk.CTkTextbox(self.content_container, height=400, fg_color=CARD_BG, text_color=DARK_GRAY)
-            report_box.insert("0.0", relatorio_ia_texto)
-            report_box.configure(state="disabled")
-            report_box.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
-            self.content_container.grid_rowconfigure(1, weight=1)
-            self.ia_report_box = report_box # Atributo para limpeza
+        tarefa = self.tarefas_ia.submeter(
+            tipo_analise.upper(),
+            ai_module.gerar_relatorio_ia,
+            nome_usuario=self.last_ia_report_name,
+            dados_para_ia=raw_data,
+            tipo_usuario=tipo_analise,
+            metadados={'nome_relatorio': self.last_ia_report_name, 'tipo': self.last_ia_report_type},
+        )
+        self._adicionar_tarefa_no_painel(tarefa)
+        self._exibir_tarefa_ia(tarefa)
+        self._agendar_acompanhamento_ia()
+
+    def _adicionar_tarefa_no_painel(self, tarefa: TarefaIA):
+        """Cria a entrada da tarefa na barra lateral (clicar reabre o andamento/resultado)."""
+        botao = ctk.CTkButton(self.painel_tarefas_ia, text=f"⏳ IA #{tarefa.id} {tarefa.descricao}", command=lambda: self._exibir_tarefa_ia(tarefa),
+                              fg_color=LIGHT_GRAY_BG, text_color=DARK_GRAY, font=ctk.CTkFont(size=11), height=24)
+        self._entradas_tarefas[tarefa.id] = (tarefa, botao)
+        self._organizar_painel_tarefas()
+
+    def _organizar_painel_tarefas(self):
+        """Limita o painel às últimas MAX_TAREFAS_PAINEL tarefas e reposiciona os botões pela ordem."""
+        # Só saem tarefas finalizadas que não estão na tela; as em andamento ficam até terminar
+        for id_tarefa, (tarefa, botao) in list(self._entradas_tarefas.items()):
+            if len(self._entradas_tarefas) <= MAX_TAREFAS_PAINEL:
+                break
+            if tarefa.finalizada and tarefa is not self._tarefa_exibida:
+                botao.destroy()
+                del self._entradas_tarefas[id_tarefa]
+
+        for posicao, (_, botao) in enumerate(self._entradas_tarefas.values()):
+            botao.grid(row=posicao, column=0, padx=10, pady=2, sticky="ew")
+
+    def _exibir_tarefa_ia(self, tarefa: TarefaIA):
+        """Mostra o andamento (barra de progresso e cancelamento) ou o resultado da tarefa."""
+        self._visao_atual = None
+        self._limpar_container()
+        self._tarefa_exibida = tarefa
+        self.current_display_label.configure(text=f"🧠 Análise de Dados via IA - {tarefa.descricao} (#{tarefa.id})")
+        self.content_container.grid_columnconfigure(0, weight=1)
 
-            
-            save_pdf_btn = ctk.CTkButton(self.content_container, text="SALVAR RELATÓRIO COMO PDF", command=lambda: self._salvar_como_pdf(relatorio_ia_texto), 
-                                         fg_color=SUCCESS_GREEN, font=ctk.CTkFont(size=14, weight="bold"))
-            save_pdf_btn.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
+        if tarefa.finalizada:
+            self._exibir_resultado_ia(tarefa)
+            return
 
-        except Exception as e:
-            status_label.configure(text=f"❌ Erro ao processar IA. Detalhe: {e}", text_color=ERROR_RED)
+        self._status_tarefa_label = ctk.CTkLabel(self.content_container, text="Aguarde, a IA está gerando o relatório...", text_color=PRIMARY_BLUE)
+        self._status_tarefa_label.grid(row=0, column=0, padx=20, pady=(20, 5), sticky="n")
+
+        # O tempo da chamada ao Gemini é desconhecido: barra indeterminada
+        barra = ctk.CTkProgressBar(self.content_container, mode="indeterminate")
+        barra.grid(row=1, column=0, padx=40, pady=5, sticky="ew")
+        barra.start()
+
+        ctk.CTkButton(self.content_container, text="Cancelar análise", command=lambda: self._cancelar_tarefa_ia(tarefa),
+                      fg_color=ERROR_RED, font=ctk.CTkFont(size=14, weight="bold")).grid(row=2, column=0, padx=10, pady=10)
+
+    def _cancelar_tarefa_ia(self, tarefa: TarefaIA):
+        tarefa.cancelar()
+        self._acompanhar_tarefas_ia()
+
+    def _agendar_acompanhamento_ia(self):
+        if self._id_acompanhamento_ia is None:
+            self._id_acompanhamento_ia = self.after(INTERVALO_ACOMPANHAMENTO_IA_MS, self._acompanhar_tarefas_ia)
+
+    def _acompanhar_tarefas_ia(self):
+        """Consulta as tarefas: atualiza o tempo decorrido e entrega os resultados prontos."""
+        if self._id_acompanhamento_ia is not None:
+            self.after_cancel(self._id_acompanhamento_ia)
+        self._id_acompanhamento_ia = None
+
+        finalizadas = self.tarefas_ia.coletar_finalizadas()
+        for tarefa in finalizadas:
+            icone = {ESTADO_CONCLUIDA: "✅", ESTADO_CANCELADA: "⛔"}.get(tarefa.estado, "❌")
+            entrada = self._entradas_tarefas.get(tarefa.id)
+            if entrada is not None:
+                entrada[1].configure(text=f"{icone} IA #{tarefa.id} {tarefa.descricao}")
+            if tarefa is self._tarefa_exibida:
+                self._exibir_tarefa_ia(tarefa)
+        if finalizadas:
+            # Tarefas que terminaram agora podem liberar espaço no painel
+            self._organizar_painel_tarefas()
+
+        tarefa = self._tarefa_exibida
+        if tarefa is not None and not tarefa.finalizada and self._status_tarefa_label is not None:
+            self._status_tarefa_label.configure(text=f"Aguarde, a IA está gerando o relatório... ({tarefa.tempo_decorrido:.0f}s)")
+
+        if self.tarefas_ia.em_andamento():
+            self._agendar_acompanhamento_ia()
+
+    def _exibir_resultado_ia(self, tarefa: TarefaIA):
+        """Exibe o relatório concluído (ou o motivo da falha/cancelamento)."""
+        if tarefa.estado == ESTADO_CANCELADA:
+            ctk.CTkLabel(self.content_container, text="⛔ Análise cancelada.", text_color=ERROR_RED).grid(row=0, column=0, padx=20, pady=20, sticky="n")
+            return
+        if tarefa.estado != ESTADO_CONCLUIDA:
+            ctk.CTkLabel(self.content_container, text=f"❌ Erro ao processar IA. Detalhe: {tarefa.erro}", text_color=ERROR_RED).grid(row=0, column=0, padx=20, pady=20, sticky="n")
+            return
+
+        relatorio_ia_texto = tarefa.resultado
+        # O PDF usa o nome/tipo da análise exibida (podem existir várias na sessão)
+        self.last_ia_report_name = tarefa.metadados.get('nome_relatorio', self.last_ia_report_name)
+        self.last_ia_report_type = tarefa.metadados.get('tipo', self.last_ia_report_type)
+        self.last_ia_report_data = relatorio_ia_texto 
+        
+        report_box = ctk.CTkTextbox(self.content_container, height=400, fg_color=CARD_BG, text_color=DARK_GRAY)
+        report_box.insert("0.0", relatorio_ia_texto)
+        report_box.configure(state="disabled")
+        report_box.grid(row=1, column=0, padx=10, pady=10, sticky="nsew")
+        self.content_container.grid_rowconfigure(1, weight=1)
+        self.ia_report_box = report_box # Atributo para limpeza
+
+        
+        save_pdf_btn = ctk.CTkButton(self.content_container, text="SALVAR RELATÓRIO COMO PDF", command=lambda: self._salvar_como_pdf(relatorio_ia_texto), 
+                                     fg_color=SUCCESS_GREEN, font=ctk.CTkFont(size=14, weight="bold"))
+        save_pdf_btn.grid(row=2, column=0, padx=10, pady=10, sticky="ew")
 
     def gerar_relatorio_ia_pdf(self):
         """Função de conveniência para Alunos."""
@@ -1205,22 +1242,8 @@ class MainFrame(ctk.CTkFrame):
     def _salvar_como_pdf(self, report_text: str):
         """Salva o relatório em um arquivo PDF."""
         try:
-            base_name = "".join(c if c.isalnum() or c == '_' else '_' for c in self.last_ia_report_name.replace(' ', '_'))
-            filename = f"{base_name}_{self.id_usuario}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            
-            pdf = FPDF()
-            pdf.add_page()
-            
-            pdf.set_font("Arial", "B", 16)
-            pdf.cell(200, 10, self.last_ia_report_name.encode('latin-1', 'replace').decode('latin-1'), 0, 1, "C")
-            
-            pdf.set_font("Arial", "", 10)
-             
-            # Ajusta para remover a formatação markdown (como ** e ###)
-            formatted_text = report_text.replace('**', '').replace('###', '').replace('>', '').encode('latin-1', 'replace').decode('latin-1')
-            pdf.multi_cell(0, 5, formatted_text)
-            
-            pdf.output(filename, "F")
+            filename = relatorio_pdf.nome_arquivo_relatorio(self.last_ia_report_name, self.id_usuario, f"_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}")
+            relatorio_pdf.salvar_relatorio_pdf(filename, self.last_ia_report_name, report_text)
             
             print(f"✅ Relatório PDF salvo com sucesso em: {os.path.abspath(filename)}")
             
@@ -1236,5 +1259,6 @@ class MainFrame(ctk.CTkFrame):
 # ==========================================================
 
 if __name__ == "__main__":
+    marcar('módulos da interface importados')
     app = App()
     app.mainloop()
@@ -0,0 +1,225 @@
+import argparse
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from data_manager import (
+    ARQUIVOS_CSV, ESQUEMAS_TABELAS, FORMATO_DATA_CSV, CAMINHO_BANCO_SQLITE,
+    ArmazenamentoDados, COLUNAS_NOTAS_DO_ALUNO, aplicar_esquema, carregar_tabelas_csv,
+)
+from visao_notas import COLUNAS_TURMA
+
+# =================================================================
+# --- ARMAZENAMENTO EM SQLITE (ALTERNATIVA AOS CSVs) ---
+# =================================================================
+#
+# Ativado com a variável de ambiente ARMAZENAMENTO_DADOS=sqlite. Cada tabela de
+# ARQUIVOS_CSV vira uma tabela SQL com as mesmas colunas (nome = nome do CSV
+# sem extensão). Na primeira execução o banco é importado dos CSVs; depois disso
+# cada lote de gravações é uma única transação e as consultas dos painéis usam os
+# índices abaixo em vez de merges sobre as tabelas inteiras.
+#
+# Uso (a partir de frontend_python/):
+#   python armazenamento_sqlite.py --importar      -> (re)importa o banco a partir dos CSVs
+#
+# O backend C continua gravando CSV: alterações feitas por ele só chegam ao
+# banco com uma nova importação.
+
+# (tabela, colunas) de cada índice
+INDICES_SQL = [
+    ('aluno', ('ID',)),
+    ('professor', ('ID',)),
+    ('turmas', ('ID',)),
+    ('turmas', ('ID_Professor_Responsavel',)),
+    ('atividades', ('ID',)),
+    ('atividades', ('ID_Turma',)),
+    ('matriculas', ('ID_Aluno',)),
+    ('matriculas', ('ID_Turma',)),
+    ('notas', ('ID_Aluno', 'ID_Atividade')),
+    ('notas', ('ID_Atividade',)),
+]
+
+TIPOS_SQL = {'id': 'INTEGER', 'decimal': 'REAL'}  # Demais colunas: TEXT
+
+# Nota vigente de cada (atividade, aluno): a linha mais recente (maior rowid), como no CSV
+_NOTAS_VIGENTES = (
+    "SELECT n.ID_Atividade, n.ID_Aluno, n.Nota FROM notas n"
+    " WHERE n.rowid = (SELECT MAX(u.rowid) FROM notas u WHERE u.ID_Aluno = n.ID_Aluno AND u.ID_Atividade = n.ID_Atividade)"
+)
+
+
+def _nome_tabela(nome_chave: str) -> str:
+    return os.path.splitext(ARQUIVOS_CSV[nome_chave])[0]
+
+
+def _valor_sql(nome_chave: str, coluna: str, valor: Any) -> Any:
+    """Converte um valor do DataFrame tipado para o tipo gravado no banco."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    tipo = ESQUEMAS_TABELAS.get(nome_chave, {}).get(coluna)
+    if tipo == 'id':
+        return int(valor)
+    if tipo == 'decimal':
+        return float(valor)
+    if tipo == 'data' and hasattr(valor, 'strftime'):
+        return valor.strftime(FORMATO_DATA_CSV)
+    return str(valor)
+
+
+class ArmazenamentoSQLite(ArmazenamentoDados):
+    """Banco SQLite único com as sete tabelas e índices nas chaves estrangeiras."""
+
+    nome = 'sqlite'
+
+    def __init__(self, caminho: str = CAMINHO_BANCO_SQLITE):
+        self.caminho = caminho
+
+    def _conectar(self) -> sqlite3.Connection:
+        # Uma conexão por operação: o banco é usado pela interface, pelo monitor e pelas threads de IA
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        conexao = sqlite3.connect(self.caminho, timeout=5)
+        conexao.execute("PRAGMA journal_mode=WAL")
+        return conexao
+
+    def _tabelas_existentes(self, conexao: sqlite3.Connection) -> List[str]:
+        return [linha[0] for linha in conexao.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+
+    # --- Importação ---
+
+    def importar(self, dados: Dict[str, pd.DataFrame]) -> None:
+        """Recria todas as tabelas a partir dos DataFrames (uma única transação)."""
+        conexao = self._conectar()
+        try:
+            with conexao:
+                for nome_chave, df in dados.items():
+                    tabela = _nome_tabela(nome_chave)
+                    esquema = ESQUEMAS_TABELAS.get(nome_chave, {})
+                    colunas = [str(c) for c in df.columns]
+                    definicao = ", ".join(f'"{c}" {TIPOS_SQL.get(esquema.get(c), "TEXT")}' for c in colunas)
+                    conexao.execute(f'DROP TABLE IF EXISTS "{tabela}"')
+                    conexao.execute(f'CREATE TABLE "{tabela}" ({definicao})')
+                    marcadores = ", ".join("?" for _ in colunas)
+                    nomes = ", ".join(f'"{c}"' for c in colunas)
+                    conexao.executemany(
+                        f'INSERT INTO "{tabela}" ({nomes}) VALUES ({marcadores})',
+                        ([_valor_sql(nome_chave, c, v) for c, v in zip(colunas, linha)] for linha in df.itertuples(index=False, name=None))
+                    )
+                for nome_chave, colunas in INDICES_SQL:
+                    if nome_chave in dados and set(colunas).issubset(dados[nome_chave].columns):
+                        tabela = _nome_tabela(nome_chave)
+                        conexao.execute(
+                            f'CREATE INDEX IF NOT EXISTS "idx_{tabela}_{"_".join(colunas)}" ON "{tabela}" ({", ".join(colunas)})'
+                        )
+        finally:
+            conexao.close()
+        print(f"INFO: Banco SQLite '{self.caminho}' importado ({sum(len(df) for df in dados.values())} registros).")
+
+    def importar_csvs(self) -> None:
+        self.importar(carregar_tabelas_csv(monitorar=False))
+
+    # --- Leitura ---
+
+    def carregar_tabelas(self) -> Dict[str, pd.DataFrame]:
+        if not os.path.exists(self.caminho):
+            print(f"INFO: Banco SQLite não encontrado. Importando os CSVs para '{self.caminho}'.")
+            self.importar_csvs()
+
+        dados = {}
+        conexao = self._conectar()
+        try:
+            existentes = set(self._tabelas_existentes(conexao))
+            for nome_chave in ARQUIVOS_CSV:
+                tabela = _nome_tabela(nome_chave)
+                if tabela not in existentes:
+                    print(f"AVISO: Tabela '{tabela}' ausente no banco SQLite.")
+                    continue
+                df = pd.read_sql_query(f'SELECT * FROM "{tabela}" ORDER BY rowid', conexao)
+                dados[nome_chave] = aplicar_esquema(nome_chave, df)
+        finally:
+            conexao.close()
+        return dados
+
+    # --- Gravação ---
+
+    def inserir_lote(self, tabelas: Dict[str, pd.DataFrame]) -> None:
+        conexao = self._conectar()
+        try:
+            with conexao:  # Uma transação para o lote inteiro
+                for tabela, df in tabelas.items():
+                    nome = _nome_tabela(tabela)
+                    colunas = [linha[1] for linha in conexao.execute(f'PRAGMA table_info("{nome}")')]
+                    if not colunas:
+                        raise KeyError(f"Tabela '{nome}' ausente no banco SQLite.")
+                    nomes = ", ".join(f'"{c}"' for c in colunas)
+                    marcadores = ", ".join("?" for _ in colunas)
+                    linhas = df.reindex(columns=colunas).itertuples(index=False, name=None)
+                    conexao.executemany(
+                        f'INSERT INTO "{nome}" ({nomes}) VALUES ({marcadores})',
+                        ([_valor_sql(tabela, c, v) for c, v in zip(colunas, linha)] for linha in linhas)
+                    )
+        finally:
+            conexao.close()
+
+    # --- Consultas dos painéis (SQL com índices) ---
+
+    def _consultar(self, sql: str, parametros: tuple = ()) -> pd.DataFrame:
+        conexao = self._conectar()
+        try:
+            return pd.read_sql_query(sql, conexao, params=parametros)
+        finally:
+            conexao.close()
+
+    def notas_do_aluno(self, id_aluno: Optional[int]) -> pd.DataFrame:
+        df = self._consultar(
+            "SELECT a.ID_Turma, COALESCE(t.Nome, CAST(a.ID_Turma AS TEXT)) AS Turma, n.ID_Atividade,"
+            " a.Nome_Atividade AS Atividade, a.Peso, n.Nota"
+            f" FROM ({_NOTAS_VIGENTES} AND n.ID_Aluno = ?) n"
+            " JOIN atividades a ON a.ID = n.ID_Atividade"
+            " LEFT JOIN turmas t ON t.ID = a.ID_Turma"
+            " ORDER BY a.ID_Turma, n.ID_Atividade",
+            (id_aluno,)
+        )
+        return df[COLUNAS_NOTAS_DO_ALUNO]
+
+    def medias_por_turma(self) -> pd.DataFrame:
+        # Mesma fórmula de visao_notas: Σ(Nota × Peso) / ΣPeso por aluno; média e desvio (ddof=1) por turma
+        df = self._consultar(
+            "WITH medias AS ("
+            "  SELECT a.ID_Turma, n.ID_Aluno,"
+            "   CASE WHEN SUM(COALESCE(a.Peso, 0)) > 0"
+            "    THEN SUM(COALESCE(n.Nota, 0) * COALESCE(a.Peso, 0)) / SUM(COALESCE(a.Peso, 0)) ELSE 0 END AS Media"
+            f"  FROM ({_NOTAS_VIGENTES}) n JOIN atividades a ON a.ID = n.ID_Atividade"
+            "  GROUP BY a.ID_Turma, n.ID_Aluno"
+            ")"
+            " SELECT ID_Turma, AVG(Media) AS Media,"
+            "  CASE WHEN COUNT(*) > 1"
+            "   THEN (SUM(Media * Media) - COUNT(*) * AVG(Media) * AVG(Media)) / (COUNT(*) - 1) ELSE 0 END AS Variancia,"
+            "  COUNT(*) AS Qtd_Alunos"
+            " FROM medias GROUP BY ID_Turma ORDER BY ID_Turma"
+        )
+        df['Desvio_Padrao'] = df.pop('Variancia').clip(lower=0.0) ** 0.5
+        return df[COLUNAS_TURMA]
+
+    def matriculas_por_turma(self) -> pd.DataFrame:
+        return self._consultar(
+            "SELECT ID_Turma, COUNT(DISTINCT ID_Aluno) AS Qtd_Alunos FROM matriculas GROUP BY ID_Turma ORDER BY ID_Turma"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Importa os CSVs de dados acadêmicos para o banco SQLite.")
+    parser.add_argument('--importar', action='store_true', help="(Re)cria o banco a partir dos CSVs.")
+    parser.add_argument('--banco', default=CAMINHO_BANCO_SQLITE, help="Caminho do arquivo do banco.")
+    args = parser.parse_args(argv)
+    if not args.importar:
+        parser.print_help()
+        return
+    ArmazenamentoSQLite(args.banco).importar_csvs()
+
+
+if __name__ == '__main__':
+    main()
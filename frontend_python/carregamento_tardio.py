@@ -0,0 +1,110 @@
+import importlib
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+# =================================================================
+# --- IMPORTAÇÃO TARDIA E AQUECIMENTO DA INTERFACE ---
+# =================================================================
+#
+# pandas, matplotlib, o SDK do Gemini e o FPDF levam juntos mais de um segundo
+# para importar. A interface os referencia por ModuloTardio: o import real só
+# acontece no primeiro acesso a um atributo. Logo depois que a janela de login
+# aparece, aquecer() importa esses módulos (e carrega os dados) em uma thread,
+# para que o primeiro clique já os encontre prontos.
+#
+# Os tempos ficam registrados desde o início do processo; relatorio_inicializacao()
+# monta o resumo (janela visível, import de cada módulo, aquecimento concluído).
+
+INICIO_PROCESSO = time.perf_counter()
+
+_MARCOS: Dict[str, float] = {}          # evento -> segundos desde INICIO_PROCESSO
+_DURACOES_IMPORT: Dict[str, float] = {}  # módulo (ou tarefa do aquecimento) -> segundos gastos
+_TRAVA = threading.Lock()
+
+
+def marcar(evento: str) -> float:
+    """Registra (uma única vez) o instante de um evento da inicialização."""
+    with _TRAVA:
+        return _MARCOS.setdefault(evento, time.perf_counter() - INICIO_PROCESSO)
+
+
+def importar(nome: str) -> ModuleType:
+    """importlib.import_module com registro do tempo do primeiro import."""
+    # Sempre via import_module: se outra thread estiver no meio do import deste módulo,
+    # ele espera a inicialização terminar (sys.modules já teria o módulo incompleto)
+    ja_importado = nome in sys.modules
+    inicio = time.perf_counter()
+    modulo = importlib.import_module(nome)
+    if not ja_importado:
+        with _TRAVA:
+            _DURACOES_IMPORT.setdefault(nome, time.perf_counter() - inicio)
+    return modulo
+
+
+class ModuloTardio:
+    """Representa um módulo ainda não importado; o import acontece no primeiro acesso a um atributo."""
+
+    def __init__(self, nome: str):
+        self._nome = nome
+        self._modulo: Optional[ModuleType] = None
+
+    def __getattr__(self, atributo: str):
+        if self._modulo is None:
+            self._modulo = importar(self._nome)
+        return getattr(self._modulo, atributo)
+
+    def __repr__(self) -> str:
+        estado = 'carregado' if self._modulo is not None or self._nome in sys.modules else 'não carregado'
+        return f"<ModuloTardio '{self._nome}' ({estado})>"
+
+
+def aquecer(modulos: Sequence[str], tarefas: Sequence[Tuple[str, Callable[[], None]]] = (),
+            ao_concluir: Optional[Callable[[], None]] = None) -> threading.Thread:
+    """
+    Importa `modulos` e executa `tarefas` (descrição, função) em uma thread de
+    fundo. Falhas são apenas avisadas: o mesmo trabalho é refeito no primeiro uso.
+    """
+    def executar():
+        for nome in modulos:
+            try:
+                importar(nome)
+            except Exception as e:
+                print(f"AVISO: Aquecimento: falha ao importar '{nome}': {e}")
+        for descricao, tarefa in tarefas:
+            inicio = time.perf_counter()
+            try:
+                tarefa()
+            except Exception as e:
+                print(f"AVISO: Aquecimento: falha em '{descricao}': {e}")
+                continue
+            with _TRAVA:
+                _DURACOES_IMPORT.setdefault(descricao, time.perf_counter() - inicio)
+        marcar('aquecimento concluído')
+        if ao_concluir is not None:
+            ao_concluir()
+
+    thread = threading.Thread(target=executar, name="aquecimento-interface", daemon=True)
+    thread.start()
+    return thread
+
+
+def relatorio_inicializacao() -> str:
+    """Resumo dos tempos de inicialização (marcos e imports mais lentos primeiro)."""
+    with _TRAVA:
+        marcos = sorted(_MARCOS.items(), key=lambda item: item[1])
+        duracoes = sorted(_DURACOES_IMPORT.items(), key=lambda item: item[1], reverse=True)
+    linhas = ["INFO: Tempos de inicialização (desde o início do processo):"]
+    linhas += [f"  {evento:<38} {segundos * 1000:8.0f} ms" for evento, segundos in marcos]
+    if duracoes:
+        linhas.append("  Carregado em segundo plano / no primeiro uso:")
+        linhas += [f"    {nome:<36} {segundos * 1000:8.0f} ms" for nome, segundos in duracoes]
+    return "\n".join(linhas)
+
+
+def tempos_inicializacao() -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Cópias dos marcos e das durações (em segundos), para medições externas."""
+    with _TRAVA:
+        return dict(_MARCOS), dict(_DURACOES_IMPORT)
@@ -0,0 +1,172 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple, Union
+
+# =================================================================
+# --- DADOS DE ENTRADA DOS RELATÓRIOS DE IA ---
+# =================================================================
+#
+# data_manager.preparar_dados_para_ia monta um destes objetos com os números já
+# calculados; os analisadores do motor manual (ai_module) os leem diretamente.
+# O texto "Chave: valor" só é gerado (para_texto) quando os dados vão no prompt
+# do Gemini. Textos no formato antigo continuam aceitos: de_texto os converte
+# com as mesmas expressões regulares usadas antes.
+#
+# Mensagens "AVISO: ..." / "ERRO: ..." (dados insuficientes) continuam sendo str.
+
+
+@dataclass(slots=True)
+class DadosRelatorioAluno:
+    """Médias ponderadas do aluno por disciplina (2 casas), ordenadas pelo nome da disciplina."""
+    nome: str
+    notas: List[Tuple[str, float]] = field(default_factory=list)
+
+    def para_texto(self) -> str:
+        linhas = [f"RELATORIO_NOTAS_ALUNO: {self.nome}"]
+        if not self.notas:
+            linhas.append("RELATORIO_NOTAS: Aluno não possui notas registradas.")
+        linhas += [f"{disciplina}: {media:.2f}" for disciplina, media in self.notas]
+        return "\n".join(linhas)
+
+    @classmethod
+    def de_texto(cls, texto: str) -> 'DadosRelatorioAluno':
+        """Converte o texto "Disciplina: nota" (uma por linha) do formato antigo."""
+        regex_nota = re.compile(r'([^:]+):\s*([\d\.\,]+)')
+        notas: List[Tuple[str, float]] = []
+        for linha in texto.strip().split('\n'):
+            if 'RELATORIO_NOTAS:' in linha:
+                continue
+            match = regex_nota.search(linha)
+            if match:
+                disciplina, nota_str = match.groups()
+                try:
+                    # Converte para float, garantindo que vírgulas sejam pontos
+                    notas.append((disciplina.strip(), float(nota_str.replace(',', '.').strip())))
+                except ValueError:
+                    pass  # Ignora notas inválidas
+        return cls(nome='', notas=notas)
+
+
+@dataclass(slots=True)
+class ResumoAtividade:
+    """Distribuição das notas de uma atividade (ver estatisticas); quartis None sem notas lançadas."""
+    nome: str
+    disciplina: str
+    notas: int
+    faltantes: int
+    q1: Optional[float] = None
+    mediana: Optional[float] = None
+    q3: Optional[float] = None
+
+    def para_texto(self) -> str:
+        def fmt(valor: Optional[float]) -> str:
+            return 'N/A' if valor is None else f"{valor:.2f}"
+        return (f"Atividade: {self.nome} ({self.disciplina}) | Notas: {self.notas} | Faltantes: {self.faltantes}"
+                f" | Q1: {fmt(self.q1)} | Mediana: {fmt(self.mediana)} | Q3: {fmt(self.q3)}")
+
+
+@dataclass(slots=True)
+class DadosRelatorioProfessor:
+    """
+    Média e desvio padrão das médias dos alunos nas turmas do professor.
+    total_turmas é None quando turmas.csv não tem a coluna do professor responsável;
+    aviso guarda a linha INFO/ERRO que acompanha esses casos.
+    """
+    nome: str
+    total_turmas: Optional[int] = None
+    media_turma: float = 0.0
+    desvio_padrao: float = 0.0
+    turmas: List[Tuple[str, str]] = field(default_factory=list)  # (disciplina, código)
+    aviso: Optional[str] = None
+    atividades: List[ResumoAtividade] = field(default_factory=list)
+
+    def para_texto(self) -> str:
+        linhas = [f"RELATORIO_PROFESSOR: {self.nome}"]
+        if self.total_turmas is not None:
+            linhas.append(f"Total_Turmas: {self.total_turmas}")
+        if self.aviso:
+            linhas.append(self.aviso)
+        linhas.append(f"Media_Turma: {self.media_turma:.2f}")
+        linhas.append(f"Desvio_Padrao: {self.desvio_padrao:.2f}")
+        linhas += [f"Turma: {disciplina} ({codigo})" for disciplina, codigo in self.turmas]
+        linhas += [atividade.para_texto() for atividade in self.atividades]
+        return "\n".join(linhas)
+
+    @classmethod
+    def de_texto(cls, texto: str) -> 'DadosRelatorioProfessor':
+        def buscar_decimal(chave: str) -> float:
+            match = re.search(rf'{chave}:\s*([\d\.\,]+)', texto)
+            try:
+                # Substitui vírgula por ponto (caso venha no formato brasileiro)
+                return float(match.group(1).replace(',', '.')) if match else 0.0
+            except ValueError:
+                return 0.0
+
+        match_turmas = re.search(r'Total_Turmas:\s*(\d+)', texto)
+        return cls(
+            nome='',
+            total_turmas=int(match_turmas.group(1)) if match_turmas else None,
+            media_turma=buscar_decimal('Media_Turma'),
+            desvio_padrao=buscar_decimal('Desvio_Padrao'),
+        )
+
+
+@dataclass(slots=True)
+class DadosRelatorioAdmin:
+    """
+    Totais institucionais e taxa de evasão (fração) da coorte de semestre_evasao,
+    o semestre mais recente já medido (ver retencao). None se ainda não há medida.
+    """
+    total_alunos: int = 0
+    total_professores: int = 0
+    total_turmas: int = 0
+    taxa_evasao: Optional[float] = None
+    semestre_evasao: Optional[str] = None
+
+    def para_texto(self) -> str:
+        linhas = [
+            "RELATORIO_ADMINISTRADOR:",
+            f"Total_Alunos: {self.total_alunos}",
+            f"Total_Professores: {self.total_professores}",
+            f"Total_Turmas: {self.total_turmas}",
+        ]
+        if self.taxa_evasao is not None:
+            linhas.append(f"Taxa_Evasao_Ultimo_Semestre: {self.taxa_evasao:.4f}")
+        if self.semestre_evasao is not None:
+            linhas.append(f"Semestre_Evasao: {self.semestre_evasao}")
+        return "\n".join(linhas)
+
+    @classmethod
+    def de_texto(cls, texto: str) -> 'DadosRelatorioAdmin':
+        def buscar_total(chave: str) -> int:
+            match = re.search(rf'{chave}:\s*(\d+)', texto)
+            return int(match.group(1)) if match else 0
+
+        match_evasao = re.search(r'Taxa_Evasao_Ultimo_Semestre:\s*([\d\.]+)', texto)
+        try:
+            taxa_evasao = float(match_evasao.group(1)) if match_evasao else None
+        except ValueError:
+            taxa_evasao = None
+        match_semestre = re.search(r'Semestre_Evasao:\s*(\S+)', texto)
+        return cls(
+            total_alunos=buscar_total('Total_Alunos'),
+            total_professores=buscar_total('Total_Professores'),
+            total_turmas=buscar_total('Total_Turmas'),
+            taxa_evasao=taxa_evasao,
+            semestre_evasao=match_semestre.group(1) if match_semestre else None,
+        )
+
+
+DadosRelatorio = Union[DadosRelatorioAluno, DadosRelatorioProfessor, DadosRelatorioAdmin]
+
+
+def texto_para_ia(dados: Union[DadosRelatorio, str]) -> str:
+    """Texto enviado no prompt: objetos são serializados, textos passam como estão."""
+    return dados if isinstance(dados, str) else dados.para_texto()
+
+
+def eh_dado_insuficiente(dados: Any) -> bool:
+    """True para o retorno vazio ou para as mensagens "AVISO: ..." / "ERRO: ..." de preparar_dados_para_ia."""
+    if isinstance(dados, str):
+        return not dados.strip() or dados.strip().startswith(('AVISO:', 'ERRO:'))
+    return dados is None
@@ -1,7 +1,25 @@
 import pandas as pd
+import numpy as np
 import os
-from typing import Optional, Dict, Tuple, List
+import io
+import csv
+import codecs
+import importlib.util
+import json
+import shutil
+import hashlib
+import hmac
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Tuple, List, Any, Callable, Union
 from pandas.errors import ParserError
+from visao_notas import VisaoNotas, construir_visao_notas
+from retencao import VisaoRetencao, construir_visao_retencao
+from estatisticas import EstatisticasNotas, calcular_estatisticas_notas
+from formato_binario import carregar_tabela_binaria
+from diario_gravacoes import DiarioGravacoes
+from dados_relatorio import DadosRelatorio, DadosRelatorioAdmin, DadosRelatorioAluno, DadosRelatorioProfessor, ResumoAtividade
 
 # -----------------------------------------------------------------
 # --- CONFIGURAÇÃO E VARIÁVEIS GLOBAIS ---
@@ -21,73 +39,183 @@ ARQUIVOS_CSV = {
     'notas': 'notas.csv'
 }
 
+# Snapshots binários (pickle) das tabelas já tratadas, guardados ao lado dos CSVs.
+# Cada snapshot é validado pelo mtime, tamanho e hash SHA-256 do CSV de origem.
+CAMINHO_CACHE_DADOS = os.path.join(CAMINHO_BASE_DADOS, '.cache')
+VERSAO_CACHE = 2  # Incrementar sempre que o tratamento das tabelas mudar
+
+# Esquema declarado de cada tabela, aplicado uma única vez no carregamento.
+# Tipos: 'id' (inteiro), 'decimal' (float), 'data' (dd/mm/aaaa) e 'categoria'.
+# Colunas não declaradas permanecem como texto (sem espaços nas bordas).
+ESQUEMAS_TABELAS: Dict[str, Dict[str, str]] = {
+    'aluno': {'ID': 'id'},
+    'professor': {'ID': 'id'},
+    'admin': {'ID': 'id'},
+    'turmas': {'ID': 'id', 'Semestre': 'categoria', 'ID_Professor_Responsavel': 'id'},
+    'matriculas': {'ID_Aluno': 'id', 'ID_Turma': 'id'},
+    'atividades': {'ID': 'id', 'ID_Turma': 'id', 'Peso': 'decimal', 'Data_Entrega': 'data'},
+    'notas': {'ID_Atividade': 'id', 'ID_Aluno': 'id', 'Nota': 'decimal'},
+}
+FORMATO_DATA_CSV = '%d/%m/%Y'
+
+# Leitura dos CSVs: as tabelas são carregadas em paralelo (uma thread por arquivo),
+# com o motor pyarrow quando instalado. A codificação é detectada por uma amostra
+# do início do arquivo, em vez de uma análise completa que falha em UTF-8.
+MOTOR_CSV = 'pyarrow' if importlib.util.find_spec('pyarrow') is not None else 'c'
+TAMANHO_AMOSTRA_CODIFICACAO = 64 * 1024
+MAX_THREADS_CARGA = len(ARQUIVOS_CSV)
+
+# Tabelas grandes lidas em blocos: cada bloco de texto é convertido para o esquema
+# (colunas numéricas) e descartado, sem montar o DataFrame inteiro de strings.
+# Só vale para tabelas sem colunas 'categoria' (categorias de blocos diferentes não se juntam).
+TABELAS_LEITURA_EM_BLOCOS = {'notas'}
+LIMIAR_LEITURA_EM_BLOCOS = 16 * 1024 * 1024  # Bytes; arquivos menores são lidos de uma vez
+LINHAS_POR_BLOCO_CSV = 250_000
+
+# Arquivos .bin gravados pelo backend C (structs de estruturas.h, ver formato_binario.py).
+# Quando presentes e não mais antigos que o CSV, são mapeados em memória em vez de analisar o texto.
+USAR_FORMATO_BINARIO = True
+
+# Armazenamento: 'csv' (padrão, os mesmos arquivos do backend C) ou 'sqlite' (banco
+# com índices, importado dos CSVs na primeira execução; ver armazenamento_sqlite.py).
+BACKEND_ARMAZENAMENTO = os.environ.get('ARMAZENAMENTO_DADOS', 'csv').strip().lower()
+CAMINHO_BANCO_SQLITE = os.environ.get('BANCO_SQLITE_DADOS', os.path.join(CAMINHO_BASE_DADOS, 'academico.sqlite3'))
+
+# Gravações pelo Python no modo CSV: cada lote é um commit no diário (uma linha + um fsync);
+# a compactação leva os lotes para os CSVs em segundo plano (ver diario_gravacoes.py).
+CAMINHO_DIARIO_GRAVACOES = os.path.join(CAMINHO_BASE_DADOS, 'diario_gravacoes.jsonl')
+ATRASO_COMPACTACAO_S = 2.0  # Espera após o último lote, para juntar edições seguidas em uma regravação
+
 DADOS_ACADEMICOS: Dict[str, pd.DataFrame] = {}
-USUARIOS_CREDENCIAS: Dict[str, Dict[str, Tuple[str, str, str, str]]] = {}
+# Índice de login: login (minúsculo) -> ((tipo, id_usuario, nome_usuario, chave_senha), ...)
+# Normalmente há uma única entrada por login; logins repetidos entre tipos ficam na ordem aluno, professor, admin.
+INDICE_LOGIN: Dict[str, Tuple[Tuple[str, str, str, bytes], ...]] = {}
+INDICE_ACADEMICO: Optional['IndiceAcademico'] = None
+VISAO_NOTAS: Optional[VisaoNotas] = None
+VISAO_RETENCAO: Optional[VisaoRetencao] = None
+_ESTATISTICAS_NOTAS: Optional[Tuple[int, EstatisticasNotas]] = None  # (VERSAO_DADOS, estatísticas)
 DADOS_CARREGADOS = False
 
+# Recarga a quente: o monitor compara mtime/tamanho dos CSVs e recarrega só o que mudou.
+# VERSAO_DADOS é incrementada a cada troca, para as telas saberem quando redesenhar.
+VERSAO_DADOS = 0
+TRAVA_DADOS = threading.RLock()
+INTERVALO_MONITORAMENTO_S = 2.0
+TABELAS_SOMENTE_ACRESCIMO = {'notas'}  # O backend C apenas acrescenta linhas ao fim destes arquivos
+TAMANHO_ASSINATURA_CAUDA = 4096  # Bytes finais usados para confirmar que o início do arquivo não mudou
+
 # -----------------------------------------------------------------
 # --- CRIPTOGRAFIA/DESCRIPTOGRAFIA ---
 # -----------------------------------------------------------------
 
 CHAVE_CRIPTOGRAFIA = 5
 
+# Senhas com hash salgado: "pbkdf2_sha256$<iterações>$<salt hex>$<hash hex>".
+# Valores sem esse prefixo continuam sendo tratados como Cifra de César (formato do backend C).
+PREFIXO_HASH_SENHA = 'pbkdf2_sha256'
+ITERACOES_HASH_SENHA = 200_000
+
 def _criptografar_string(texto: str) -> str:
     """Criptografa uma string usando um deslocamento simples (Cifra de César)."""
-    resultado = ""
-    for char in texto:
-        resultado += chr(ord(char) + CHAVE_CRIPTOGRAFIA)
-    return resultado
+    return "".join(chr(ord(char) + CHAVE_CRIPTOGRAFIA) for char in texto)
 
 def _descriptografar_string(texto: str) -> str:
     """Descriptografa uma string usando um deslocamento simples (Cifra de César)."""
-    resultado = ""
-    for char in texto:
-        resultado += chr(ord(char) - CHAVE_CRIPTOGRAFIA)
-    return resultado
+    return "".join(chr(ord(char) - CHAVE_CRIPTOGRAFIA) for char in texto)
+
+def _deslocar_codigos(valores: np.ndarray, deslocamento: int) -> np.ndarray:
+    """Soma `deslocamento` a todos os code points de um array de texto (dtype 'U') de uma vez."""
+    valores = np.asarray(valores, dtype=str)
+    if valores.size == 0:
+        return valores.copy()
+    # Cada caractere de um array '<U{n}' é um inteiro de 32 bits; zeros são o preenchimento
+    codigos = valores.view(np.uint32).astype(np.int64)
+    preenchidos = codigos != 0
+    codigos[preenchidos] += deslocamento
+    if codigos.min() < 0 or codigos.max() > 0x10FFFF:
+        raise ValueError("Deslocamento gera caracteres fora do intervalo Unicode.")
+    return codigos.astype(np.uint32).view(valores.dtype)
+
+def _deslocar_em_lote(valores, deslocamento: int):
+    if isinstance(valores, pd.Series):
+        presentes = valores.notna()
+        if presentes.all():
+            return pd.Series(_deslocar_codigos(valores.to_numpy(dtype=str), deslocamento), index=valores.index, name=valores.name, dtype=object)
+        resultado = valores.astype(object)
+        if presentes.any():
+            resultado[presentes] = _deslocar_codigos(valores[presentes].to_numpy(dtype=str), deslocamento)
+        return resultado
+    return _deslocar_codigos(valores, deslocamento)
+
+def criptografar_em_lote(valores, chave: int = CHAVE_CRIPTOGRAFIA):
+    """Versão vetorizada de _criptografar_string para uma Series (NaN preservado) ou array NumPy."""
+    return _deslocar_em_lote(valores, chave)
+
+def descriptografar_em_lote(valores, chave: int = CHAVE_CRIPTOGRAFIA):
+    """Versão vetorizada de _descriptografar_string para uma Series (NaN preservado) ou array NumPy."""
+    return _deslocar_em_lote(valores, -chave)
+
+def gerar_hash_senha(senha: str, iteracoes: int = ITERACOES_HASH_SENHA, salt: Optional[bytes] = None) -> str:
+    """Gera o hash PBKDF2-SHA256 (com salt aleatório) no formato aceito pelo login."""
+    salt = os.urandom(16) if salt is None else salt
+    digest = hashlib.pbkdf2_hmac('sha256', senha.encode('utf-8'), salt, iteracoes)
+    return f"{PREFIXO_HASH_SENHA}${iteracoes}${salt.hex()}${digest.hex()}"
+
+def _verificar_senha(senha_plana: str, chave_senha: bytes) -> bool:
+    """Compara a senha digitada com a armazenada em tempo constante (hash PBKDF2 ou César)."""
+    if chave_senha.startswith(PREFIXO_HASH_SENHA.encode('ascii') + b'$'):
+        try:
+            _, iteracoes, salt_hex, hash_hex = chave_senha.decode('ascii').split('$')
+            digest = hashlib.pbkdf2_hmac('sha256', senha_plana.encode('utf-8'), bytes.fromhex(salt_hex), int(iteracoes))
+            return hmac.compare_digest(digest, bytes.fromhex(hash_hex))
+        except ValueError:
+            return False
+    # César: cifra a entrada uma vez e compara com o valor guardado (sem decifrar o armazenado)
+    return hmac.compare_digest(_criptografar_string(senha_plana).encode('utf-8', 'surrogatepass'), chave_senha)
 
 # -----------------------------------------------------------------
 # --- FUNÇÕES DE CARREGAMENTO E AUTENTICAÇÃO ---
 # -----------------------------------------------------------------
 
-def _carregar_df_csv(nome_chave: str, nome_arquivo: str) -> Optional[pd.DataFrame]:
-    """Tenta carregar um DataFrame de um CSV, tratando caminhos e erros."""
+def resolver_caminho_csv(nome_chave: str, nome_arquivo: str) -> Optional[str]:
+    """Localiza o CSV nos caminhos conhecidos. Retorna None se não encontrar."""
     # Tenta carregar o arquivo a partir do diretório do script (caso de execução direta)
     caminho_completo_script = os.path.join(DIRETORIO_SCRIPT, nome_arquivo)
     
     # Tenta carregar o arquivo a partir do CAMINHO_BASE_DADOS (caso de execução no sistema)
     caminho_completo_base = os.path.join(CAMINHO_BASE_DADOS, nome_arquivo)
     
-    caminho_final = None
     if os.path.exists(caminho_completo_script):
-        caminho_final = caminho_completo_script
+        return caminho_completo_script
     elif os.path.exists(caminho_completo_base):
-        caminho_final = caminho_completo_base
-    else:
-        # Tenta carregar o arquivo no diretório pai ou atual (Fallback)
-        if os.path.exists(os.path.join(DIRETORIO_SCRIPT, '..', nome_arquivo)):
-            caminho_final = os.path.join(DIRETORIO_SCRIPT, '..', nome_arquivo)
-        elif os.path.exists(os.path.join(DIRETORIO_SCRIPT, nome_arquivo)):
-            caminho_final = os.path.join(DIRETORIO_SCRIPT, nome_arquivo)
-        else:
-            print(f"AVISO: Arquivo CSV não encontrado para {nome_chave} nos caminhos esperados.")
+        return caminho_completo_base
+    # Tenta carregar o arquivo no diretório pai (Fallback)
+    elif os.path.exists(os.path.join(DIRETORIO_SCRIPT, '..', nome_arquivo)):
+        return os.path.join(DIRETORIO_SCRIPT, '..', nome_arquivo)
+
+    print(f"AVISO: Arquivo CSV não encontrado para {nome_chave} nos caminhos esperados.")
+    return None
+
+
+def _carregar_df_csv(nome_chave: str, nome_arquivo: str, caminho_final: Optional[str] = None) -> Optional[pd.DataFrame]:
+    """Tenta carregar um DataFrame de um CSV, tratando caminhos e erros."""
+    if caminho_final is None:
+        caminho_final = resolver_caminho_csv(nome_chave, nome_arquivo)
+        if caminho_final is None:
             return pd.DataFrame() 
 
     try:
-        # Tenta carregar, forçando a codificação UTF-8 ou Latin-1
-        # IMPORTANTE: dtype=str garante que IDs numéricos não quebrem comparações com strings
+        with open(caminho_final, 'rb') as f:
+            codificacao = _detectar_codificacao(f.read(TAMANHO_AMOSTRA_CODIFICACAO))
+        em_blocos = nome_chave in TABELAS_LEITURA_EM_BLOCOS and os.path.getsize(caminho_final) > LIMIAR_LEITURA_EM_BLOCOS
+        ler = _ler_csv_em_blocos if em_blocos else (lambda chave, origem, cod: _normalizar_df_lido(chave, _ler_csv(origem, cod)))
         try:
-            df = pd.read_csv(caminho_final, encoding='utf-8', dtype=str)
-        except UnicodeDecodeError:
-            df = pd.read_csv(caminho_final, encoding='latin-1', dtype=str)
-            
-        # Limpa espaços em branco nos nomes das colunas (ex: " ID " vira "ID")
-        df.columns = df.columns.str.strip()
-        
-        # Limpa espaços em branco em TODOS os valores de texto da tabela
-        # Isso resolve problemas onde "1 " (com espaço) não bate com "1"
-        df = df.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-        
-        return df
+            return ler(nome_chave, caminho_final, codificacao)
+        except (UnicodeDecodeError, ValueError):
+            # Byte inválido depois da amostra (o pyarrow acusa como ValueError): única releitura
+            if codificacao == 'latin-1':
+                raise
+            return ler(nome_chave, caminho_final, 'latin-1')
 
     except ParserError as e:
         print(f"ERRO: Falha ao analisar o CSV '{nome_arquivo}'. Verifique a formatação: {e}")
@@ -96,31 +224,939 @@ def _carregar_df_csv(nome_chave: str, nome_arquivo: str) -> Optional[pd.DataFram
         
     return pd.DataFrame()
 
+def _detectar_codificacao(amostra: bytes) -> str:
+    """UTF-8 (com ou sem BOM) se a amostra for UTF-8 válido; caso contrário, Latin-1."""
+    if amostra.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # final=False: um caractere multibyte cortado no fim da amostra não conta como erro
+        codecs.getincrementaldecoder('utf-8')().decode(amostra, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+def ler_csv_texto(caminho: str, separadores: str = ',') -> pd.DataFrame:
+    """
+    Lê um CSV externo (ex: planilha exportada) com a mesma detecção de codificação
+    das tabelas: todas as colunas como texto e células vazias como ''. O separador
+    é, entre `separadores`, o que mais aparece no cabeçalho.
+    """
+    codificacao = _detectar_codificacao(_ler_trecho(caminho, 0, TAMANHO_AMOSTRA_CODIFICACAO))
+    with open(caminho, 'r', encoding=codificacao) as f:
+        cabecalho = f.readline()
+    separador = max(separadores, key=cabecalho.count)  # Empate: o primeiro da lista
+    return pd.read_csv(caminho, sep=separador, encoding=codificacao, dtype=str, keep_default_na=False)
+
+def _ler_csv(origem, codificacao: str) -> pd.DataFrame:
+    # IMPORTANTE: dtype=str garante que IDs numéricos não quebrem comparações com strings
+    return pd.read_csv(origem, encoding=codificacao, dtype=str, engine=MOTOR_CSV)
+
+def _ler_csv_em_blocos(nome_chave: str, caminho: str, codificacao: str) -> pd.DataFrame:
+    """
+    Leitura em streaming: o pico de memória fica em um bloco de texto
+    (LINHAS_POR_BLOCO_CSV linhas) mais as colunas já tipadas acumuladas.
+    """
+    # O motor pyarrow não lê em blocos; aqui é sempre o motor C
+    with pd.read_csv(caminho, encoding=codificacao, dtype=str, chunksize=LINHAS_POR_BLOCO_CSV, engine='c') as leitor:
+        partes = [_normalizar_df_lido(nome_chave, bloco) for bloco in leitor]
+    if not partes:
+        return _normalizar_df_lido(nome_chave, _ler_csv(caminho, codificacao))
+    return pd.concat(partes, ignore_index=True)
+
+def _normalizar_df_lido(nome_chave: str, df: pd.DataFrame) -> pd.DataFrame:
+    """Limpa espaços de colunas e valores e aplica o esquema da tabela."""
+    # Limpa espaços em branco nos nomes das colunas (ex: " ID " vira "ID")
+    df.columns = df.columns.str.strip()
+    
+    # Limpa espaços em branco em TODOS os valores de texto da tabela
+    # Isso resolve problemas onde "1 " (com espaço) não bate com "1"
+    # (só colunas de texto: .str falha em colunas numéricas ou inteiramente vazias)
+    df = df.apply(lambda x: x.str.strip() if pd.api.types.is_string_dtype(x.dtype) else x)
+    
+    return aplicar_esquema(nome_chave, df)
+
+def aplicar_esquema(nome_chave: str, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas declaradas em ESQUEMAS_TABELAS para seus tipos definitivos.
+    Linhas com IDs inválidos são descartadas (o backend C também não as reconhece).
+    """
+    esquema = ESQUEMAS_TABELAS.get(nome_chave, {})
+    colunas_id = [c for c, tipo in esquema.items() if tipo == 'id' and c in df.columns]
+
+    if colunas_id:
+        ids = df[colunas_id].apply(pd.to_numeric, errors='coerce')
+        validas = ids.notna().all(axis=1)
+        if not validas.all():
+            print(f"AVISO: {int((~validas).sum())} linha(s) de '{nome_chave}' ignoradas por ID inválido.")
+            df = df[validas].reset_index(drop=True)
+            ids = ids[validas].reset_index(drop=True)
+        for coluna in colunas_id:
+            df[coluna] = ids[coluna].astype('int32')
+
+    for coluna, tipo in esquema.items():
+        if coluna not in df.columns:
+            continue
+        if tipo == 'decimal' and pd.api.types.is_numeric_dtype(df[coluna]):
+            df[coluna] = df[coluna].astype('float64')  # Já numérico (formato binário)
+        elif tipo == 'decimal':
+            # astype(str): lotes vindos do Python podem misturar números e textos ("8,0") na mesma coluna
+            df[coluna] = pd.to_numeric(df[coluna].astype(str).str.replace(',', '.', regex=False), errors='coerce').astype('float64')
+        elif tipo == 'data':
+            df[coluna] = pd.to_datetime(df[coluna], format=FORMATO_DATA_CSV, errors='coerce')
+        elif tipo == 'categoria':
+            df[coluna] = df[coluna].astype('category')
+
+    return df
+
+
+def converter_id(valor: Any) -> Optional[int]:
+    """Converte um ID recebido da interface (texto ou número) para o inteiro usado nas tabelas."""
+    try:
+        return int(str(valor).strip())
+    except (TypeError, ValueError):
+        return None
+
+# -----------------------------------------------------------------
+# --- CACHE DE SNAPSHOTS BINÁRIOS ---
+# -----------------------------------------------------------------
+
+def _hash_arquivo(caminho: str) -> str:
+    """Calcula o SHA-256 do arquivo lendo em blocos (sem carregar tudo na memória)."""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1 << 20), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminhos_snapshot(nome_chave: str) -> Tuple[str, str]:
+    """Retorna (arquivo do snapshot, arquivo de metadados) de uma tabela."""
+    return (
+        os.path.join(CAMINHO_CACHE_DADOS, f"{nome_chave}.pkl"),
+        os.path.join(CAMINHO_CACHE_DADOS, f"{nome_chave}.json"),
+    )
+
+
+def _ler_meta_snapshot(nome_chave: str) -> Optional[Dict[str, Any]]:
+    """Lê os metadados do snapshot. Retorna None se ausentes, corrompidos ou de outra versão."""
+    _, caminho_meta = _caminhos_snapshot(nome_chave)
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('versao') != VERSAO_CACHE:
+        return None
+    return meta
+
+
+def gravar_arquivo_atomico(caminho: str, escrever) -> None:
+    """Escreve em um arquivo temporário e o renomeia, evitando snapshots pela metade."""
+    caminho_tmp = f"{caminho}.tmp"
+    escrever(caminho_tmp)
+    os.replace(caminho_tmp, caminho)
+
+
+def _gravar_snapshot(nome_chave: str, df: pd.DataFrame, meta: Dict[str, Any]) -> None:
+    """Grava o snapshot e seus metadados. Falhas apenas desativam o cache."""
+    caminho_pkl, caminho_meta = _caminhos_snapshot(nome_chave)
+    try:
+        os.makedirs(CAMINHO_CACHE_DADOS, exist_ok=True)
+        gravar_arquivo_atomico(caminho_pkl, lambda c: df.to_pickle(c))
+
+        def escrever_meta(c):
+            with open(c, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+        # Os metadados são gravados por último: só validam um snapshot já completo
+        gravar_arquivo_atomico(caminho_meta, escrever_meta)
+    except Exception as e:
+        print(f"AVISO: Não foi possível gravar o cache de '{nome_chave}': {e}")
+
+
+def _carregar_df_com_cache(nome_chave: str, nome_arquivo: str) -> Optional[pd.DataFrame]:
+    """
+    Carrega a tabela a partir do snapshot binário quando o CSV não mudou.
+    Se mtime e tamanho batem, o snapshot é usado sem reler o CSV; se apenas
+    o mtime mudou (ex: arquivo regravado com o mesmo conteúdo), o hash decide.
+    Caso contrário o CSV é analisado novamente e o snapshot é atualizado.
+    """
+    caminho_csv = resolver_caminho_csv(nome_chave, nome_arquivo)
+    if caminho_csv is None:
+        return pd.DataFrame()
+
+    if USAR_FORMATO_BINARIO:
+        df = carregar_tabela_binaria(caminho_csv, nome_chave)
+        if df is not None:
+            return aplicar_esquema(nome_chave, df)
+
+    caminho_pkl, _ = _caminhos_snapshot(nome_chave)
+    stat = os.stat(caminho_csv)
+    meta = _ler_meta_snapshot(nome_chave)
+    if meta is not None and meta.get('caminho') != os.path.abspath(caminho_csv):
+        meta = None
+
+    sha = None
+    if meta is not None:
+        mesmo_arquivo = meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('tamanho') == stat.st_size
+        if not mesmo_arquivo and meta.get('tamanho') == stat.st_size:
+            sha = _hash_arquivo(caminho_csv)
+            mesmo_arquivo = meta.get('sha256') == sha
+
+        if mesmo_arquivo:
+            try:
+                df = pd.read_pickle(caminho_pkl)
+                if meta.get('mtime_ns') != stat.st_mtime_ns:
+                    meta['mtime_ns'] = stat.st_mtime_ns
+                    _gravar_snapshot(nome_chave, df, meta)
+                return df
+            except Exception as e:
+                print(f"AVISO: Cache de '{nome_chave}' inválido, recarregando o CSV: {e}")
+
+    df = _carregar_df_csv(nome_chave, nome_arquivo, caminho_csv)
+    # Tabelas com erro de leitura (DataFrame vazio) não são guardadas no cache
+    if df is not None and not df.empty:
+        _gravar_snapshot(nome_chave, df, {
+            'versao': VERSAO_CACHE,
+            'caminho': os.path.abspath(caminho_csv),
+            'mtime_ns': stat.st_mtime_ns,
+            'tamanho': stat.st_size,
+            'sha256': sha if sha is not None else _hash_arquivo(caminho_csv),
+        })
+    return df
+
+
+# -----------------------------------------------------------------
+# --- ÍNDICES EM MEMÓRIA ---
+# -----------------------------------------------------------------
+
+def _indice_unico(df: Optional[pd.DataFrame], coluna: str) -> Dict[int, int]:
+    """Mapeia cada valor da coluna para a posição da PRIMEIRA linha que o contém."""
+    if df is None or df.empty or coluna not in df.columns:
+        return {}
+    valores = df[coluna]
+    primeiras = ~valores.duplicated(keep='first')
+    posicoes = primeiras.to_numpy().nonzero()[0]
+    return dict(zip(valores[primeiras].tolist(), posicoes.tolist()))
+
+
+def _indice_grupos(df: Optional[pd.DataFrame], coluna: str) -> Dict[int, Any]:
+    """Mapeia cada valor da coluna para o array de posições de todas as linhas com esse valor."""
+    if df is None or df.empty or coluna not in df.columns:
+        return {}
+    return df.groupby(coluna, sort=False, observed=True).indices
+
+
+class IndiceAcademico:
+    """
+    Índices hash construídos uma vez sobre DADOS_ACADEMICOS.
+    Substitui as máscaras booleanas (varredura O(N) da tabela inteira) por
+    buscas diretas em dicionário seguidas de um iloc nas posições encontradas.
+    """
+
+    # tabela -> coluna de chave primária
+    CHAVES_PRIMARIAS = {'aluno': 'ID', 'professor': 'ID', 'admin': 'ID', 'turmas': 'ID', 'atividades': 'ID'}
+    # nome do índice -> (tabela, coluna de chave estrangeira)
+    CHAVES_ESTRANGEIRAS = {
+        'matriculas_por_aluno': ('matriculas', 'ID_Aluno'),
+        'matriculas_por_turma': ('matriculas', 'ID_Turma'),
+        'notas_por_aluno': ('notas', 'ID_Aluno'),
+        'notas_por_atividade': ('notas', 'ID_Atividade'),
+        'atividades_por_turma': ('atividades', 'ID_Turma'),
+        'turmas_por_professor': ('turmas', 'ID_Professor_Responsavel'),
+    }
+
+    def __init__(self, dados: Dict[str, pd.DataFrame]):
+        self.dados = dados
+        self._por_id = {tabela: _indice_unico(dados.get(tabela), coluna) for tabela, coluna in self.CHAVES_PRIMARIAS.items()}
+        self._grupos = {nome: _indice_grupos(dados.get(tabela), coluna) for nome, (tabela, coluna) in self.CHAVES_ESTRANGEIRAS.items()}
+
+    def atualizado(self, dados: Dict[str, pd.DataFrame], tabelas_alteradas) -> 'IndiceAcademico':
+        """Novo índice sobre `dados`, reconstruindo apenas os índices das tabelas alteradas."""
+        novo = IndiceAcademico.__new__(IndiceAcademico)
+        novo.dados = dados
+        novo._por_id = {
+            tabela: _indice_unico(dados.get(tabela), coluna) if tabela in tabelas_alteradas else self._por_id[tabela]
+            for tabela, coluna in self.CHAVES_PRIMARIAS.items()
+        }
+        novo._grupos = {
+            nome: _indice_grupos(dados.get(tabela), coluna) if tabela in tabelas_alteradas else self._grupos[nome]
+            for nome, (tabela, coluna) in self.CHAVES_ESTRANGEIRAS.items()
+        }
+        return novo
+
+    def _tabela(self, tabela: str) -> pd.DataFrame:
+        return self.dados.get(tabela, pd.DataFrame())
+
+    # --- Buscas por chave primária ---
+
+    def registro(self, tabela: str, id_registro: Optional[int]) -> Optional[pd.Series]:
+        """Retorna a linha com o ID informado, ou None se não existir."""
+        posicao = self._por_id.get(tabela, {}).get(id_registro)
+        if posicao is None:
+            return None
+        return self._tabela(tabela).iloc[posicao]
+
+    def registros(self, tabela: str, ids) -> pd.DataFrame:
+        """Retorna as linhas dos IDs informados (IDs inexistentes são ignorados)."""
+        indice = self._por_id.get(tabela, {})
+        posicoes = sorted(indice[i] for i in ids if i in indice)
+        return self._tabela(tabela).iloc[posicoes]
+
+    def nome(self, tabela: str, id_registro: Optional[int], padrao: str, coluna: str = 'Nome') -> str:
+        """Retorna a coluna de nome do registro, ou o valor padrão se não encontrado."""
+        linha = self.registro(tabela, id_registro)
+        if linha is None or coluna not in linha.index or pd.isna(linha[coluna]):
+            return padrao
+        return str(linha[coluna])
+
+    def aluno(self, id_aluno: Optional[int]) -> Optional[pd.Series]:
+        return self.registro('aluno', id_aluno)
+
+    def professor(self, id_professor: Optional[int]) -> Optional[pd.Series]:
+        return self.registro('professor', id_professor)
+
+    def turma(self, id_turma: Optional[int]) -> Optional[pd.Series]:
+        return self.registro('turmas', id_turma)
+
+    def atividade(self, id_atividade: Optional[int]) -> Optional[pd.Series]:
+        return self.registro('atividades', id_atividade)
+
+    # --- Buscas por chave estrangeira ---
+
+    def _linhas(self, nome_indice: str, chaves) -> pd.DataFrame:
+        tabela, _ = self.CHAVES_ESTRANGEIRAS[nome_indice]
+        grupos = self._grupos[nome_indice]
+        partes = [grupos[c] for c in chaves if c in grupos]
+        if not partes:
+            return self._tabela(tabela).iloc[0:0]
+        posicoes = partes[0] if len(partes) == 1 else np.sort(np.concatenate(partes))
+        return self._tabela(tabela).iloc[posicoes]
+
+    def matriculas_do_aluno(self, id_aluno: Optional[int]) -> pd.DataFrame:
+        return self._linhas('matriculas_por_aluno', [id_aluno])
+
+    def matriculas_da_turma(self, id_turma: Optional[int]) -> pd.DataFrame:
+        return self._linhas('matriculas_por_turma', [id_turma])
+
+    def matriculas_das_turmas(self, ids_turmas) -> pd.DataFrame:
+        return self._linhas('matriculas_por_turma', ids_turmas)
+
+    def notas_do_aluno(self, id_aluno: Optional[int]) -> pd.DataFrame:
+        return self._linhas('notas_por_aluno', [id_aluno])
+
+    def notas_da_atividade(self, id_atividade: Optional[int]) -> pd.DataFrame:
+        return self._linhas('notas_por_atividade', [id_atividade])
+
+    def notas_das_atividades(self, ids_atividades) -> pd.DataFrame:
+        return self._linhas('notas_por_atividade', ids_atividades)
+
+    def atividades_da_turma(self, id_turma: Optional[int]) -> pd.DataFrame:
+        return self._linhas('atividades_por_turma', [id_turma])
+
+    def atividades_das_turmas(self, ids_turmas) -> pd.DataFrame:
+        return self._linhas('atividades_por_turma', ids_turmas)
+
+    def turmas_do_professor(self, id_professor: Optional[int]) -> pd.DataFrame:
+        return self._linhas('turmas_por_professor', [id_professor])
+
+# -----------------------------------------------------------------
+# --- FUNÇÕES DE CARREGAMENTO (CONTINUAÇÃO) ---
+# -----------------------------------------------------------------
+
+def _carregar_tabela(nome_chave: str, nome_arquivo: str) -> Optional[pd.DataFrame]:
+    # O estado é lido ANTES do CSV: uma alteração durante a carga será vista pelo monitor
+    _registrar_estado_arquivo(nome_chave, nome_arquivo)
+    return _carregar_df_com_cache(nome_chave, nome_arquivo)
+
+def carregar_tabelas_csv(monitorar: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega todas as tabelas, um arquivo por thread (a leitura do CSV/snapshot libera o GIL):
+    o tempo total passa a ser o do maior arquivo, não a soma de todos.
+    """
+    carregar = _carregar_tabela if monitorar else _carregar_df_com_cache
+    with ThreadPoolExecutor(max_workers=MAX_THREADS_CARGA, thread_name_prefix="carga-csv") as executor:
+        futuros = {chave: executor.submit(carregar, chave, arquivo) for chave, arquivo in ARQUIVOS_CSV.items()}
+    return {chave: df for chave, df in ((c, f.result()) for c, f in futuros.items()) if df is not None}
 
 def carregar_dados_academicos():
     """Carrega todos os dados do CSV para as variáveis globais."""
-    global DADOS_ACADEMICOS, USUARIOS_CREDENCIAS, DADOS_CARREGADOS
+    global DADOS_ACADEMICOS, INDICE_LOGIN, INDICE_ACADEMICO, VISAO_NOTAS, VISAO_RETENCAO, DADOS_CARREGADOS
 
     if DADOS_CARREGADOS:
         return
 
-    DADOS_ACADEMICOS = {}
-    USUARIOS_CREDENCIAS = {}
+    # A interface pode carregar em segundo plano (aquecimento) enquanto o login chama esta função
+    with TRAVA_DADOS:
+        if DADOS_CARREGADOS:
+            return
+
+        DADOS_ACADEMICOS = {}
+        INDICE_LOGIN = {}
+
+        # Carregar todos os dados pelo backend de armazenamento configurado
+        DADOS_ACADEMICOS = get_armazenamento().carregar_tabelas()
+
+        # Depois de carregar, construir os índices, as visões de médias e de retenção e as credenciais
+        INDICE_ACADEMICO = IndiceAcademico(DADOS_ACADEMICOS)
+        VISAO_NOTAS = construir_visao_notas(DADOS_ACADEMICOS.get('notas'), DADOS_ACADEMICOS.get('atividades'))
+        VISAO_RETENCAO = construir_visao_retencao(DADOS_ACADEMICOS.get('matriculas'), DADOS_ACADEMICOS.get('turmas'))
+        _carregar_credenciais_e_nomes()
+        DADOS_CARREGADOS = True
+    print("INFO: Dados Acadêmicos e Credenciais carregados.")
+
+# -----------------------------------------------------------------
+# --- RECARGA A QUENTE (MONITORAMENTO DOS CSVs) ---
+# -----------------------------------------------------------------
+
+_ESTADO_ARQUIVOS: Dict[str, Dict[str, Any]] = {}
+_OUVINTES_RECARGA: List[Callable[[List[str]], None]] = []
+_PARAR_MONITOR = threading.Event()
+_THREAD_MONITOR: Optional[threading.Thread] = None
+
+
+def _ler_trecho(caminho: str, inicio: int, fim: int) -> bytes:
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        return f.read(max(fim - inicio, 0))
+
+
+def _estado_arquivo(caminho: str) -> Optional[Dict[str, Any]]:
+    """mtime, tamanho, cabeçalho e últimos bytes do CSV (para validar um acréscimo no fim)."""
+    try:
+        stat = os.stat(caminho)
+        with open(caminho, 'rb') as f:
+            cabecalho = f.readline()
+    except OSError:
+        return None
+    inicio_cauda = max(stat.st_size - TAMANHO_ASSINATURA_CAUDA, 0)
+    return {
+        'caminho': caminho,
+        'mtime_ns': stat.st_mtime_ns,
+        'tamanho': stat.st_size,
+        'cabecalho': cabecalho,
+        'cauda': _ler_trecho(caminho, inicio_cauda, stat.st_size),
+    }
+
+
+def _registrar_estado_arquivo(nome_chave: str, nome_arquivo: str) -> None:
+    caminho = resolver_caminho_csv(nome_chave, nome_arquivo)
+    estado = _estado_arquivo(caminho) if caminho is not None else None
+    if estado is not None:
+        _ESTADO_ARQUIVOS[nome_chave] = estado
+    else:
+        _ESTADO_ARQUIVOS.pop(nome_chave, None)
+
+
+def _ler_acrescimo(nome_chave: str, anterior: Dict[str, Any], atual: Dict[str, Any]) -> Optional[Tuple[pd.DataFrame, Dict[str, Any]]]:
+    """
+    Caminho rápido para arquivos só-acréscimo: se o arquivo apenas cresceu
+    (mesmo cabeçalho e mesmos bytes finais antigos), lê somente as linhas novas.
+    Retorna (linhas novas já tipadas, estado até a última linha completa) ou
+    None quando é preciso recarregar o arquivo inteiro.
+    """
+    caminho, tamanho_antigo = atual['caminho'], anterior['tamanho']
+    cauda_antiga = anterior['cauda']
+    if (
+        nome_chave not in TABELAS_SOMENTE_ACRESCIMO
+        or caminho != anterior['caminho']
+        or atual['tamanho'] <= tamanho_antigo
+        or atual['cabecalho'] != anterior['cabecalho']
+        or not cauda_antiga.endswith(b'\n')
+        or _ler_trecho(caminho, tamanho_antigo - len(cauda_antiga), tamanho_antigo) != cauda_antiga
+    ):
+        return None
+
+    trecho = _ler_trecho(caminho, tamanho_antigo, atual['tamanho'])
+    # Uma linha ainda sendo escrita pelo backend fica para a próxima verificação
+    fim_linhas = trecho.rfind(b'\n') + 1
+    if fim_linhas == 0:
+        return pd.DataFrame(), anterior
+    trecho = trecho[:fim_linhas]
+
+    conteudo = anterior['cabecalho'] + trecho
+    df = _normalizar_df_lido(nome_chave, _ler_csv(io.BytesIO(conteudo), _detectar_codificacao(conteudo)))
+
+    novo_tamanho = tamanho_antigo + fim_linhas
+    estado = dict(atual, tamanho=novo_tamanho, cauda=(cauda_antiga + trecho)[-TAMANHO_ASSINATURA_CAUDA:])
+    return df, estado
+
+
+def verificar_alteracoes_csv() -> List[str]:
+    """
+    Compara cada CSV com o estado da última carga e recarrega apenas as tabelas
+    alteradas. Retorna a lista de tabelas atualizadas (vazia se nada mudou).
+    """
+    if not DADOS_CARREGADOS:
+        return []
+
+    # Sob a trava: uma gravação feita por inserir_registro não é aplicada duas vezes
+    with TRAVA_DADOS:
+        return _verificar_alteracoes_csv()
+
+
+def _verificar_alteracoes_csv() -> List[str]:
+    substituidas: Dict[str, pd.DataFrame] = {}
+    acrescimos: Dict[str, pd.DataFrame] = {}
+    novos_estados: Dict[str, Dict[str, Any]] = {}
 
-    # Carregar todos os dados
     for chave, arquivo in ARQUIVOS_CSV.items():
-        df = _carregar_df_csv(chave, arquivo)
+        anterior = _ESTADO_ARQUIVOS.get(chave)
+        if anterior is None:
+            continue  # CSV ausente na carga inicial: não há o que monitorar
+        atual = _estado_arquivo(anterior['caminho'])
+        if atual is None:
+            continue  # Arquivo removido/em gravação: mantém os dados atuais
+        if (anterior['mtime_ns'], anterior['tamanho']) == (atual['mtime_ns'], atual['tamanho']):
+            continue
+
+        resultado = _ler_acrescimo(chave, anterior, atual)
+        if resultado is not None:
+            df_novas, estado = resultado
+            novos_estados[chave] = estado
+            if not df_novas.empty:
+                acrescimos[chave] = df_novas
+            continue
+
+        df = _carregar_df_com_cache(chave, arquivo)
         if df is not None:
-            DADOS_ACADEMICOS[chave] = df
+            # Linhas ainda no diário (não compactadas) continuam valendo sobre o CSV novo
+            pendentes = _ARMAZENAMENTO.pendentes_da_tabela(chave) if isinstance(_ARMAZENAMENTO, ArmazenamentoCSV) else None
+            if pendentes is not None:
+                df = pd.concat([df, pendentes], ignore_index=True)
+            substituidas[chave] = df
+            novos_estados[chave] = atual
+
+    _ESTADO_ARQUIVOS.update(novos_estados)
+    if not substituidas and not acrescimos:
+        return []
+    return _aplicar_recarga(substituidas, acrescimos)
+
+
+def _aplicar_recarga(substituidas: Dict[str, pd.DataFrame], acrescimos: Dict[str, pd.DataFrame]) -> List[str]:
+    """Monta o novo conjunto de tabelas e o troca de uma vez pelas globais."""
+    global DADOS_ACADEMICOS, INDICE_ACADEMICO, VISAO_NOTAS, VISAO_RETENCAO, VERSAO_DADOS
+    alteradas = sorted(set(substituidas) | set(acrescimos))
+
+    with TRAVA_DADOS:
+        novos = dict(DADOS_ACADEMICOS)
+        novos.update(substituidas)
+        for chave, df_novas in acrescimos.items():
+            novos[chave] = pd.concat([novos[chave], df_novas], ignore_index=True) if chave in novos else df_novas
+
+        indice = INDICE_ACADEMICO.atualizado(novos, alteradas)
+
+        # As visões publicadas não são alteradas (há leitores sem a trava, ex: threads de IA):
+        # a visão de notas recebe apenas os deltas, em uma cópia (ver visao_notas.VisaoNotas)
+        visao_notas = VISAO_NOTAS
+        if {'notas', 'atividades'} & set(alteradas):
+            visao_notas = VISAO_NOTAS.atualizada(
+                substituidas.get('notas'), substituidas.get('atividades'), acrescimos.get('atividades'), acrescimos.get('notas')
+            )
+
+        # Retenção: matrículas novas são incrementais; mudanças em turmas (semestres) refazem a carga
+        visao_retencao = VISAO_RETENCAO
+        if 'turmas' in alteradas or 'matriculas' in substituidas:
+            visao_retencao = construir_visao_retencao(novos.get('matriculas'), novos.get('turmas'))
+        elif 'matriculas' in acrescimos:
+            visao_retencao = VISAO_RETENCAO.atualizada(acrescimos['matriculas'])
+
+        DADOS_ACADEMICOS, INDICE_ACADEMICO, VISAO_NOTAS, VISAO_RETENCAO = novos, indice, visao_notas, visao_retencao
+        if {'aluno', 'professor', 'admin'} & set(alteradas):
+            _carregar_credenciais_e_nomes()
+        VERSAO_DADOS += 1
+
+    print(f"INFO: Tabelas recarregadas: {', '.join(alteradas)} (versão {VERSAO_DADOS}).")
+    for ouvinte in list(_OUVINTES_RECARGA):
+        try:
+            ouvinte(alteradas)
+        except Exception as e:
+            print(f"AVISO: Falha ao notificar recarga de dados: {e}")
+    return alteradas
+
+
+def registrar_ouvinte_recarga(ouvinte: Callable[[List[str]], None]) -> None:
+    """Registra uma função chamada (na thread do monitor) com as tabelas recarregadas."""
+    if ouvinte not in _OUVINTES_RECARGA:
+        _OUVINTES_RECARGA.append(ouvinte)
+
+
+def remover_ouvinte_recarga(ouvinte: Callable[[List[str]], None]) -> None:
+    if ouvinte in _OUVINTES_RECARGA:
+        _OUVINTES_RECARGA.remove(ouvinte)
+
+
+def _laco_monitoramento(intervalo_s: float) -> None:
+    while not _PARAR_MONITOR.wait(intervalo_s):
+        try:
+            verificar_alteracoes_csv()
+        except Exception as e:
+            print(f"ERRO: Falha ao verificar alterações nos CSVs: {e}")
+
+
+def iniciar_monitoramento_dados(intervalo_s: float = INTERVALO_MONITORAMENTO_S) -> None:
+    """Inicia (uma única vez) a thread que verifica periodicamente os CSVs de CAMINHO_BASE_DADOS."""
+    global _THREAD_MONITOR
+    if _THREAD_MONITOR is not None and _THREAD_MONITOR.is_alive():
+        return
+    _PARAR_MONITOR.clear()
+    _THREAD_MONITOR = threading.Thread(target=_laco_monitoramento, args=(intervalo_s,), name="monitor-dados", daemon=True)
+    _THREAD_MONITOR.start()
+
+
+def parar_monitoramento_dados() -> None:
+    _PARAR_MONITOR.set()
+
+
+def get_versao_dados() -> int:
+    """Versão atual dos dados em memória (muda a cada recarga a quente)."""
+    return VERSAO_DADOS
+
+
+# -----------------------------------------------------------------
+# --- ARMAZENAMENTO (CSV OU SQLITE) ---
+# -----------------------------------------------------------------
+
+_ARMAZENAMENTO: Optional['ArmazenamentoDados'] = None
+
+
+class ArmazenamentoDados(ABC):
+    """
+    Interface dos backends de armazenamento. Todas as tabelas seguem as chaves
+    de ARQUIVOS_CSV e as colunas dos CSVs; os DataFrames devolvidos já estão no
+    esquema de ESQUEMAS_TABELAS. Um backend incompleto falha ao ser instanciado.
+    """
+
+    nome = ''
+
+    @abstractmethod
+    def carregar_tabelas(self) -> Dict[str, pd.DataFrame]:
+        """Lê todas as tabelas disponíveis: {chave de ARQUIVOS_CSV: DataFrame}."""
+
+    @abstractmethod
+    def inserir_lote(self, tabelas: Dict[str, pd.DataFrame]) -> None:
+        """Grava as linhas novas de uma ou mais tabelas em um único commit atômico."""
+
+    # --- Consultas dos painéis ---
+
+    @abstractmethod
+    def notas_do_aluno(self, id_aluno: Optional[int]) -> pd.DataFrame:
+        """Notas vigentes do aluno: ID_Turma, Turma, ID_Atividade, Atividade, Peso, Nota."""
+
+    @abstractmethod
+    def medias_por_turma(self) -> pd.DataFrame:
+        """Média, desvio padrão e quantidade de alunos avaliados por turma (COLUNAS_TURMA)."""
+
+    @abstractmethod
+    def matriculas_por_turma(self) -> pd.DataFrame:
+        """Quantidade de alunos matriculados por turma: ID_Turma, Qtd_Alunos."""
+
+
+COLUNAS_NOTAS_DO_ALUNO = ['ID_Turma', 'Turma', 'ID_Atividade', 'Atividade', 'Peso', 'Nota']
+
+
+def _valor_csv(nome_chave: str, coluna: str, valor: Any) -> str:
+    """Valor formatado como o backend C grava (decimais com 2 casas, datas dd/mm/aaaa)."""
+    tipo = ESQUEMAS_TABELAS.get(nome_chave, {}).get(coluna)
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return ''
+    if tipo == 'id':
+        return str(int(valor))
+    if tipo == 'decimal':
+        return f"{float(valor):.2f}"
+    if tipo == 'data' and hasattr(valor, 'strftime'):
+        return valor.strftime(FORMATO_DATA_CSV)
+    return str(valor)
+
+
+def _registros_csv(nome_chave: str, df: pd.DataFrame) -> List[Dict[str, str]]:
+    colunas = [str(c) for c in df.columns]
+    return [
+        {coluna: _valor_csv(nome_chave, coluna, valor) for coluna, valor in zip(colunas, linha)}
+        for linha in df.itertuples(index=False, name=None)
+    ]
+
+
+def terminador_de_linha(caminho: str) -> str:
+    """Terminador (CRLF ou LF) da primeira linha do arquivo, para regravar no mesmo formato."""
+    with open(caminho, 'rb') as f:
+        return '\r\n' if f.readline().endswith(b'\r\n') else '\n'
+
+
+def _formato_csv(caminho: str) -> Tuple[str, List[str], str]:
+    """(codificação, colunas do cabeçalho, terminador de linha) de um CSV existente."""
+    codificacao = _detectar_codificacao(_ler_trecho(caminho, 0, TAMANHO_AMOSTRA_CODIFICACAO)).replace('-sig', '')
+    with open(caminho, 'r', encoding=codificacao, newline='') as f:
+        colunas = [c.strip() for c in next(csv.reader([f.readline().lstrip('\ufeff')]), [])]
+    return codificacao, colunas, terminador_de_linha(caminho)
+
+
+class ArmazenamentoCSV(ArmazenamentoDados):
+    """
+    Os sete CSVs de CAMINHO_BASE_DADOS (formato compartilhado com o backend C).
+    Gravações vão primeiro para o diário e chegam aos CSVs na compactação.
+    """
+
+    nome = 'csv'
+
+    def __init__(self, caminho_diario: Optional[str] = None):
+        self.diario = DiarioGravacoes(caminho_diario or CAMINHO_DIARIO_GRAVACOES)
+        self._compactacao: Optional[threading.Timer] = None
+        self._trava_agenda = threading.Lock()
+
+    def carregar_tabelas(self) -> Dict[str, pd.DataFrame]:
+        dados = carregar_tabelas_csv()
+        # Lotes confirmados no diário e ainda não compactados (ex: queda antes da compactação)
+        pendentes = self.diario.pendentes()
+        for tabela, linhas in pendentes.items():
+            if tabela in ARQUIVOS_CSV:
+                df = self._df_pendente(tabela, linhas)
+                dados[tabela] = pd.concat([dados[tabela], df], ignore_index=True) if tabela in dados else df
+        if pendentes:
+            print(f"INFO: {sum(len(l) for l in pendentes.values())} registro(s) pendentes do diário aplicados.")
+            self.agendar_compactacao()
+        return dados
+
+    def _df_pendente(self, tabela: str, linhas: List[Dict[str, str]]) -> pd.DataFrame:
+        return _normalizar_df_lido(tabela, pd.DataFrame(linhas, dtype=str))
+
+    def pendentes_da_tabela(self, tabela: str) -> Optional[pd.DataFrame]:
+        """Linhas da tabela que estão no diário mas ainda não no CSV."""
+        linhas = self.diario.pendentes().get(tabela)
+        return self._df_pendente(tabela, linhas) if linhas else None
+
+    def inserir_lote(self, tabelas: Dict[str, pd.DataFrame]) -> None:
+        self.diario.registrar({tabela: _registros_csv(tabela, df) for tabela, df in tabelas.items()})
+        self.agendar_compactacao()
+
+    # --- Compactação (diário -> CSVs) ---
+
+    def agendar_compactacao(self, atraso_s: float = ATRASO_COMPACTACAO_S) -> None:
+        """Compacta em segundo plano `atraso_s` segundos depois do último lote."""
+        with self._trava_agenda:
+            if self._compactacao is not None:
+                self._compactacao.cancel()
+            self._compactacao = threading.Timer(atraso_s, self._compactar_em_segundo_plano)
+            self._compactacao.daemon = True
+            self._compactacao.start()
+
+    def _compactar_em_segundo_plano(self) -> None:
+        try:
+            self.compactar()
+        except Exception as e:
+            print(f"ERRO: Falha ao compactar o diário de gravações (os lotes continuam no diário): {e}")
+
+    def compactar(self) -> int:
+        """Leva todos os lotes do diário para os CSVs. Retorna o número de linhas gravadas."""
+        total = 0
+        with TRAVA_DADOS:
+            # Alterações externas (backend C) entram antes, para não serem sobrescritas
+            if DADOS_CARREGADOS:
+                _verificar_alteracoes_csv()
+            while not self.diario.vazio():
+                for tabela, linhas in self.diario.iniciar_compactacao().items():
+                    if tabela in ARQUIVOS_CSV and linhas:
+                        self._acrescentar_ao_csv(tabela, linhas)
+                        total += len(linhas)
+                    self.diario.marcar_compactada(tabela)
+                self.diario.concluir_compactacao()
+        if total:
+            print(f"INFO: Diário compactado: {total} registro(s) gravados nos CSVs.")
+        return total
+
+    def _acrescentar_ao_csv(self, tabela: str, linhas: List[Dict[str, str]]) -> None:
+        """
+        Cópia do CSV + linhas novas em um arquivo temporário, depois rename (atômico).
+        A posição e o hash do acréscimo vão para o diário antes do rename: uma
+        compactação retomada após uma queda não duplica as linhas (ver diario_gravacoes).
+        """
+        arquivo = ARQUIVOS_CSV[tabela]
+        caminho = resolver_caminho_csv(tabela, arquivo) or os.path.join(CAMINHO_BASE_DADOS, arquivo)
+        caminho_tmp = f"{caminho}.tmp"
+        saida = io.StringIO()
+        if os.path.exists(caminho):
+            codificacao, colunas, terminador = _formato_csv(caminho)
+            shutil.copyfile(caminho, caminho_tmp)
+        else:
+            codificacao, colunas, terminador = 'utf-8', list(linhas[0].keys()), '\n'
+            open(caminho_tmp, 'wb').close()
+            csv.writer(saida, lineterminator=terminador).writerow(colunas)
+
+        csv.writer(saida, lineterminator=terminador).writerows([linha.get(c, '') for c in colunas] for linha in linhas)
+        bloco = saida.getvalue().encode(codificacao)
+        with open(caminho_tmp, 'r+b') as f:
+            tamanho = f.seek(0, os.SEEK_END)
+            if tamanho > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    bloco = terminador.encode('ascii') + bloco
+            f.write(bloco)
+            f.flush()
+            os.fsync(f.fileno())
+        self.diario.marcar_acrescimo(tabela, caminho, tamanho, bloco)
+        os.replace(caminho_tmp, caminho)
+        # A regravação é nossa: o monitor não deve aplicar estas linhas de novo
+        _registrar_estado_arquivo(tabela, arquivo)
+
+    def notas_do_aluno(self, id_aluno: Optional[int]) -> pd.DataFrame:
+        indice = get_indice_academico()
+        notas = indice.notas_do_aluno(id_aluno)[['ID_Atividade', 'Nota']].drop_duplicates('ID_Atividade', keep='last')
+        atividades = indice.registros('atividades', notas['ID_Atividade'].tolist())
+        df = notas.merge(
+            atividades[['ID', 'Nome_Atividade', 'ID_Turma', 'Peso']].rename(columns={'ID': 'ID_Atividade', 'Nome_Atividade': 'Atividade'}),
+            on='ID_Atividade'
+        )
+        df['Turma'] = [indice.nome('turmas', t, str(t)) for t in df['ID_Turma'].tolist()]
+        return df[COLUNAS_NOTAS_DO_ALUNO].sort_values(['ID_Turma', 'ID_Atividade'], kind='stable').reset_index(drop=True)
+
+    def medias_por_turma(self) -> pd.DataFrame:
+        return get_visao_notas().turmas.sort_values('ID_Turma').reset_index(drop=True)
+
+    def matriculas_por_turma(self) -> pd.DataFrame:
+        matriculas = get_dados_academicos().get('matriculas', pd.DataFrame(columns=['ID_Aluno', 'ID_Turma']))
+        return (
+            matriculas.groupby('ID_Turma')['ID_Aluno'].nunique()
+            .rename('Qtd_Alunos').reset_index()
+        )
+
+
+def get_armazenamento() -> ArmazenamentoDados:
+    """Backend configurado em BACKEND_ARMAZENAMENTO (criado na primeira chamada)."""
+    global _ARMAZENAMENTO
+    if _ARMAZENAMENTO is None:
+        if BACKEND_ARMAZENAMENTO == 'sqlite':
+            # Importação tardia: o modo CSV (padrão) não carrega o módulo do SQLite
+            from armazenamento_sqlite import ArmazenamentoSQLite
+            _ARMAZENAMENTO = ArmazenamentoSQLite(CAMINHO_BANCO_SQLITE)
+        else:
+            if BACKEND_ARMAZENAMENTO != 'csv':
+                print(f"AVISO: Armazenamento '{BACKEND_ARMAZENAMENTO}' desconhecido. Usando CSV.")
+            _ARMAZENAMENTO = ArmazenamentoCSV()
+    return _ARMAZENAMENTO
+
+
+def gravar_lote(registros: Dict[str, Any]) -> int:
+    """
+    Grava as linhas novas de várias tabelas em um único commit atômico (no modo
+    CSV, uma linha no diário + um fsync) e as aplica aos dados em memória
+    (índices, visão de médias e versão dos dados). Cada tabela recebe uma lista
+    de dicionários ou um DataFrame com as colunas do CSV. Se alguma linha for
+    inválida, nada é gravado. Retorna a quantidade de linhas gravadas.
+    """
+    tabelas: Dict[str, pd.DataFrame] = {}
+    for tabela, linhas in registros.items():
+        if tabela not in ARQUIVOS_CSV:
+            raise KeyError(f"Tabela desconhecida: {tabela}")
+        if len(linhas) == 0:
+            continue
+        df = linhas.copy() if isinstance(linhas, pd.DataFrame) else pd.DataFrame(list(linhas))
+        df = df.reset_index(drop=True)
+        # Decimais preenchidos que não virarem número (ex: "abc") invalidam o lote, como IDs inválidos
+        decimais_preenchidos = {
+            coluna: df[coluna].notna() & df[coluna].astype(str).str.strip().ne('')
+            for coluna, tipo in ESQUEMAS_TABELAS.get(tabela, {}).items() if tipo == 'decimal' and coluna in df.columns
+        }
+        df = aplicar_esquema(tabela, df)
+        if len(df) != len(linhas):
+            raise ValueError(f"Lote de '{tabela}' com {len(linhas) - len(df)} registro(s) de ID inválido. Nada foi gravado.")
+        for coluna, preenchidos in decimais_preenchidos.items():
+            invalidos = int((preenchidos & df[coluna].isna()).sum())
+            if invalidos:
+                raise ValueError(f"Lote de '{tabela}' com {invalidos} valor(es) inválido(s) em '{coluna}'. Nada foi gravado.")
+        tabelas[tabela] = df
+    if not tabelas:
+        return 0
+
+    with TRAVA_DADOS:
+        get_armazenamento().inserir_lote(tabelas)
+        _aplicar_recarga({}, tabelas)
+    return sum(len(df) for df in tabelas.values())
+
+
+class LoteGravacao:
+    """
+    Acumula inclusões e as grava juntas ao sair do bloco `with` (nada é
+    gravado se o bloco terminar com exceção):
+
+        with lote_gravacao() as lote:
+            for id_aluno, nota in notas_digitadas:
+                lote.lancar_nota(id_atividade, id_aluno, nota)
+    """
+
+    def __init__(self):
+        self.registros: Dict[str, List[Dict[str, Any]]] = {}
+        self.gravados = 0
+
+    def incluir(self, tabela: str, registro: Dict[str, Any]) -> None:
+        self.registros.setdefault(tabela, []).append(registro)
+
+    def lancar_nota(self, id_atividade: Any, id_aluno: Any, nota: Any) -> None:
+        self.incluir('notas', {'ID_Atividade': id_atividade, 'ID_Aluno': id_aluno, 'Nota': nota})
+
+    def matricular(self, id_aluno: Any, id_turma: Any) -> None:
+        self.incluir('matriculas', {'ID_Aluno': id_aluno, 'ID_Turma': id_turma})
+
+    def __enter__(self) -> 'LoteGravacao':
+        return self
+
+    def __exit__(self, tipo_excecao, excecao, rastro) -> bool:
+        if tipo_excecao is None:
+            self.gravados = gravar_lote(self.registros)
+        return False
+
+
+def lote_gravacao() -> LoteGravacao:
+    return LoteGravacao()
+
+
+def inserir_registro(tabela: str, registro: Dict[str, Any]) -> None:
+    """Grava uma única linha nova (um lote de um registro)."""
+    gravar_lote({tabela: [registro]})
+
+
+def lancar_notas(notas: List[Tuple[Any, Any, Any]]) -> int:
+    """Lança várias notas (id_atividade, id_aluno, nota) em um único commit."""
+    with lote_gravacao() as lote:
+        for id_atividade, id_aluno, nota in notas:
+            lote.lancar_nota(id_atividade, id_aluno, nota)
+    return lote.gravados
+
+
+def matricular_alunos(matriculas: List[Tuple[Any, Any]]) -> int:
+    """Matricula vários (id_aluno, id_turma) em um único commit; matrículas já existentes são ignoradas."""
+    indice = get_indice_academico()
+    with lote_gravacao() as lote:
+        for id_aluno, id_turma in dict.fromkeys((converter_id(a), converter_id(t)) for a, t in matriculas):
+            ja_matriculado = indice.matriculas_do_aluno(id_aluno)['ID_Turma'].eq(id_turma).any()
+            if not ja_matriculado:
+                lote.matricular(id_aluno, id_turma)
+    return lote.gravados
+
+
+def compactar_diario() -> int:
+    """Leva imediatamente ao CSV os lotes ainda no diário (sem efeito no modo SQLite)."""
+    armazenamento = get_armazenamento()
+    return armazenamento.compactar() if isinstance(armazenamento, ArmazenamentoCSV) else 0
+
+
+def consultar_notas_do_aluno(id_aluno: Any) -> pd.DataFrame:
+    return get_armazenamento().notas_do_aluno(converter_id(id_aluno))
+
+
+def consultar_medias_por_turma() -> pd.DataFrame:
+    return get_armazenamento().medias_por_turma()
+
+
+def consultar_matriculas_por_turma() -> pd.DataFrame:
+    return get_armazenamento().matriculas_por_turma()
 
-    # Depois de carregar, construir as credenciais
-    _carregar_credenciais_e_nomes()
-    DADOS_CARREGADOS = True
-    print("INFO: Dados Acadêmicos e Credenciais carregados.")
 
 def _carregar_credenciais_e_nomes():
-    """Carrega e popula o dicionário USUARIOS_CREDENCIAS, assumindo que senhas no CSV JÁ ESTÃO CRIPTOGRAFADAS."""
-    global USUARIOS_CREDENCIAS
+    """
+    Monta INDICE_LOGIN de forma vetorizada a partir das tabelas de alunos,
+    professores e administradores. As senhas do CSV JÁ ESTÃO CRIPTOGRAFADAS
+    (César) ou com hash; a chave de comparação é guardada pronta, em bytes.
+    """
+    global INDICE_LOGIN
     dados = DADOS_ACADEMICOS
 
     mapa_tipos = {
@@ -129,30 +1165,50 @@ def _carregar_credenciais_e_nomes():
         'admin': 'admin'
     }
 
+    partes = []
     for chave_dados, tipo_usuario in mapa_tipos.items():
         df_usuario = dados.get(chave_dados)
-        USUARIOS_CREDENCIAS[tipo_usuario] = {}
-        
-        if df_usuario is not None and not df_usuario.empty and 'Login' in df_usuario.columns and 'Senha' in df_usuario.columns:
-            for _, row in df_usuario.iterrows():
-                login = str(row.get('Login', '')).strip().lower()
-                # A senha no CSV é tratada como já criptografada
-                senha_armazenada = str(row.get('Senha', '')).strip() 
-                
-                if login and senha_armazenada:
-                    # Não criptografa novamente; armazena a string do CSV
-                    senha_criptografada = senha_armazenada 
-                    id_usuario = str(row.get('ID', '')).strip()
-                    nome_usuario = str(row.get('Nome', f"{tipo_usuario.capitalize()} {id_usuario}")).strip()
-                    
-                    # Armazena (tipo, id_usuario, nome_usuario, senha_criptografada)
-                    USUARIOS_CREDENCIAS[tipo_usuario][login] = (tipo_usuario, id_usuario, nome_usuario, senha_criptografada)
+        if df_usuario is None or df_usuario.empty or 'Login' not in df_usuario.columns or 'Senha' not in df_usuario.columns:
+            continue
+
+        # Os valores já chegam sem espaços nas bordas (_normalizar_df_lido)
+        ids = df_usuario['ID'].astype(str) if 'ID' in df_usuario.columns else pd.Series('', index=df_usuario.index)
+        nomes_padrao = f"{tipo_usuario.capitalize()} " + ids
+        nomes = df_usuario['Nome'].astype(str).where(df_usuario['Nome'].notna(), nomes_padrao) if 'Nome' in df_usuario.columns else nomes_padrao
+        partes.append(pd.DataFrame({
+            'Login': df_usuario['Login'].fillna('').astype(str).str.lower(),
+            'Tipo': tipo_usuario,
+            'ID': ids,
+            'Nome': nomes,
+            'Senha': df_usuario['Senha'].fillna('').astype(str),
+        }))
+
+    indice: Dict[str, Tuple[Tuple[str, str, str, bytes], ...]] = {}
+    if partes:
+        df = pd.concat(partes, ignore_index=True)
+        df = df[(df['Login'] != '') & (df['Senha'] != '')]
+        # Dentro de um mesmo tipo, a última linha com o login prevalece
+        df = df.drop_duplicates(['Tipo', 'Login'], keep='last')
+
+        logins = df['Login'].tolist()
+        entradas = list(zip(df['Tipo'].tolist(), df['ID'].tolist(), df['Nome'].tolist(),
+                            [senha.encode('utf-8', 'surrogatepass') for senha in df['Senha'].tolist()]))
+        repetidos = df['Login'].duplicated(keep=False).tolist()
+
+        # Caso comum (login único) em uma única compreensão; repetidos entre tipos são agrupados
+        indice = {login: (entrada,) for login, entrada, repetido in zip(logins, entradas, repetidos) if not repetido}
+        for login, entrada, repetido in zip(logins, entradas, repetidos):
+            if repetido:
+                indice[login] = indice.get(login, ()) + (entrada,)
+
+    # Troca de uma vez (o login pode estar sendo usado durante uma recarga a quente)
+    INDICE_LOGIN = indice
 
 
 def autenticar_usuario(login: str, senha: str) -> Optional[Tuple[str, str, str]]:
     """
     Verifica as credenciais. Retorna (tipo, id_usuario, nome_usuario) em caso de sucesso.
-    Compara a senha de entrada plana com a senha armazenada (DESCRIPTOGRAFADA).
+    Uma busca no índice de login e uma comparação em tempo constante por entrada.
     """
     if not DADOS_CARREGADOS:
         carregar_dados_academicos()
@@ -160,16 +1216,9 @@ def autenticar_usuario(login: str, senha: str) -> Optional[Tuple[str, str, str]]
     login = login.strip().lower()
     senha_plana_input = senha.strip() 
 
-    for tipo_usuario, credenciais_map in USUARIOS_CREDENCIAS.items():
-        if login in credenciais_map:
-            tipo, id_usuario, nome_usuario, senha_criptografada_armazenada = credenciais_map[login]
-            
-            # Descriptografa a senha armazenada para comparar com a senha plana de entrada
-            senha_descriptografada_armazenada = _descriptografar_string(senha_criptografada_armazenada) 
-            
-            # Compara a senha plana de entrada com a senha descriptografada armazenada
-            if senha_plana_input == senha_descriptografada_armazenada: 
-                return (tipo, id_usuario, nome_usuario)
+    for tipo, id_usuario, nome_usuario, chave_senha in INDICE_LOGIN.get(login, ()):
+        if _verificar_senha(senha_plana_input, chave_senha):
+            return (tipo, id_usuario, nome_usuario)
                 
     return None
 
@@ -179,18 +1228,57 @@ def get_dados_academicos() -> Dict[str, pd.DataFrame]:
     carregar_dados_academicos()
     return DADOS_ACADEMICOS
 
+
+def get_indice_academico() -> 'IndiceAcademico':
+    """Retorna o índice em memória dos dados acadêmicos carregados."""
+    carregar_dados_academicos()
+    return INDICE_ACADEMICO
+
+
+def get_visao_notas() -> VisaoNotas:
+    """Retorna a visão materializada de médias ponderadas (alunos e turmas)."""
+    carregar_dados_academicos()
+    return VISAO_NOTAS
+
+
+def get_visao_retencao() -> VisaoRetencao:
+    """Retorna a visão de retenção/evasão por semestre, turma e professor."""
+    carregar_dados_academicos()
+    return VISAO_RETENCAO
+
+
+def get_estatisticas_notas() -> EstatisticasNotas:
+    """
+    Distribuição das notas por atividade e por turma (quartis, histogramas,
+    entregas faltantes). Calculada na primeira chamada de cada versão dos dados.
+    """
+    global _ESTATISTICAS_NOTAS
+    carregar_dados_academicos()
+    with TRAVA_DADOS:
+        if _ESTATISTICAS_NOTAS is None or _ESTATISTICAS_NOTAS[0] != VERSAO_DADOS:
+            _ESTATISTICAS_NOTAS = (VERSAO_DADOS, calcular_estatisticas_notas(
+                DADOS_ACADEMICOS.get('notas'), DADOS_ACADEMICOS.get('atividades'), DADOS_ACADEMICOS.get('matriculas')
+            ))
+        return _ESTATISTICAS_NOTAS[1]
+
 # -----------------------------------------------------------------
 # --- FUNÇÕES DE PRÉ-PROCESSAMENTO PARA IA ---
 # -----------------------------------------------------------------
 
-def preparar_dados_para_ia(id_usuario: str, tipo_usuario: str) -> str:
+def preparar_dados_para_ia(id_usuario: str, tipo_usuario: str) -> Union[DadosRelatorio, str]:
     """
-    Prepara e formata os dados para serem enviados ao módulo de IA.
-    Ajustado para usar os novos cabeçalhos de CSV e a nova estrutura de notas.
+    Prepara os dados do relatório de IA (ver dados_relatorio): objeto com os números
+    já calculados, ou uma mensagem "ERRO: ..." se faltarem dados. O texto do prompt
+    só é gerado pelo ai_module, quando a análise vai para o Gemini.
     """
-    dados = get_dados_academicos()
+    carregar_dados_academicos()
+    with TRAVA_DADOS:  # Tabelas, índice e visões da mesma recarga
+        dados, indice, visao, retencao = DADOS_ACADEMICOS, INDICE_ACADEMICO, VISAO_NOTAS, VISAO_RETENCAO
     id_usuario = str(id_usuario).strip()
-    saida_formatada: List[str] = []
+    id_numerico = converter_id(id_usuario)
+
+    if id_numerico is None and tipo_usuario in ('aluno', 'professor'):
+        return f"ERRO: ID de usuário inválido ('{id_usuario}')."
 
     if tipo_usuario == 'aluno':
         # 1. Obter DataFrames
@@ -203,52 +1291,19 @@ def preparar_dados_para_ia(id_usuario: str, tipo_usuario: str) -> str:
              return "ERRO: Dados insuficientes (Notas, Atividades, Turmas ou Alunos ausentes) para análise de aluno."
         
         # Obter o nome do aluno
-        nome_aluno_row = df_alunos[df_alunos['ID'].astype(str) == id_usuario]
-        nome_aluno = nome_aluno_row.iloc[0]['Nome'] if not nome_aluno_row.empty else f"Aluno ID {id_usuario}"
-
-        saida_formatada.append(f"RELATORIO_NOTAS_ALUNO: {nome_aluno}")
-        
-        # Filtra notas do aluno (usando o novo cabeçalho 'ID_Aluno' em notas.csv)
-        df_notas['ID_Aluno'] = df_notas['ID_Aluno'].astype(str).str.strip()
-        df_notas_aluno = df_notas[df_notas['ID_Aluno'] == id_usuario].copy()
-        
-        if df_notas_aluno.empty:
-            saida_formatada.append("RELATORIO_NOTAS: Aluno não possui notas registradas.")
-        else:
-            # Mescla notas com atividades (para obter ID_Turma, Nome_Atividade e Peso)
-            # Renomeia 'ID' de atividades para 'ID_Atividade_fk' para evitar conflito
-            df_merge = pd.merge(
-                df_notas_aluno,
-                df_atividades[['ID', 'ID_Turma', 'Nome_Atividade', 'Peso']].rename(columns={'ID': 'ID_Atividade_fk'}),
-                left_on='ID_Atividade',
-                right_on='ID_Atividade_fk',
-                how='left',
-            )
-            
-            # Mescla com turmas (para obter Nome da Disciplina)
-            # AJUSTE: Renomeia 'Nome' de turmas para 'Nome_Disciplina'
-            df_merge = pd.merge(
-                df_merge,
-                df_turmas[['ID', 'Nome']].rename(columns={'ID': 'ID_Turma', 'Nome': 'Nome_Disciplina'}),
-                left_on='ID_Turma',
-                right_on='ID_Turma',
-                how='left',
-            )
-            
-            # Garante que as colunas são numéricas
-            df_merge['Nota'] = pd.to_numeric(df_merge['Nota'], errors='coerce').fillna(0)
-            df_merge['Peso'] = pd.to_numeric(df_merge['Peso'], errors='coerce').fillna(0)
+        nome_aluno = indice.nome('aluno', id_numerico, f"Aluno ID {id_usuario}")
 
-            # Calcula a nota ponderada: Nota * (Peso/100)
-            df_merge['Nota_Ponderada'] = df_merge['Nota'] * (df_merge['Peso'] / 100.0)
-            
-            # Calcula média ponderada por disciplina (a soma das notas ponderadas é a média final)
-            medias_por_disciplina = df_merge.groupby('Nome_Disciplina')['Nota_Ponderada'].sum().reset_index()
-            
-            for _, row in medias_por_disciplina.iterrows():
-                disciplina = str(row['Nome_Disciplina']).strip()
-                media = row['Nota_Ponderada']
-                saida_formatada.append(f"{disciplina}: {media:.2f}")
+        # Médias ponderadas já calculadas na visão de notas ({ID_Turma: média}),
+        # uma por disciplina, ordenadas pelo nome e com 2 casas (como no relatório)
+        medias_do_aluno = visao.medias_do_aluno(id_numerico)
+        medias_por_disciplina = sorted(
+            (indice.nome('turmas', id_turma, f"Turma {id_turma}"), media)
+            for id_turma, media in medias_do_aluno.items()
+        )
+        return DadosRelatorioAluno(
+            nome=nome_aluno,
+            notas=[(disciplina, round(float(media), 2)) for disciplina, media in medias_por_disciplina],
+        )
 
     elif tipo_usuario == 'professor':
         # 1. Certifica-se de que todos os DataFrames necessários estão carregados
@@ -261,76 +1316,48 @@ def preparar_dados_para_ia(id_usuario: str, tipo_usuario: str) -> str:
              return "ERRO: Dados insuficientes (Turmas, Professores, Notas ou Atividades ausentes) para análise de professor."
 
         # Obter o nome do professor
-        nome_prof_row = df_professores[df_professores['ID'].astype(str) == id_usuario]
-        nome_professor = nome_prof_row.iloc[0]['Nome'] if not nome_prof_row.empty else f"Professor ID {id_usuario}"
-        
-        saida_formatada.append(f"RELATORIO_PROFESSOR: {nome_professor}")
+        nome_professor = indice.nome('professor', id_numerico, f"Professor ID {id_usuario}")
+        dados_professor = DadosRelatorioProfessor(nome=nome_professor)
         
         # Garante que a coluna ID_Professor_Responsavel existe e a filtra
         if 'ID_Professor_Responsavel' in df_turmas.columns:
             
-            # Garante que a coluna de ID do professor em turmas é string para comparação
-            df_turmas['ID_Professor_Responsavel'] = df_turmas['ID_Professor_Responsavel'].astype(str).str.strip()
-            
             # 2. Filtra turmas sob responsabilidade do professor
-            turmas_do_prof = df_turmas[df_turmas['ID_Professor_Responsavel'] == id_usuario].copy()
-            saida_formatada.append(f"Total_Turmas: {len(turmas_do_prof)}")
+            turmas_do_prof = indice.turmas_do_professor(id_numerico)
+            dados_professor.total_turmas = len(turmas_do_prof)
             
             if not turmas_do_prof.empty:
                 
-                # --- Lógica de Cálculo de Média e Desvio Padrão ---
-                
-                # 3. Obter IDs das turmas do professor
-                ids_turmas_do_prof = turmas_do_prof['ID'].unique()
-                
-                # 4. Filtrar atividades associadas a essas turmas
-                df_atividades['ID_Turma'] = df_atividades['ID_Turma'].astype(str).str.strip()
-                df_atividades_do_prof = df_atividades[df_atividades['ID_Turma'].isin(ids_turmas_do_prof)].copy()
-                
-                media_turma = 0.0
-                desvio_padrao = 0.0
-                
-                if not df_atividades_do_prof.empty:
-                    
-                    # 5. Filtrar notas que pertencem a estas atividades
-                    # Renomeia ID para evitar conflito no merge
-                    df_atividades_do_prof.rename(columns={'ID': 'ID_Atividade_Prof'}, inplace=True)
-                    
-                    df_notas['ID_Atividade'] = df_notas['ID_Atividade'].astype(str).str.strip()
-                    df_notas_do_prof = pd.merge(
-                        df_notas,
-                        df_atividades_do_prof[['ID_Atividade_Prof']],
-                        left_on='ID_Atividade',
-                        right_on='ID_Atividade_Prof',
-                        how='inner' # Pega apenas as notas de atividades do professor
-                    )
-                    
-                    # 6. Calcular Média e Desvio Padrão (convertendo para numérico com segurança)
-                    df_notas_do_prof['Nota'] = pd.to_numeric(df_notas_do_prof['Nota'], errors='coerce')
-                    
-                    # Calcula a média de todas as notas do professor
-                    if not df_notas_do_prof['Nota'].empty:
-                        media_turma = df_notas_do_prof['Nota'].mean()
-                        desvio_padrao = df_notas_do_prof['Nota'].std() if df_notas_do_prof['Nota'].std() is not None else 0.0
-                
-                # 7. Adicionar ao relatório com os nomes de chave ESPERADOS pelo ai_module.py
-                saida_formatada.append(f"Media_Turma: {media_turma:.2f}")
-                saida_formatada.append(f"Desvio_Padrao: {desvio_padrao:.2f}")
+                # 3. Média e desvio padrão das médias dos alunos em todas as turmas do professor
+                media_turma, desvio_padrao, _ = visao.estatisticas_turmas(turmas_do_prof['ID'].unique())
+                dados_professor.media_turma = round(float(media_turma), 2)
+                dados_professor.desvio_padrao = round(float(desvio_padrao), 2)
 
-                # 8. Adicionar lista de turmas para contexto
+                # 4. Lista de turmas para contexto
                 for _, row in turmas_do_prof.iterrows():
                     disciplina = str(row.get('Nome', 'N/A')).strip() 
                     codigo = str(row.get('Codigo', 'N/A')).strip()
-                    saida_formatada.append(f"Turma: {disciplina} ({codigo})")
+                    dados_professor.turmas.append((disciplina, codigo))
+
+                # 5. Distribuição das notas de cada atividade (pré-calculada por versão dos dados)
+                estatisticas = get_estatisticas_notas().atividades_das_turmas(turmas_do_prof['ID'].unique())
+                for id_turma, atividade, notas, faltantes, q1, mediana, q3 in zip(
+                    estatisticas['ID_Turma'].tolist(), estatisticas['Atividade'].tolist(), estatisticas['Notas'].tolist(),
+                    estatisticas['Faltantes'].tolist(), estatisticas['Q1'].tolist(), estatisticas['Mediana'].tolist(), estatisticas['Q3'].tolist()
+                ):
+                    dados_professor.atividades.append(ResumoAtividade(
+                        nome=atividade, disciplina=indice.nome('turmas', id_turma, f"Turma {id_turma}"),
+                        notas=int(notas), faltantes=int(faltantes),
+                        q1=None if pd.isna(q1) else round(q1, 2),
+                        mediana=None if pd.isna(mediana) else round(mediana, 2),
+                        q3=None if pd.isna(q3) else round(q3, 2),
+                    ))
             else:
-                saida_formatada.append("INFO: Professor não possui turmas sob sua responsabilidade.")
-                # Adiciona 0.00 para evitar que o ai_module.py retorne a mensagem de erro padrão
-                saida_formatada.append("Media_Turma: 0.00") 
-                saida_formatada.append("Desvio_Padrao: 0.00")
+                # Média e desvio ficam em 0.00
+                dados_professor.aviso = "INFO: Professor não possui turmas sob sua responsabilidade."
         else:
-            saida_formatada.append("ERRO: Coluna 'ID_Professor_Responsavel' não encontrada em turmas.csv.")
-            saida_formatada.append("Media_Turma: 0.00") 
-            saida_formatada.append("Desvio_Padrao: 0.00")
+            dados_professor.aviso = "ERRO: Coluna 'ID_Professor_Responsavel' não encontrada em turmas.csv."
+        return dados_professor
 
     elif tipo_usuario == 'admin' or tipo_usuario == 'administrador':
         df_alunos = dados.get('aluno')
@@ -340,24 +1367,83 @@ def preparar_dados_para_ia(id_usuario: str, tipo_usuario: str) -> str:
         if df_alunos is None or df_professores is None or df_turmas is None:
              return "ERRO: Dados insuficientes (Alunos, Professores ou Turmas ausentes) para análise administrativa."
         
-        saida_formatada.append("RELATORIO_ADMINISTRADOR:")
+        # Evasão da coorte mais recente que já tem semestre seguinte (pré-calculada em VISAO_RETENCAO)
+        semestre_evasao = retencao.ultimo_semestre_medido()
+
         # Agora podemos calcular os totais com segurança, pois os DFs existem
-        total_alunos = df_alunos.shape[0]
-        total_professores = df_professores.shape[0]
-        total_turmas = df_turmas.shape[0]
-        
-        saida_formatada.append(f"Total_Alunos: {total_alunos}")
-        saida_formatada.append(f"Total_Professores: {total_professores}")
-        saida_formatada.append(f"Total_Turmas: {total_turmas}")
-
-        # Simulação de métrica administrativa
-        taxa_evasao_simulada = 0.05
-        if total_alunos > 100:
-             taxa_evasao_simulada = 0.12 # Exemplo: aumenta a evasão em sistemas maiores
-        
-        saida_formatada.append(f"Taxa_Evasao_Ultimo_Semestre: {taxa_evasao_simulada}")        
+        return DadosRelatorioAdmin(
+            total_alunos=df_alunos.shape[0],
+            total_professores=df_professores.shape[0],
+            total_turmas=df_turmas.shape[0],
+            taxa_evasao=retencao.taxa_evasao(semestre_evasao) if semestre_evasao is not None else None,
+            semestre_evasao=semestre_evasao,
+        )
+
+    return f"ERRO: Tipo de usuário não reconhecido ('{tipo_usuario}')."
+
+
+def nomes_por_id(df: Optional[pd.DataFrame]) -> pd.Series:
+    """Série ID -> Nome (primeira ocorrência, como IndiceAcademico.nome)."""
+    if df is None or df.empty or 'ID' not in df.columns or 'Nome' not in df.columns:
+        return pd.Series(dtype=object)
+    unicos = df.drop_duplicates('ID', keep='first')
+    return pd.Series(unicos['Nome'].astype(object).to_numpy(), index=unicos['ID'].to_numpy())
 
-    return "\n".join(saida_formatada)
+
+def preparar_dados_para_ia_em_lote(tipo_usuario: str, ids_usuarios: Optional[List[Any]] = None) -> Dict[str, Union[DadosRelatorio, str]]:
+    """
+    Versão em lote de preparar_dados_para_ia: {id_usuario: dados do relatório}.
+    Para alunos, todas as médias saem de uma única passagem sobre a visão de
+    notas (nomes das turmas mapeados + ordenação). Professores e administradores
+    são poucos e reutilizam a função individual.
+    O resultado é idêntico ao de preparar_dados_para_ia.
+    """
+    carregar_dados_academicos()
+    with TRAVA_DADOS:  # Tabelas e visão de notas da mesma recarga
+        dados, visao = DADOS_ACADEMICOS, VISAO_NOTAS
+
+    if tipo_usuario != 'aluno':
+        chave_tabela = 'admin' if tipo_usuario == 'administrador' else tipo_usuario
+        df_usuarios = dados.get(chave_tabela)
+        if ids_usuarios is None:
+            ids_usuarios = [] if df_usuarios is None or 'ID' not in df_usuarios.columns else df_usuarios['ID'].drop_duplicates().tolist()
+        return {str(id_usuario): preparar_dados_para_ia(str(id_usuario), tipo_usuario) for id_usuario in ids_usuarios}
+
+    df_alunos = dados.get('aluno')
+    if ids_usuarios is None:
+        ids_usuarios = [] if df_alunos is None or 'ID' not in df_alunos.columns else df_alunos['ID'].drop_duplicates().tolist()
+    ids_numericos = {str(i).strip(): converter_id(i) for i in ids_usuarios}
+
+    # Mesmas verificações da versão individual (tabelas ausentes / IDs inválidos)
+    if any(dados.get(k) is None for k in ('notas', 'atividades', 'turmas', 'aluno')):
+        return {id_texto: preparar_dados_para_ia(id_texto, 'aluno') for id_texto in ids_numericos}
+
+    # 1. (Disciplina, média) de todos os alunos, ordenadas por aluno e disciplina
+    medias = visao.alunos_turmas[['ID_Aluno', 'ID_Turma', 'Media']]
+    medias = medias[medias['ID_Aluno'].isin([i for i in ids_numericos.values() if i is not None])]
+    nomes_turmas = nomes_por_id(dados.get('turmas'))
+    disciplina = medias['ID_Turma'].map(nomes_turmas)
+    disciplina = disciplina.where(disciplina.notna(), 'Turma ' + medias['ID_Turma'].astype(str)).astype(str)
+    linhas = pd.DataFrame({
+        'ID_Aluno': medias['ID_Aluno'],
+        'Disciplina': disciplina,
+        'Media': medias['Media'],
+    }).sort_values(['ID_Aluno', 'Disciplina', 'Media'], kind='stable')
+    notas_por_aluno: Dict[int, List[Tuple[str, float]]] = {}
+    for id_aluno, nome_disciplina, media in zip(linhas['ID_Aluno'].tolist(), linhas['Disciplina'].tolist(), linhas['Media'].tolist()):
+        notas_por_aluno.setdefault(id_aluno, []).append((nome_disciplina, round(media, 2)))
+
+    # 2. Cabeçalho com o nome de cada aluno
+    nomes_alunos = nomes_por_id(df_alunos).to_dict()
+    resultado: Dict[str, Union[DadosRelatorio, str]] = {}
+    for id_texto, id_numerico in ids_numericos.items():
+        if id_numerico is None:
+            resultado[id_texto] = f"ERRO: ID de usuário inválido ('{id_texto}')."
+            continue
+        nome = nomes_alunos.get(id_numerico)
+        nome_aluno = f"Aluno ID {id_texto}" if nome is None or pd.isna(nome) else str(nome)
+        resultado[id_texto] = DadosRelatorioAluno(nome=nome_aluno, notas=notas_por_aluno.get(id_numerico, []))
+    return resultado
 
 
 def get_colunas_csv(tipo: str) -> Optional[List[str]]:
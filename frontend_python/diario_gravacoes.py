@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, List, Set
+
+# =================================================================
+# --- DIÁRIO DE GRAVAÇÕES (WRITE-AHEAD JOURNAL) DOS CSVs ---
+# =================================================================
+#
+# Cada lote de inclusões (ex: as notas de uma turma inteira) vira UMA linha
+# JSON acrescentada ao diário, seguida de um único fsync: esse é o commit.
+# Uma linha incompleta no fim do arquivo (queda no meio da escrita) é
+# ignorada na leitura, então cada lote entra inteiro ou não entra.
+#
+# A compactação (feita pelo data_manager, em segundo plano) leva as linhas
+# para os CSVs: o diário é renomeado para "<diario>.compactando", cada CSV é
+# regravado via arquivo temporário + rename e, a cada tabela concluída, uma
+# marca {"compactada": tabela} é registrada. Antes do rename, uma marca
+# {"acrescentando": tabela, ...} guarda o tamanho do CSV e o hash dos bytes
+# acrescentados: se o processo cair entre o rename e a marca "compactada", a
+# próxima leitura encontra esses bytes no CSV e não acrescenta as linhas de novo.
+# Assim ela sabe exatamente quais tabelas ainda faltam.
+#
+# Formato de cada lote: {"seq": n, "registros": {tabela: [{coluna: texto, ...}, ...]}}
+# Os valores já estão formatados como no CSV.
+
+Registros = Dict[str, List[Dict[str, str]]]
+
+
+def _fsync_linha(caminho: str, linha: str) -> None:
+    with open(caminho, 'a+b') as f:
+        # Se a última escrita foi interrompida, começa em uma linha nova
+        if f.seek(0, os.SEEK_END) > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(linha.encode('utf-8') + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _ler_linhas_json(caminho: str) -> List[dict]:
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            linhas = f.read().split('\n')
+    except FileNotFoundError:
+        return []
+    entradas = []
+    for linha in linhas:
+        if not linha.strip():
+            continue
+        try:
+            entradas.append(json.loads(linha))
+        except ValueError:
+            continue  # Lote interrompido no meio da escrita: nunca foi confirmado
+    return entradas
+
+
+def _acrescimo_aplicado(marca: Dict[str, Any]) -> bool:
+    """True se o CSV já contém, na posição registrada na marca, exatamente os bytes acrescentados."""
+    try:
+        with open(marca['arquivo'], 'rb') as f:
+            f.seek(int(marca['tamanho']))
+            trecho = f.read(int(marca['bytes']))
+    except (OSError, KeyError, ValueError):
+        return False
+    return len(trecho) == int(marca['bytes']) and hashlib.sha256(trecho).hexdigest() == marca.get('sha256')
+
+
+class DiarioGravacoes:
+    """Diário de inclusões ainda não levadas aos CSVs."""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.caminho_compactando = f"{caminho}.compactando"
+        self._trava = threading.Lock()
+        self._seq = 0
+
+    def registrar(self, registros: Registros) -> int:
+        """Grava o lote inteiro como uma linha + um fsync. Retorna o número de sequência."""
+        with self._trava:
+            self._seq += 1
+            _fsync_linha(self.caminho, json.dumps({'seq': self._seq, 'registros': registros}, ensure_ascii=False))
+            return self._seq
+
+    def _registros_de(self, caminho: str, ignoradas: Set[str]) -> Registros:
+        registros: Registros = {}
+        for entrada in _ler_linhas_json(caminho):
+            if 'registros' not in entrada:
+                continue
+            self._seq = max(self._seq, int(entrada.get('seq', 0)))
+            for tabela, linhas in entrada['registros'].items():
+                if tabela not in ignoradas:
+                    registros.setdefault(tabela, []).extend(linhas)
+        return registros
+
+    def _tabelas_compactadas(self) -> Set[str]:
+        entradas = _ler_linhas_json(self.caminho_compactando)
+        compactadas = {e['compactada'] for e in entradas if 'compactada' in e}
+        # Queda entre o rename do CSV e a marca "compactada": as linhas já estão no arquivo
+        compactadas |= {
+            e['acrescentando'] for e in entradas
+            if 'acrescentando' in e and e['acrescentando'] not in compactadas and _acrescimo_aplicado(e)
+        }
+        return compactadas
+
+    def pendentes(self) -> Registros:
+        """Todas as linhas ainda não levadas aos CSVs (compactação interrompida + diário atual), em ordem."""
+        resultado = self._registros_de(self.caminho_compactando, self._tabelas_compactadas())
+        for tabela, linhas in self._registros_de(self.caminho, set()).items():
+            resultado.setdefault(tabela, []).extend(linhas)
+        return resultado
+
+    def iniciar_compactacao(self) -> Registros:
+        """
+        Separa o diário atual para compactação (novos lotes vão para um diário novo) e
+        retorna as linhas a levar para os CSVs. Uma compactação interrompida é retomada
+        primeiro, sem as tabelas que ela já havia concluído.
+        """
+        with self._trava:
+            if not os.path.exists(self.caminho_compactando):
+                if not os.path.exists(self.caminho):
+                    return {}
+                os.replace(self.caminho, self.caminho_compactando)
+        return self._registros_de(self.caminho_compactando, self._tabelas_compactadas())
+
+    def marcar_acrescimo(self, tabela: str, arquivo: str, tamanho: int, bloco: bytes) -> None:
+        """Registra, antes do rename, que `bloco` vai entrar no CSV `arquivo` a partir do byte `tamanho`."""
+        _fsync_linha(self.caminho_compactando, json.dumps({
+            'acrescentando': tabela, 'arquivo': os.path.abspath(arquivo), 'tamanho': tamanho,
+            'bytes': len(bloco), 'sha256': hashlib.sha256(bloco).hexdigest(),
+        }, ensure_ascii=False))
+
+    def marcar_compactada(self, tabela: str) -> None:
+        _fsync_linha(self.caminho_compactando, json.dumps({'compactada': tabela}))
+
+    def concluir_compactacao(self) -> None:
+        try:
+            os.remove(self.caminho_compactando)
+        except FileNotFoundError:
+            pass
+
+    def vazio(self) -> bool:
+        return not os.path.exists(self.caminho) and not os.path.exists(self.caminho_compactando)
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from visao_notas import notas_efetivas
+
+# -----------------------------------------------------------------
+# --- DISTRIBUIÇÃO DAS NOTAS POR ATIVIDADE E POR TURMA ---
+# -----------------------------------------------------------------
+#
+# Para cada atividade (e para cada turma, juntando as notas de todas as suas
+# atividades): quantidade de notas, entregas faltantes, mínimo, quartis
+# (Q1, mediana, Q3, interpolação linear como em pandas.quantile), máximo,
+# média e histograma em faixas de 1 ponto (0-1, 1-2, ..., 9-10).
+#
+# As notas são ordenadas uma única vez; cada nível (atividade, turma) faz só uma
+# ordenação estável pelo grupo (radix em uint16 quando cabe). Com o início e o
+# tamanho de cada grupo, os quantis saem por indexação direta; médias e
+# histogramas saem de np.bincount.
+#
+# Faltantes = alunos matriculados na turma da atividade sem nota lançada nela.
+# Vale a nota mais recente de cada (atividade, aluno); notas vazias não contam.
+#
+# O data_manager guarda o resultado por versão dos dados
+# (get_estatisticas_notas): as telas e o relatório de IA não refazem o cálculo.
+
+QTD_FAIXAS_HISTOGRAMA = 10
+ROTULOS_FAIXAS = [f"{i}-{i + 1}" for i in range(QTD_FAIXAS_HISTOGRAMA)]
+COLUNAS_DISTRIBUICAO = ['Matriculados', 'Notas', 'Faltantes', 'Minima', 'Q1', 'Mediana', 'Q3', 'Maxima', 'Media']
+COLUNAS_ESTATISTICAS_ATIVIDADE = ['ID_Atividade', 'Atividade', 'ID_Turma'] + COLUNAS_DISTRIBUICAO
+COLUNAS_ESTATISTICAS_TURMA = ['ID_Turma', 'Atividades'] + COLUNAS_DISTRIBUICAO
+
+
+def _resumir_grupos(grupos: np.ndarray, notas: np.ndarray, qtd_grupos: int) -> Dict[str, np.ndarray]:
+    """
+    Estatísticas por grupo (posições 0..qtd_grupos-1). `notas` já vem em ordem
+    crescente: a ordenação estável pelo grupo mantém essa ordem dentro de cada um.
+    """
+    tipo = np.uint16 if qtd_grupos <= np.iinfo(np.uint16).max + 1 else np.int64
+    ordem = np.argsort(grupos.astype(tipo, copy=False), kind='stable')
+    grupos, notas = grupos[ordem], notas[ordem]
+    tamanhos = np.bincount(grupos, minlength=qtd_grupos)
+    inicios = np.cumsum(tamanhos) - tamanhos
+    com_notas = tamanhos > 0
+    ultimo = np.maximum(inicios + tamanhos - 1, 0)
+
+    def quantil(q: float) -> np.ndarray:
+        posicao = inicios + q * np.maximum(tamanhos - 1, 0)
+        baixo = np.minimum(np.floor(posicao).astype(np.int64), ultimo)
+        alto = np.minimum(baixo + 1, ultimo)
+        if len(notas) == 0:
+            return np.full(qtd_grupos, np.nan)
+        valor = notas[baixo] + (posicao - baixo) * (notas[alto] - notas[baixo])
+        return np.where(com_notas, valor, np.nan)
+
+    faixas = np.clip(np.floor(notas), 0, QTD_FAIXAS_HISTOGRAMA - 1).astype(np.int64)
+    histogramas = np.bincount(grupos * QTD_FAIXAS_HISTOGRAMA + faixas, minlength=qtd_grupos * QTD_FAIXAS_HISTOGRAMA)
+    somas = np.bincount(grupos, weights=notas, minlength=qtd_grupos)
+    return {
+        'Notas': tamanhos,
+        'Minima': quantil(0.0),
+        'Q1': quantil(0.25),
+        'Mediana': quantil(0.5),
+        'Q3': quantil(0.75),
+        'Maxima': quantil(1.0),
+        'Media': np.where(com_notas, somas / np.maximum(tamanhos, 1), np.nan),
+        'Histogramas': histogramas.reshape(qtd_grupos, QTD_FAIXAS_HISTOGRAMA),
+    }
+
+
+class EstatisticasNotas:
+    """Distribuições pré-calculadas por atividade e por turma (ver cabeçalho do módulo)."""
+
+    def __init__(self, por_atividade: pd.DataFrame, histogramas_atividade: np.ndarray,
+                 por_turma: pd.DataFrame, histogramas_turma: np.ndarray):
+        self.por_atividade = por_atividade
+        self.por_turma = por_turma
+        self._histogramas_atividade = histogramas_atividade
+        self._histogramas_turma = histogramas_turma
+        self._posicao_atividade = {id_ativ: i for i, id_ativ in enumerate(por_atividade['ID_Atividade'].tolist())}
+        self._posicao_turma = {id_turma: i for i, id_turma in enumerate(por_turma['ID_Turma'].tolist())}
+
+    def histograma_atividade(self, id_atividade: Optional[int]) -> Dict[str, int]:
+        posicao = self._posicao_atividade.get(id_atividade)
+        contagens = self._histogramas_atividade[posicao] if posicao is not None else np.zeros(QTD_FAIXAS_HISTOGRAMA, dtype=np.int64)
+        return dict(zip(ROTULOS_FAIXAS, contagens.tolist()))
+
+    def histograma_turma(self, id_turma: Optional[int]) -> Dict[str, int]:
+        posicao = self._posicao_turma.get(id_turma)
+        contagens = self._histogramas_turma[posicao] if posicao is not None else np.zeros(QTD_FAIXAS_HISTOGRAMA, dtype=np.int64)
+        return dict(zip(ROTULOS_FAIXAS, contagens.tolist()))
+
+    def atividades_das_turmas(self, ids_turmas: Iterable[int]) -> pd.DataFrame:
+        return self.por_atividade[self.por_atividade['ID_Turma'].isin(list(ids_turmas))].reset_index(drop=True)
+
+    def turmas(self, ids_turmas: Iterable[int]) -> pd.DataFrame:
+        return self.por_turma[self.por_turma['ID_Turma'].isin(list(ids_turmas))].reset_index(drop=True)
+
+
+def calcular_estatisticas_notas(df_notas: Optional[pd.DataFrame], df_atividades: Optional[pd.DataFrame],
+                                df_matriculas: Optional[pd.DataFrame]) -> EstatisticasNotas:
+    """Calcula as distribuições a partir das tabelas já tipadas (tabelas ausentes contam como vazias)."""
+    if df_atividades is None or not {'ID', 'Nome_Atividade', 'ID_Turma'}.issubset(df_atividades.columns):
+        df_atividades = pd.DataFrame({'ID': pd.Series(dtype='int64'), 'Nome_Atividade': pd.Series(dtype=object), 'ID_Turma': pd.Series(dtype='int64')})
+    if df_notas is None or not {'ID_Atividade', 'ID_Aluno', 'Nota'}.issubset(df_notas.columns):
+        df_notas = pd.DataFrame({'ID_Atividade': [], 'ID_Aluno': [], 'Nota': []})
+    if df_matriculas is None or not {'ID_Aluno', 'ID_Turma'}.issubset(df_matriculas.columns):
+        df_matriculas = pd.DataFrame({'ID_Aluno': [], 'ID_Turma': []})
+
+    atividades = df_atividades[['ID', 'Nome_Atividade', 'ID_Turma']].dropna(subset=['ID', 'ID_Turma'])
+    atividades = atividades.drop_duplicates('ID', keep='last').sort_values(['ID_Turma', 'ID']).reset_index(drop=True)
+    ids_atividades = atividades['ID'].astype(np.int64).to_numpy()
+    turmas_atividades = atividades['ID_Turma'].astype(np.int64).to_numpy()
+
+    # Notas vigentes com a posição da atividade (notas de atividades desconhecidas ficam de fora)
+    notas = notas_efetivas(df_notas).dropna()
+    posicao_atividade = pd.Series(np.arange(len(atividades)), index=ids_atividades)
+    grupo_atividade = notas['ID_Atividade'].map(posicao_atividade)
+    notas = notas[grupo_atividade.notna()]
+    grupo_atividade = grupo_atividade[grupo_atividade.notna()].astype(np.int64).to_numpy()
+    valores = notas['Nota'].astype(np.float64).to_numpy()
+
+    # Matriculados por turma e notas lançadas de alunos matriculados
+    matriculas = df_matriculas[['ID_Aluno', 'ID_Turma']].dropna().drop_duplicates()
+    matriculados_turma = matriculas.groupby('ID_Turma')['ID_Aluno'].size()
+    matriculados = pd.Series(turmas_atividades).map(matriculados_turma).fillna(0).astype(np.int64).to_numpy()
+    pares_matriculados = pd.MultiIndex.from_arrays([matriculas['ID_Aluno'].astype(np.int64), matriculas['ID_Turma'].astype(np.int64)])
+    lancadas = pd.MultiIndex.from_arrays([notas['ID_Aluno'].astype(np.int64).to_numpy(), turmas_atividades[grupo_atividade]]).isin(pares_matriculados)
+    lancadas_matriculados = np.bincount(grupo_atividade[lancadas], minlength=len(atividades))
+
+    ordem_notas = np.argsort(valores)
+    valores, grupo_atividade = valores[ordem_notas], grupo_atividade[ordem_notas]
+
+    # 1. Por atividade
+    resumo = _resumir_grupos(grupo_atividade, valores, len(atividades))
+    histogramas_atividade = resumo.pop('Histogramas')
+    por_atividade = pd.DataFrame({
+        'ID_Atividade': ids_atividades,
+        'Atividade': atividades['Nome_Atividade'].astype(str).str.strip().to_numpy(),
+        'ID_Turma': turmas_atividades,
+        'Matriculados': matriculados,
+        'Faltantes': np.maximum(matriculados - lancadas_matriculados, 0),
+        **resumo,
+    })[COLUNAS_ESTATISTICAS_ATIVIDADE]
+
+    # 2. Por turma (todas as notas das atividades da turma)
+    ids_turmas, grupo_turma_atividade = np.unique(turmas_atividades, return_inverse=True)
+    resumo_turma = _resumir_grupos(grupo_turma_atividade[grupo_atividade], valores, len(ids_turmas))
+    histogramas_turma = resumo_turma.pop('Histogramas')
+    por_turma = pd.DataFrame({
+        'ID_Turma': ids_turmas,
+        'Atividades': np.bincount(grupo_turma_atividade, minlength=len(ids_turmas)),
+        'Matriculados': pd.Series(ids_turmas).map(matriculados_turma).fillna(0).astype(np.int64).to_numpy(),
+        'Faltantes': np.bincount(grupo_turma_atividade, weights=por_atividade['Faltantes'], minlength=len(ids_turmas)).astype(np.int64),
+        **resumo_turma,
+    })[COLUNAS_ESTATISTICAS_TURMA]
+
+    return EstatisticasNotas(por_atividade, histogramas_atividade, por_turma, histogramas_turma)
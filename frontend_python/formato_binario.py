@@ -0,0 +1,176 @@
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# =================================================================
+# --- FORMATO BINÁRIO COMPARTILHADO COM O BACKEND C (.bin) ---
+# =================================================================
+#
+# O backend C (main.c, salvar_dados_binario) grava, ao lado de cada CSV, um
+# arquivo .bin com um cabeçalho de 16 bytes seguido dos structs de
+# estruturas.h exatamente como estão na memória:
+#
+#   magico "PIMB" (4s) | versao (u16) | tipo_registro (u16) | tamanho_registro (u32) | num_registros (u32)
+#
+# Aqui o arquivo é mapeado com np.memmap em um array estruturado (sem cópia
+# nem análise de texto). Os dtypes usam align=True, reproduzindo o
+# preenchimento (padding) que o compilador C insere entre os campos.
+
+MAGICO_BINARIO = b'PIMB'
+VERSAO_BINARIO = 1
+FORMATO_CABECALHO = '<4sHHII'
+TAMANHO_CABECALHO = struct.calcsize(FORMATO_CABECALHO)  # 16 bytes
+
+# Tamanhos dos vetores de char (estruturas.h)
+MAX_NOME, MAX_LOGIN, MAX_SENHA = 100, 50, 50
+MAX_MATRICULA, MAX_SIAPE, MAX_CPF = 20, 20, 15
+MAX_CODIGO, MAX_SEMESTRE, MAX_NOME_ATIVIDADE, MAX_DATA = 20, 10, 100, 11
+
+# Chave da tabela (data_manager.ARQUIVOS_CSV) -> (tipo_registro, dtype do struct)
+DTYPES_REGISTROS: Dict[str, Tuple[int, np.dtype]] = {
+    'aluno': (1, np.dtype([
+        ('id', '<i4'), ('nome', f'S{MAX_NOME}'), ('matricula', f'S{MAX_MATRICULA}'),
+        ('cpf', f'S{MAX_CPF}'), ('login', f'S{MAX_LOGIN}'), ('senha', f'S{MAX_SENHA}'),
+    ], align=True)),
+    'professor': (2, np.dtype([
+        ('id', '<i4'), ('nome', f'S{MAX_NOME}'), ('siape', f'S{MAX_SIAPE}'),
+        ('cpf', f'S{MAX_CPF}'), ('login', f'S{MAX_LOGIN}'), ('senha', f'S{MAX_SENHA}'),
+    ], align=True)),
+    'turmas': (3, np.dtype([
+        ('id', '<i4'), ('nome', f'S{MAX_NOME}'), ('codigo', f'S{MAX_CODIGO}'),
+        ('semestre', f'S{MAX_SEMESTRE}'), ('id_professor_responsavel', '<i4'),
+    ], align=True)),
+    'atividades': (4, np.dtype([
+        ('id', '<i4'), ('nome_atividade', f'S{MAX_NOME_ATIVIDADE}'), ('id_turma', '<i4'),
+        ('peso', '<f4'), ('data_entrega', f'S{MAX_DATA}'),
+    ], align=True)),
+    'matriculas': (5, np.dtype([('id_aluno', '<i4'), ('id_turma', '<i4')], align=True)),
+    'notas': (6, np.dtype([('id_atividade', '<i4'), ('id_aluno', '<i4'), ('nota', '<f4')], align=True)),
+}
+
+# Campo do struct -> coluna do CSV (mesmos cabeçalhos gravados por salvar_dados_csv)
+COLUNAS_CSV: Dict[str, Dict[str, str]] = {
+    'aluno': {'id': 'ID', 'nome': 'Nome', 'matricula': 'RA', 'cpf': 'CPF', 'login': 'Login', 'senha': 'Senha'},
+    'professor': {'id': 'ID', 'nome': 'Nome', 'siape': 'SIAPE', 'cpf': 'CPF', 'login': 'Login', 'senha': 'Senha'},
+    'turmas': {'id': 'ID', 'nome': 'Nome', 'codigo': 'Codigo', 'semestre': 'Semestre', 'id_professor_responsavel': 'ID_Professor_Responsavel'},
+    'atividades': {'id': 'ID', 'nome_atividade': 'Nome_Atividade', 'id_turma': 'ID_Turma', 'peso': 'Peso', 'data_entrega': 'Data_Entrega'},
+    'matriculas': {'id_aluno': 'ID_Aluno', 'id_turma': 'ID_Turma'},
+    'notas': {'id_atividade': 'ID_Atividade', 'id_aluno': 'ID_Aluno', 'nota': 'Nota'},
+}
+
+
+class FormatoBinarioInvalido(ValueError):
+    """Arquivo .bin ausente de cabeçalho válido ou incompatível com o struct esperado."""
+
+
+def caminho_binario(caminho_csv: str) -> str:
+    """alunos.csv -> alunos.bin (no mesmo diretório)."""
+    return os.path.splitext(caminho_csv)[0] + '.bin'
+
+
+def ler_cabecalho(caminho: str) -> Tuple[int, int, int, int]:
+    """Retorna (versao, tipo_registro, tamanho_registro, num_registros) do arquivo."""
+    with open(caminho, 'rb') as f:
+        dados = f.read(TAMANHO_CABECALHO)
+    if len(dados) < TAMANHO_CABECALHO:
+        raise FormatoBinarioInvalido(f"'{caminho}' menor que o cabeçalho.")
+    magico, versao, tipo, tamanho, quantidade = struct.unpack(FORMATO_CABECALHO, dados)
+    if magico != MAGICO_BINARIO:
+        raise FormatoBinarioInvalido(f"'{caminho}' não é um arquivo {MAGICO_BINARIO.decode()}.")
+    return versao, tipo, tamanho, quantidade
+
+
+def mapear_registros(caminho: str, nome_chave: str) -> np.ndarray:
+    """
+    Mapeia o .bin em um array estruturado somente leitura (np.memmap): nada é
+    lido do disco até que os registros sejam acessados, e registros[i] vai
+    direto ao deslocamento TAMANHO_CABECALHO + i * itemsize.
+    """
+    tipo_esperado, dtype = DTYPES_REGISTROS[nome_chave]
+    versao, tipo, tamanho, quantidade = ler_cabecalho(caminho)
+    if versao != VERSAO_BINARIO or tipo != tipo_esperado or tamanho != dtype.itemsize:
+        raise FormatoBinarioInvalido(
+            f"'{caminho}': versão {versao}, tipo {tipo}, registro de {tamanho} bytes "
+            f"(esperado: versão {VERSAO_BINARIO}, tipo {tipo_esperado}, {dtype.itemsize} bytes)."
+        )
+    if os.path.getsize(caminho) < TAMANHO_CABECALHO + quantidade * dtype.itemsize:
+        raise FormatoBinarioInvalido(f"'{caminho}' truncado: {quantidade} registros declarados.")
+    if quantidade == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(caminho, dtype=dtype, mode='r', offset=TAMANHO_CABECALHO, shape=(quantidade,))
+
+
+def _texto_c(coluna: np.ndarray) -> np.ndarray:
+    """Vetor de char[] do C -> texto: corta no primeiro '\\0' (o resto do buffer pode ter lixo)."""
+    tamanho = coluna.dtype.itemsize
+    bytes_ = np.ascontiguousarray(coluna).view(np.uint8).reshape(len(coluna), tamanho).copy()
+    bytes_[np.cumsum(bytes_ == 0, axis=1) > 0] = 0  # Zera tudo a partir do terminador
+    coluna = bytes_.view(f'S{tamanho}').ravel()
+    try:
+        return np.char.decode(coluna, 'utf-8')
+    except UnicodeDecodeError:
+        return np.char.decode(coluna, 'latin-1')
+
+
+def registros_para_dataframe(registros: np.ndarray, nome_chave: str) -> pd.DataFrame:
+    """
+    Converte os registros no DataFrame com as colunas do CSV. Campos numéricos
+    mantêm o tipo binário; floats são arredondados a 2 casas, como o CSV gravado
+    pelo C ("%.2f"). O esquema final (datas, categorias) fica a cargo do data_manager.
+    """
+    colunas = {}
+    for campo, coluna in COLUNAS_CSV[nome_chave].items():
+        valores = registros[campo]
+        if valores.dtype.kind == 'S':
+            colunas[coluna] = pd.Series(_texto_c(valores)).str.strip()
+        elif valores.dtype.kind == 'f':
+            colunas[coluna] = np.round(valores.astype(np.float64), 2)
+        else:
+            colunas[coluna] = np.asarray(valores)
+    return pd.DataFrame(colunas)
+
+
+def carregar_tabela_binaria(caminho_csv: str, nome_chave: str) -> Optional[pd.DataFrame]:
+    """
+    Carrega a tabela pelo .bin quando ele existe e não é mais antigo que o CSV
+    (o C grava o .bin logo após o CSV). Retorna None para usar o CSV.
+    """
+    if nome_chave not in DTYPES_REGISTROS:
+        return None
+    caminho = caminho_binario(caminho_csv)
+    try:
+        if os.stat(caminho).st_mtime_ns < os.stat(caminho_csv).st_mtime_ns:
+            return None
+        return registros_para_dataframe(mapear_registros(caminho, nome_chave), nome_chave)
+    except FileNotFoundError:
+        return None
+    except FormatoBinarioInvalido as e:
+        print(f"AVISO: {e} Usando o CSV.")
+        return None
+
+
+def gravar_tabela_binaria(caminho_csv: str, nome_chave: str, df: pd.DataFrame) -> str:
+    """Grava o DataFrame (colunas do CSV) no mesmo formato .bin gravado pelo C (útil para exportar dados já existentes)."""
+    tipo, dtype = DTYPES_REGISTROS[nome_chave]
+    registros = np.zeros(len(df), dtype=dtype)
+    for campo, coluna in COLUNAS_CSV[nome_chave].items():
+        valores = df[coluna]
+        if pd.api.types.is_datetime64_any_dtype(valores):
+            valores = valores.dt.strftime('%d/%m/%Y')
+        if dtype[campo].kind == 'S':
+            tamanho = dtype[campo].itemsize
+            # O C precisa do '\0' final: o texto ocupa no máximo tamanho - 1 bytes
+            registros[campo] = [str(v).encode('utf-8')[:tamanho - 1] for v in valores.astype(object).fillna('')]
+        else:
+            registros[campo] = valores.to_numpy()
+
+    caminho = caminho_binario(caminho_csv)
+    caminho_tmp = f"{caminho}.tmp"
+    with open(caminho_tmp, 'wb') as f:
+        f.write(struct.pack(FORMATO_CABECALHO, MAGICO_BINARIO, VERSAO_BINARIO, tipo, dtype.itemsize, len(registros)))
+        f.write(registros.tobytes())
+    os.replace(caminho_tmp, caminho)
+    return caminho
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# =================================================================
+# --- GRÁFICOS DOS PAINÉIS (FIGURAS REUTILIZADAS + CACHE) ---
+# =================================================================
+#
+# Cada visão ('aluno', 'professor', 'admin') tem UMA Figure/Axes criada na
+# primeira vez e reutilizada depois:
+#   - mesmos dados da última vez: nada é redesenhado na figura;
+#   - mesmas barras com outros valores/cores: alturas e cores são trocadas no lugar;
+#   - outra estrutura (rótulos, título...): o Axes é limpo e remontado.
+# As figuras são criadas com matplotlib.figure.Figure (fora do pyplot), então
+# não ficam presas no registro global de figuras; fechar() as libera.
+#
+# Como o widget Tk é destruído a cada troca de tela, um canvas novo é ligado à
+# figura em cada visita. A imagem rasterizada (Agg) fica em um cache LRU pela
+# chave (dados do gráfico, tamanho em pixels): revisitar um painel com os
+# mesmos dados só copia os pixels prontos para a tela.
+
+TAMANHO_FIGURA = (8, 4)
+MAX_RENDERIZACOES_CACHE = 12  # Cada imagem 800x400 ocupa ~1,3 MB
+
+# (y, cor, estilo da linha, legenda) de cada linha horizontal de referência
+LinhaReferencia = Tuple[float, str, str, str]
+
+
+class _CanvasComCache(FigureCanvasTkAgg):
+    """Canvas Tk que reaproveita a imagem já rasterizada quando os dados não mudaram."""
+
+    def __init__(self, figura: Figure, master, gerenciador: 'GerenciadorGraficos', chave_dados: tuple):
+        self._gerenciador = gerenciador
+        self.chave_dados = chave_dados
+        super().__init__(figura, master=master)
+
+    def draw(self):
+        largura, altura = self.get_width_height(physical=True)
+        chave = (self.chave_dados, largura, altura, self.figure.dpi)
+        pixels = self._gerenciador._renderizacao(chave)
+        if pixels is None:
+            FigureCanvasAgg.draw(self)
+            self._gerenciador._guardar_renderizacao(chave, np.asarray(self.renderer.buffer_rgba()))
+        else:
+            np.copyto(np.asarray(self.get_renderer().buffer_rgba()), pixels)
+        self.blit()
+
+
+class GerenciadorGraficos:
+    """Figuras de barras dos painéis, uma por visão, com cache de renderização."""
+
+    def __init__(self, max_renderizacoes: int = MAX_RENDERIZACOES_CACHE):
+        self.max_renderizacoes = max_renderizacoes
+        self._figuras: Dict[str, Figure] = {}
+        self._barras: Dict[str, Any] = {}
+        self._textos_barras: Dict[str, List[Any]] = {}
+        self._estruturas: Dict[str, tuple] = {}
+        self._chaves: Dict[str, tuple] = {}
+        self._renderizacoes: 'OrderedDict[tuple, np.ndarray]' = OrderedDict()
+        self.canvas: Optional[_CanvasComCache] = None
+
+    # --- Cache de imagens rasterizadas ---
+
+    def _renderizacao(self, chave: tuple) -> Optional[np.ndarray]:
+        pixels = self._renderizacoes.get(chave)
+        if pixels is not None:
+            self._renderizacoes.move_to_end(chave)
+        return pixels
+
+    def _guardar_renderizacao(self, chave: tuple, pixels: np.ndarray) -> None:
+        self._renderizacoes[chave] = pixels.copy()
+        self._renderizacoes.move_to_end(chave)
+        while len(self._renderizacoes) > self.max_renderizacoes:
+            self._renderizacoes.popitem(last=False)
+
+    # --- Montagem / atualização da figura ---
+
+    def _rotular_barras(self, visao: str) -> None:
+        eixos, barras = self._figuras[visao].axes[0], self._barras[visao]
+        for texto in self._textos_barras.pop(visao, []):
+            texto.remove()
+        try:
+            # Rótulos explícitos: bar_label usaria os valores guardados na criação das barras
+            rotulos = [f'{rect.get_height():g}' for rect in barras]
+            self._textos_barras[visao] = list(eixos.bar_label(barras, labels=rotulos))
+        except AttributeError:
+            # Fallback para matplotlib antigo (sem bar_label)
+            self._textos_barras[visao] = [
+                eixos.annotate(f'{rect.get_height():g}', xy=(rect.get_x() + rect.get_width() / 2, rect.get_height()),
+                               xytext=(0, 3), textcoords="offset points", ha='center', va='bottom')
+                for rect in barras
+            ]
+
+    def _montar(self, visao: str, estrutura: tuple, valores: Tuple[float, ...], cores: Tuple[str, ...]) -> None:
+        rotulos, titulo, rotulo_y, limite_y, linhas_referencia, rotacao, tamanho_fonte, rotular_barras = estrutura
+        figura = self._figuras.get(visao)
+        if figura is None:
+            figura = self._figuras[visao] = Figure(figsize=TAMANHO_FIGURA)
+            figura.add_subplot()
+        eixos = figura.axes[0]
+        eixos.clear()
+        self._textos_barras.pop(visao, None)
+
+        self._barras[visao] = eixos.bar(list(rotulos), list(valores), color=list(cores))
+        for y, cor, estilo, legenda in linhas_referencia:
+            eixos.axhline(y, color=cor, linestyle=estilo, linewidth=1, label=legenda)
+        eixos.set_title(titulo)
+        eixos.set_ylabel(rotulo_y)
+        if limite_y is not None:
+            eixos.set_ylim(*limite_y)
+        for rotulo in eixos.get_xticklabels():
+            rotulo.set_rotation(rotacao)
+            rotulo.set_horizontalalignment("right")
+            if tamanho_fonte is not None:
+                rotulo.set_fontsize(tamanho_fonte)
+        if rotular_barras:
+            self._rotular_barras(visao)
+        figura.tight_layout()
+
+    def _atualizar_barras(self, visao: str, valores: Tuple[float, ...], cores: Tuple[str, ...]) -> None:
+        """Mesmas barras, outros valores: troca alturas e cores sem recriar os artistas."""
+        for rect, valor, cor in zip(self._barras[visao], valores, cores):
+            rect.set_height(valor)
+            rect.set_facecolor(cor)
+        _, _, _, limite_y, _, _, _, rotular_barras = self._estruturas[visao]
+        eixos = self._figuras[visao].axes[0]
+        if limite_y is None:
+            eixos.relim()
+            eixos.autoscale_view()
+        if rotular_barras:
+            self._rotular_barras(visao)
+        self._figuras[visao].tight_layout()
+
+    def desenhar_barras(self, visao: str, parent_frame, row: int, columnspan: int,
+                        rotulos: Sequence[Any], valores: Sequence[float], cores: Union[str, Sequence[str]],
+                        titulo: str, rotulo_y: str, limite_y: Optional[Tuple[float, float]] = None,
+                        linhas_referencia: Sequence[LinhaReferencia] = (), rotacao: float = 0,
+                        tamanho_fonte: Optional[float] = None, rotular_barras: bool = False) -> FigureCanvasTkAgg:
+        """Desenha (ou reaproveita) o gráfico de barras da visão e o coloca em parent_frame na linha `row`."""
+        self.remover_widget()
+
+        rotulos = tuple(str(r) for r in rotulos)
+        valores = tuple(float(v) for v in valores)
+        cores = (cores,) * len(valores) if isinstance(cores, str) else tuple(cores)
+        estrutura = (rotulos, titulo, rotulo_y, limite_y, tuple(linhas_referencia), rotacao, tamanho_fonte, rotular_barras)
+        chave = (estrutura, valores, cores)
+
+        if self._chaves.get(visao) != chave:
+            if self._estruturas.get(visao) == estrutura:
+                self._atualizar_barras(visao, valores, cores)
+            else:
+                self._montar(visao, estrutura, valores, cores)
+            self._estruturas[visao] = estrutura
+            self._chaves[visao] = chave
+
+        self.canvas = _CanvasComCache(self._figuras[visao], parent_frame, self, (visao, chave))
+        self.canvas.get_tk_widget().grid(row=row, column=0, columnspan=columnspan, padx=10, pady=10, sticky="nsew")
+        return self.canvas
+
+    # --- Liberação ---
+
+    def remover_widget(self) -> None:
+        """Destrói o widget Tk do gráfico atual (a figura continua disponível para reuso)."""
+        if self.canvas is not None:
+            widget = self.canvas.get_tk_widget()
+            if widget.winfo_exists():
+                widget.destroy()
+            self.canvas = None
+
+    def liberar(self, visao: str) -> None:
+        """Fecha a figura da visão e descarta as imagens em cache dela."""
+        figura = self._figuras.pop(visao, None)
+        if figura is not None:
+            figura.clear()
+        for dicionario in (self._barras, self._textos_barras, self._estruturas, self._chaves):
+            dicionario.pop(visao, None)
+        for chave in [c for c in self._renderizacoes if c[0][0] == visao]:
+            del self._renderizacoes[chave]
+
+    def fechar(self) -> None:
+        """Libera todas as figuras e o cache (chamado ao sair da tela principal)."""
+        self.remover_widget()
+        for visao in list(self._figuras):
+            self.liberar(visao)
+        self._renderizacoes.clear()
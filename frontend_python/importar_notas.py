@@ -0,0 +1,210 @@
+import argparse
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_manager import (
+    TRAVA_DADOS, carregar_dados_academicos, compactar_diario, converter_id, get_dados_academicos, gravar_lote,
+    ler_csv_texto,
+)
+
+# =================================================================
+# --- IMPORTAÇÃO DE NOTAS EM LOTE (PLANILHA CSV/XLSX) ---
+# =================================================================
+#
+# Uso (a partir de frontend_python/):
+#   python importar_notas.py notas_2025_2.csv                  -> simulação (nada é gravado)
+#   python importar_notas.py notas_2025_2.xlsx --professor 3 --aplicar
+#
+# A planilha tem uma linha por nota com as colunas RA, Atividade (ID ou nome)
+# e Nota. Todas as validações são feitas de uma vez sobre as colunas inteiras:
+#   RA -> ID_Aluno (alunos.csv), atividade existente (e do professor, se
+#   informado), aluno matriculado na turma da atividade e nota entre 0 e 10.
+# As linhas aceitas entram em notas.csv em um único lote (data_manager.gravar_lote);
+# as recusadas vão para "<planilha>_rejeitadas.csv" com o motivo.
+
+NOTA_MINIMA, NOTA_MAXIMA = 0.0, 10.0  # Mesmo intervalo aceito por lancar_nota no backend C
+
+# Coluna lógica -> nomes aceitos no cabeçalho da planilha (sem diferenciar maiúsculas)
+COLUNAS_PLANILHA: Dict[str, Tuple[str, ...]] = {
+    'RA': ('RA', 'Matricula', 'Matrícula'),
+    'Atividade': ('Atividade', 'ID_Atividade', 'Nome_Atividade'),
+    'Nota': ('Nota',),
+}
+
+SUFIXO_REJEITADAS = '_rejeitadas.csv'
+
+
+class ResultadoImportacao:
+    """Linhas aceitas (colunas de notas.csv) e recusadas (linha da planilha + motivo)."""
+
+    def __init__(self, aceitas: pd.DataFrame, rejeitadas: pd.DataFrame):
+        self.aceitas = aceitas
+        self.rejeitadas = rejeitadas
+        self.gravadas = 0
+        self.caminho_rejeitadas: Optional[str] = None
+
+    def resumo(self) -> str:
+        texto = f"{len(self.aceitas)} nota(s) válidas, {len(self.rejeitadas)} linha(s) recusadas"
+        if self.gravadas:
+            texto += f", {self.gravadas} gravadas"
+        return texto + "."
+
+
+# -----------------------------------------------------------------
+# --- LEITURA DA PLANILHA ---
+# -----------------------------------------------------------------
+
+def ler_planilha(caminho: str) -> pd.DataFrame:
+    """Lê a planilha como texto e renomeia as colunas para RA, Atividade e Nota."""
+    if os.path.splitext(caminho)[1].lower() in ('.xlsx', '.xlsm', '.xls'):
+        try:
+            df = pd.read_excel(caminho, dtype=str, keep_default_na=False)
+        except ImportError as e:
+            raise ValueError(f"Leitura de planilhas Excel indisponível ({e}). Instale 'openpyxl' ou exporte como CSV.")
+    else:
+        # Planilhas exportadas pelo Excel em português usam ';' (a vírgula é o separador decimal)
+        df = ler_csv_texto(caminho, separadores=',;')
+
+    colunas = {str(c).strip().lower(): c for c in df.columns}
+    renomear = {}
+    for coluna, aceitos in COLUNAS_PLANILHA.items():
+        encontrada = next((colunas[nome.lower()] for nome in aceitos if nome.lower() in colunas), None)
+        if encontrada is None:
+            raise ValueError(f"Coluna '{coluna}' não encontrada na planilha (aceitos: {', '.join(aceitos)}).")
+        renomear[encontrada] = coluna
+    df = df.rename(columns=renomear)[list(COLUNAS_PLANILHA)]
+    return df.apply(lambda x: x.astype(str).str.strip())
+
+
+# -----------------------------------------------------------------
+# --- VALIDAÇÃO VETORIZADA ---
+# -----------------------------------------------------------------
+
+def _mapa_unico(chaves: pd.Series, valores: pd.Series) -> Tuple[pd.Series, pd.Index]:
+    """Série chave -> valor só com as chaves sem repetição; retorna também as chaves repetidas."""
+    repetidas = chaves.duplicated(keep=False)
+    mapa = pd.Series(valores[~repetidas].to_numpy(), index=chaves[~repetidas].to_numpy())
+    return mapa, pd.Index(chaves[repetidas].unique())
+
+
+def validar_notas(planilha: pd.DataFrame, id_professor: Optional[int] = None) -> ResultadoImportacao:
+    """
+    Valida todas as linhas de uma vez. A primeira regra violada por uma linha é o
+    seu motivo de recusa; linhas repetidas (mesmo aluno e atividade) ficam com a última.
+    """
+    carregar_dados_academicos()
+    with TRAVA_DADOS:  # Alunos, atividades, matrículas e turmas da mesma recarga
+        dados = get_dados_academicos()
+    alunos, atividades, matriculas = dados['aluno'], dados['atividades'], dados['matriculas']
+    motivos = pd.Series(None, index=planilha.index, dtype=object)
+
+    def recusar(mascara: pd.Series, motivo: str) -> None:
+        motivos[mascara.to_numpy() & motivos.isna().to_numpy()] = motivo
+
+    # 1. RA -> ID_Aluno
+    ras_cadastro = alunos['RA'].astype(str).str.strip().str.upper()
+    mapa_ra, ras_repetidos = _mapa_unico(ras_cadastro, alunos['ID'])
+    ras = planilha['RA'].str.upper()
+    id_aluno = ras.map(mapa_ra)
+    recusar(planilha['RA'] == '', "RA vazio")
+    recusar(ras.isin(ras_repetidos), "RA repetido no cadastro de alunos")
+    recusar(id_aluno.isna(), "RA não encontrado")
+
+    # 2. Atividade (ID ou nome) -> ID_Atividade / ID_Turma
+    if id_professor is not None:
+        turmas_prof = dados['turmas'].loc[dados['turmas']['ID_Professor_Responsavel'] == id_professor, 'ID']
+        permitidas = atividades[atividades['ID_Turma'].isin(turmas_prof)]
+    else:
+        permitidas = atividades
+    nomes = permitidas['Nome_Atividade'].astype(str).str.strip().str.casefold()
+    mapa_nome, nomes_repetidos = _mapa_unico(nomes, permitidas['ID'])
+    id_informado = pd.to_numeric(planilha['Atividade'], errors='coerce')
+    nome_informado = planilha['Atividade'].str.casefold()
+    id_atividade = id_informado.where(id_informado.isin(permitidas['ID'])).fillna(nome_informado.map(mapa_nome))
+    recusar(planilha['Atividade'] == '', "atividade vazia")
+    recusar(id_atividade.isna() & id_informado.isin(atividades['ID']), "atividade de turma de outro professor")
+    recusar(id_atividade.isna() & nome_informado.isin(nomes_repetidos), "nome de atividade repetido (informe o ID)")
+    recusar(id_atividade.isna(), "atividade não encontrada")
+
+    # 3. Nota (aceita vírgula decimal)
+    nota = pd.to_numeric(planilha['Nota'].str.replace(',', '.', regex=False), errors='coerce')
+    recusar(nota.isna(), "nota inválida")
+    recusar(~nota.between(NOTA_MINIMA, NOTA_MAXIMA), f"nota fora do intervalo {NOTA_MINIMA:g} a {NOTA_MAXIMA:g}")
+
+    # 4. Matrícula do aluno na turma da atividade (pares comparados via MultiIndex)
+    id_turma = id_atividade.map(pd.Series(atividades['ID_Turma'].to_numpy(), index=atividades['ID'].to_numpy()))
+    pares = pd.MultiIndex.from_arrays([id_aluno.fillna(-1).astype(np.int64), id_turma.fillna(-1).astype(np.int64)])
+    matriculados = pd.MultiIndex.from_arrays([matriculas['ID_Aluno'].astype(np.int64), matriculas['ID_Turma'].astype(np.int64)])
+    recusar(pd.Series(~pares.isin(matriculados), index=planilha.index), "aluno não matriculado na turma da atividade")
+
+    # 5. Repetidas na planilha: vale a última (a mesma regra de notas.csv)
+    validas = motivos.isna()
+    chaves = pd.DataFrame({'ID_Aluno': id_aluno, 'ID_Atividade': id_atividade})
+    recusar(validas & chaves.duplicated(keep='last'), "repetida na planilha (vale a última linha)")
+
+    validas = motivos.isna()
+    aceitas = pd.DataFrame({
+        'ID_Atividade': id_atividade[validas].astype('int32'),
+        'ID_Aluno': id_aluno[validas].astype('int32'),
+        'Nota': nota[validas].round(2).astype('float64'),
+    }).reset_index(drop=True)
+    # Linha como no editor de planilhas: cabeçalho é a linha 1
+    rejeitadas = planilha[~validas].assign(Motivo=motivos[~validas])
+    rejeitadas.insert(0, 'Linha', rejeitadas.index + 2)
+    return ResultadoImportacao(aceitas, rejeitadas.reset_index(drop=True))
+
+
+# -----------------------------------------------------------------
+# --- IMPORTAÇÃO ---
+# -----------------------------------------------------------------
+
+def caminho_relatorio_rejeitadas(caminho_planilha: str) -> str:
+    return os.path.splitext(caminho_planilha)[0] + SUFIXO_REJEITADAS
+
+
+def importar_notas(caminho: str, id_professor: Optional[int] = None, aplicar: bool = True) -> ResultadoImportacao:
+    """
+    Lê, valida e (se `aplicar`) grava as notas aceitas em um único lote. As linhas
+    recusadas são salvas ao lado da planilha em "<planilha>_rejeitadas.csv".
+    """
+    resultado = validar_notas(ler_planilha(caminho), id_professor)
+    if aplicar and not resultado.aceitas.empty:
+        resultado.gravadas = gravar_lote({'notas': resultado.aceitas})
+    if not resultado.rejeitadas.empty:
+        resultado.caminho_rejeitadas = caminho_relatorio_rejeitadas(caminho)
+        resultado.rejeitadas.to_csv(resultado.caminho_rejeitadas, index=False, encoding='utf-8-sig')
+    return resultado
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Importa notas de uma planilha CSV/XLSX (colunas RA, Atividade, Nota).")
+    parser.add_argument('planilha', help="Arquivo .csv ou .xlsx.")
+    parser.add_argument('--professor', help="ID do professor: só aceita atividades das turmas dele.")
+    parser.add_argument('--aplicar', action='store_true', help="Grava as notas (sem isso, apenas valida).")
+    args = parser.parse_args(argv)
+
+    id_professor = converter_id(args.professor) if args.professor is not None else None
+    if args.professor is not None and id_professor is None:
+        parser.error(f"ID de professor inválido: {args.professor}")
+
+    carregar_dados_academicos()
+    try:
+        resultado = importar_notas(args.planilha, id_professor, aplicar=args.aplicar)
+    except (OSError, ValueError) as e:
+        print(f"ERRO: {e}")
+        return
+
+    print(f"INFO: {resultado.resumo()}")
+    if resultado.caminho_rejeitadas:
+        print(f"AVISO: Linhas recusadas salvas em '{resultado.caminho_rejeitadas}'.")
+    if not args.aplicar:
+        print("INFO: Simulação: nenhuma nota foi gravada (use --aplicar).")
+    elif resultado.gravadas:
+        compactar_diario()  # O processo termina em seguida: leva o lote ao notas.csv agora
+
+
+if __name__ == '__main__':
+    main()
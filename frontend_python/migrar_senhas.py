@@ -0,0 +1,149 @@
+import argparse
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from data_manager import (
+    ARQUIVOS_CSV, CHAVE_CRIPTOGRAFIA, ITERACOES_HASH_SENHA, PREFIXO_HASH_SENHA,
+    resolver_caminho_csv, gravar_arquivo_atomico, terminador_de_linha,
+    criptografar_em_lote, descriptografar_em_lote, gerar_hash_senha,
+)
+
+# =================================================================
+# --- MIGRAÇÃO DAS SENHAS (alunos.csv, professores.csv, admin.csv) ---
+# =================================================================
+#
+# Uso (a partir de frontend_python/):
+#   python migrar_senhas.py --auditar
+#   python migrar_senhas.py --rechavear 7            -> simulação (nada é gravado)
+#   python migrar_senhas.py --rechavear 7 --aplicar
+#   python migrar_senhas.py --hash --aplicar         -> César -> PBKDF2-SHA256 (com salt)
+#
+# Cada arquivo é processado em uma única passagem vetorizada sobre a coluna
+# Senha; as demais colunas são regravadas sem alteração. Antes de substituir
+# um CSV é feita uma cópia .bak, e a gravação é atômica (arquivo temporário).
+#
+# ATENÇÃO: o backend C só entende a Cifra de César com a chave fixa em main.c.
+# Após --rechavear ou --hash, o login pelo backend C deixa de funcionar até que
+# ele seja atualizado; no frontend, ajuste CHAVE_CRIPTOGRAFIA após rechavear.
+
+TABELAS_USUARIOS = ('aluno', 'professor', 'admin')
+SENHAS_FRACAS = {'1234', '12345', '123456', '12345678', 'senha', 'password', 'admin', 'qwerty', '0000', '1111'}
+TAMANHO_MINIMO_SENHA = 6
+
+
+def _ler_tabela_bruta(caminho: str) -> pd.DataFrame:
+    """Lê o CSV como texto puro (sem tratar vazios como NaN) para regravá-lo fielmente."""
+    try:
+        return pd.read_csv(caminho, dtype=str, keep_default_na=False, encoding='utf-8')
+    except UnicodeDecodeError:
+        return pd.read_csv(caminho, dtype=str, keep_default_na=False, encoding='latin-1')
+
+
+def _eh_hash(senhas: pd.Series) -> pd.Series:
+    return senhas.str.startswith(PREFIXO_HASH_SENHA + '$')
+
+
+def auditar(senhas: pd.Series, logins: pd.Series, chave: int) -> Dict[str, int]:
+    """Contagens de situação das senhas de uma tabela (nenhuma senha é exibida)."""
+    senhas = senhas.str.strip()
+    hash_ = _eh_hash(senhas)
+    vazias = senhas == ''
+    cesar = ~hash_ & ~vazias
+    planas = descriptografar_em_lote(senhas[cesar], chave)
+    return {
+        'usuarios': len(senhas),
+        'sem_senha': int(vazias.sum()),
+        'com_hash': int(hash_.sum()),
+        'cifra_cesar': int(cesar.sum()),
+        'fracas': int((planas.isin(SENHAS_FRACAS) | (planas.str.len() < TAMANHO_MINIMO_SENHA)).sum()),
+        'senha_repetida': int(planas.duplicated(keep=False).sum()),
+        'login_duplicado': int(logins.str.strip().str.lower().duplicated(keep=False).sum()),
+    }
+
+
+def rechavear(senhas: pd.Series, chave_atual: int, nova_chave: int) -> pd.Series:
+    """Decifra com a chave atual e cifra com a nova (hashes e vazias ficam como estão)."""
+    senhas = senhas.str.strip()
+    alvo = ~_eh_hash(senhas) & (senhas != '')
+    resultado = senhas.copy()
+    resultado[alvo] = criptografar_em_lote(descriptografar_em_lote(senhas[alvo], chave_atual), nova_chave)
+    return resultado
+
+
+def converter_para_hash(senhas: pd.Series, chave_atual: int, iteracoes: int, workers: int) -> pd.Series:
+    """Troca cada senha em César pelo hash PBKDF2 (o PBKDF2 libera o GIL: roda em paralelo)."""
+    senhas = senhas.str.strip()
+    alvo = ~_eh_hash(senhas) & (senhas != '')
+    planas = descriptografar_em_lote(senhas[alvo], chave_atual).tolist()
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        hashes = list(executor.map(lambda senha: gerar_hash_senha(senha, iteracoes), planas))
+    resultado = senhas.copy()
+    resultado[alvo] = pd.Series(hashes, index=senhas.index[alvo], dtype=senhas.dtype)
+    return resultado
+
+
+def migrar(operacao: str, aplicar: bool, chave_atual: int = CHAVE_CRIPTOGRAFIA, nova_chave: Optional[int] = None,
+           iteracoes: int = ITERACOES_HASH_SENHA, workers: int = 4) -> None:
+    for tabela in TABELAS_USUARIOS:
+        caminho = resolver_caminho_csv(tabela, ARQUIVOS_CSV[tabela])
+        if caminho is None:
+            continue
+        df = _ler_tabela_bruta(caminho)
+        if 'Senha' not in df.columns:
+            print(f"AVISO: '{ARQUIVOS_CSV[tabela]}' não possui a coluna 'Senha'.")
+            continue
+
+        if operacao == 'auditar':
+            logins = df['Login'] if 'Login' in df.columns else pd.Series('', index=df.index)
+            contagens = auditar(df['Senha'], logins, chave_atual)
+            print(f"INFO: {ARQUIVOS_CSV[tabela]}: " + ", ".join(f"{k}={v}" for k, v in contagens.items()))
+            continue
+
+        if operacao == 'rechavear':
+            novas = rechavear(df['Senha'], chave_atual, nova_chave)
+        else:
+            novas = converter_para_hash(df['Senha'], chave_atual, iteracoes, workers)
+
+        alteradas = int((novas != df['Senha']).sum())
+        if not aplicar:
+            print(f"INFO: {ARQUIVOS_CSV[tabela]}: {alteradas} senha(s) seriam alteradas (simulação; use --aplicar).")
+            continue
+
+        df['Senha'] = novas
+        terminador = terminador_de_linha(caminho)
+        shutil.copy2(caminho, f"{caminho}.bak")
+        gravar_arquivo_atomico(caminho, lambda c: df.to_csv(c, index=False, encoding='utf-8', lineterminator=terminador))
+        print(f"INFO: {ARQUIVOS_CSV[tabela]}: {alteradas} senha(s) alteradas (backup em '{os.path.basename(caminho)}.bak').")
+
+    if aplicar and operacao == 'rechavear':
+        print(f"AVISO: Atualize CHAVE_CRIPTOGRAFIA para {nova_chave} no data_manager.py e no backend C.")
+    elif aplicar and operacao == 'hash':
+        print("AVISO: O backend C não valida senhas com hash; o login com hash funciona apenas no frontend.")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Audita, rechaveia ou converte para hash as senhas dos CSVs de usuários.")
+    operacoes = parser.add_mutually_exclusive_group(required=True)
+    operacoes.add_argument('--auditar', action='store_true', help="Apenas mostra contagens (sem hash, fracas, repetidas...).")
+    operacoes.add_argument('--rechavear', type=int, metavar='NOVA_CHAVE', help="Troca a chave da Cifra de César.")
+    operacoes.add_argument('--hash', action='store_true', help="Converte as senhas em César para PBKDF2-SHA256 com salt.")
+    parser.add_argument('--chave-atual', type=int, default=CHAVE_CRIPTOGRAFIA, help="Chave de César atual dos CSVs.")
+    parser.add_argument('--iteracoes', type=int, default=ITERACOES_HASH_SENHA, help="Iterações do PBKDF2 (--hash).")
+    parser.add_argument('--workers', type=int, default=4, help="Threads para calcular os hashes (--hash).")
+    parser.add_argument('--aplicar', action='store_true', help="Grava as alterações (sem isso, apenas simula).")
+    args = parser.parse_args(argv)
+
+    if args.auditar:
+        migrar('auditar', False, args.chave_atual)
+    elif args.rechavear is not None:
+        migrar('rechavear', args.aplicar, args.chave_atual, nova_chave=args.rechavear)
+    else:
+        migrar('hash', args.aplicar, args.chave_atual, iteracoes=args.iteracoes, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
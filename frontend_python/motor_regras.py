@@ -0,0 +1,142 @@
+import argparse
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ai_module import LIMITE_ALERTA, LIMITE_DESTAQUE, LIMITE_MARGINAL
+from data_manager import TRAVA_DADOS, get_dados_academicos, get_versao_dados, get_visao_notas, nomes_por_id
+
+# =================================================================
+# --- MOTOR DE REGRAS VETORIZADO (RISCO DE TODA A INSTITUIÇÃO) ---
+# =================================================================
+#
+# Aplica as faixas do relatório manual (ai_module) a TODAS as médias
+# (aluno, turma) de uma vez: np.digitize sobre os limites devolve a categoria
+# de cada média e np.bincount conta as categorias por turma e por aluno.
+#
+#   média < LIMITE_ALERTA                      -> Risco
+#   LIMITE_ALERTA <= média < LIMITE_MARGINAL   -> Marginal
+#   LIMITE_MARGINAL <= média < LIMITE_DESTAQUE -> Regular
+#   média >= LIMITE_DESTAQUE                   -> Destaque
+#
+# As médias são arredondadas para 2 casas antes da classificação, como no
+# texto do relatório. obter_tabela_riscos() guarda a última tabela calculada
+# e só recalcula quando a versão dos dados muda (recarga a quente).
+#
+# Uso (a partir de frontend_python/):
+#   python motor_regras.py                 -> contagens por turma e alunos em risco
+
+CATEGORIAS_RISCO = ('Risco', 'Marginal', 'Regular', 'Destaque')
+LIMITES_CATEGORIAS = np.array([LIMITE_ALERTA, LIMITE_MARGINAL, LIMITE_DESTAQUE])
+
+COLUNAS_RISCO_TURMA = ['ID_Turma', 'Turma', 'Qtd_Alunos', *CATEGORIAS_RISCO, 'Percentual_Risco']
+COLUNAS_RISCO_ALUNO = ['ID_Aluno', 'Aluno', 'Qtd_Turmas', *CATEGORIAS_RISCO, 'Media_Geral']
+
+
+def classificar_medias(medias: np.ndarray) -> np.ndarray:
+    """Índice em CATEGORIAS_RISCO de cada média (mesmas faixas do relatório manual)."""
+    return np.digitize(np.round(np.asarray(medias, dtype=np.float64), 2), LIMITES_CATEGORIAS).astype(np.int8)
+
+
+def _contar_por_grupo(ids: np.ndarray, categorias: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """IDs distintos, posição de cada linha entre eles e a matriz (grupo x categoria) de contagens."""
+    qtd_categorias = len(CATEGORIAS_RISCO)
+    unicos, posicoes = np.unique(ids, return_inverse=True)
+    contagens = np.bincount(posicoes * qtd_categorias + categorias, minlength=len(unicos) * qtd_categorias)
+    return unicos, posicoes, contagens.reshape(len(unicos), qtd_categorias)
+
+
+def _nomes(ids: np.ndarray, df: Optional[pd.DataFrame], prefixo: str) -> np.ndarray:
+    nomes = pd.Series(ids).map(nomes_por_id(df))
+    return nomes.where(nomes.notna(), prefixo + pd.Series(ids).astype(str)).astype(str).to_numpy()
+
+
+class TabelaRiscos:
+    """Contagens de médias por categoria, por turma e por aluno, para uma versão dos dados."""
+
+    def __init__(self, por_turma: pd.DataFrame, por_aluno: pd.DataFrame, versao_dados: int):
+        self.por_turma = por_turma
+        self.por_aluno = por_aluno
+        self.versao_dados = versao_dados
+
+    def totais(self) -> Dict[str, int]:
+        """Quantidade de médias (aluno, turma) em cada categoria."""
+        return {categoria: int(self.por_turma[categoria].sum()) for categoria in CATEGORIAS_RISCO}
+
+    def alertas(self, minimo_risco: int = 1) -> pd.DataFrame:
+        """Alunos com pelo menos `minimo_risco` disciplinas em risco (mais disciplinas e menor média primeiro)."""
+        df = self.por_aluno[self.por_aluno['Risco'] >= minimo_risco]
+        return df.sort_values(['Risco', 'Media_Geral', 'ID_Aluno'], ascending=[False, True, True]).reset_index(drop=True)
+
+
+def calcular_tabela_riscos() -> TabelaRiscos:
+    """Classifica todas as médias (aluno, turma) dos dados carregados de uma vez."""
+    with TRAVA_DADOS:  # Tabelas (nomes), versão e médias da mesma recarga
+        dados = get_dados_academicos()
+        versao = get_versao_dados()
+        ids_alunos, ids_turmas, medias = get_visao_notas().medias_em_arrays()
+
+    medias = np.round(medias, 2)
+    categorias = classificar_medias(medias)
+
+    turmas, _, contagens_turma = _contar_por_grupo(ids_turmas, categorias)
+    qtd_alunos = contagens_turma.sum(axis=1)
+    por_turma = pd.DataFrame(contagens_turma, columns=list(CATEGORIAS_RISCO))
+    por_turma.insert(0, 'ID_Turma', turmas)
+    por_turma.insert(1, 'Turma', _nomes(turmas, dados.get('turmas'), 'Turma '))
+    por_turma.insert(2, 'Qtd_Alunos', qtd_alunos)
+    por_turma['Percentual_Risco'] = np.round(100.0 * contagens_turma[:, 0] / np.maximum(qtd_alunos, 1), 1)
+
+    alunos, posicoes, contagens_aluno = _contar_por_grupo(ids_alunos, categorias)
+    qtd_turmas = contagens_aluno.sum(axis=1)
+    por_aluno = pd.DataFrame(contagens_aluno, columns=list(CATEGORIAS_RISCO))
+    por_aluno.insert(0, 'ID_Aluno', alunos)
+    por_aluno.insert(1, 'Aluno', _nomes(alunos, dados.get('aluno'), 'Aluno ID '))
+    por_aluno.insert(2, 'Qtd_Turmas', qtd_turmas)
+    # Média simples das médias do aluno (a "Média" do relatório individual)
+    por_aluno['Media_Geral'] = np.round(np.bincount(posicoes, weights=medias, minlength=len(alunos)) / np.maximum(qtd_turmas, 1), 2)
+
+    return TabelaRiscos(por_turma[COLUNAS_RISCO_TURMA], por_aluno[COLUNAS_RISCO_ALUNO], versao)
+
+
+_TABELA_RISCOS: Optional[TabelaRiscos] = None
+
+
+def obter_tabela_riscos() -> TabelaRiscos:
+    """Tabela de riscos da versão atual dos dados (recalculada só após uma recarga)."""
+    global _TABELA_RISCOS
+    tabela = _TABELA_RISCOS
+    if tabela is None or tabela.versao_dados != get_versao_dados():
+        tabela = _TABELA_RISCOS = calcular_tabela_riscos()
+    return tabela
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Classifica as médias de todos os alunos pelas faixas de risco do relatório.")
+    parser.add_argument('--minimo-risco', type=int, default=1, help="Disciplinas em risco para o aluno entrar nos alertas.")
+    parser.add_argument('--limite', type=int, default=20, help="Quantidade máxima de alunos listados nos alertas.")
+    args = parser.parse_args(argv)
+
+    get_dados_academicos()
+    inicio = time.perf_counter()
+    tabela = calcular_tabela_riscos()
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+
+    totais = tabela.totais()
+    print(f"INFO: {sum(totais.values())} médias classificadas em {duracao_ms:.1f} ms: "
+          + ", ".join(f"{categoria}: {qtd}" for categoria, qtd in totais.items()))
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print("\n--- RISCO POR TURMA ---")
+        print(tabela.por_turma.to_string(index=False))
+        alertas = tabela.alertas(args.minimo_risco)
+        print(f"\n--- ALUNOS EM RISCO ({len(alertas)}) ---")
+        if alertas.empty:
+            print("Nenhum aluno com disciplinas em risco.")
+        else:
+            print(alertas.head(args.limite).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
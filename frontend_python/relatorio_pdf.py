@@ -0,0 +1,30 @@
+from fpdf import FPDF
+
+# =================================================================
+# --- GERAÇÃO DO PDF DE RELATÓRIOS ---
+# =================================================================
+# Usado pela interface (botão "Salvar como PDF") e pela geração em lote.
+
+
+def nome_arquivo_relatorio(nome_relatorio: str, id_usuario: str, sufixo: str = "") -> str:
+    """Nome de arquivo seguro a partir do título do relatório e do ID do usuário."""
+    base_name = "".join(c if c.isalnum() or c == '_' else '_' for c in nome_relatorio.replace(' ', '_'))
+    return f"{base_name}_{id_usuario}{sufixo}.pdf"
+
+
+def salvar_relatorio_pdf(caminho: str, titulo: str, texto: str) -> str:
+    """Grava o relatório (título + texto sem a marcação Markdown) em `caminho` e o retorna."""
+    pdf = FPDF()
+    pdf.add_page()
+
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(200, 10, titulo.encode('latin-1', 'replace').decode('latin-1'), 0, 1, "C")
+
+    pdf.set_font("Arial", "", 10)
+
+    # Ajusta para remover a formatação markdown (como ** e ###)
+    formatted_text = texto.replace('**', '').replace('###', '').replace('>', '').encode('latin-1', 'replace').decode('latin-1')
+    pdf.multi_cell(0, 5, formatted_text)
+
+    pdf.output(caminho, "F")
+    return caminho
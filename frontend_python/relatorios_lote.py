@@ -0,0 +1,155 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+
+import ai_module
+from ai_module import gerar_relatorio_ia
+from dados_relatorio import DadosRelatorio, eh_dado_insuficiente
+from data_manager import get_indice_academico, get_dados_academicos, preparar_dados_para_ia_em_lote, converter_id
+from relatorio_pdf import salvar_relatorio_pdf, nome_arquivo_relatorio
+
+# =================================================================
+# --- GERAÇÃO DE RELATÓRIOS EM LOTE (SEM INTERFACE) ---
+# =================================================================
+#
+# Uso (a partir de frontend_python/):
+#   python relatorios_lote.py                      -> alunos, professores e administração
+#   python relatorios_lote.py --tipos aluno --turmas 1 2 --workers 8 --taxa 2
+#
+# 1. Os textos de entrada de todos os usuários são montados de uma vez
+#    (data_manager.preparar_dados_para_ia_em_lote).
+# 2. Os relatórios são gerados em um pool de threads; as chamadas ao Gemini
+#    passam por um limitador de taxa (o modo offline e o cache não são limitados).
+# 3. Cada relatório é gravado como PDF no diretório de saída.
+
+TIPOS_RELATORIO = ('aluno', 'professor', 'admin')
+WORKERS_PADRAO = 4
+TAXA_PADRAO_POR_SEGUNDO = 1.0  # Requisições à API Gemini por segundo (modo online)
+
+
+class LimitadorTaxa:
+    """Balde de fichas (token bucket) compartilhado entre as threads."""
+
+    def __init__(self, taxa_por_segundo: float, rajada: int = 1):
+        self.intervalo = 1.0 / taxa_por_segundo if taxa_por_segundo > 0 else 0.0
+        self.capacidade = max(rajada, 1)
+        self._fichas = float(self.capacidade)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def aguardar(self) -> None:
+        """Bloqueia até haver uma ficha disponível."""
+        if self.intervalo == 0.0:
+            return
+        while True:
+            with self._trava:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) / self.intervalo)
+                self._ultimo = agora
+                if self._fichas >= 1.0:
+                    self._fichas -= 1.0
+                    return
+                espera = (1.0 - self._fichas) * self.intervalo
+            time.sleep(espera)
+
+
+def _titulo_relatorio(tipo: str, id_usuario: str) -> str:
+    """Mesmo título usado pela interface (MainFrame._preparar_dados_para_ia)."""
+    nome_display = get_indice_academico().nome(tipo, converter_id(id_usuario), id_usuario)
+    if tipo == 'aluno':
+        return f"Relatório de Desempenho do Aluno: {nome_display}"
+    return f"Relatório Gerencial: {tipo.capitalize()} ({nome_display})"
+
+
+def _ids_alunos_das_turmas(ids_turmas: List[int]) -> List[int]:
+    return get_indice_academico().matriculas_das_turmas(ids_turmas)['ID_Aluno'].drop_duplicates().tolist()
+
+
+def preparar_entradas(tipos: List[str], ids_turmas: Optional[List[int]] = None) -> List[Tuple[str, str, str, Union[DadosRelatorio, str]]]:
+    """Retorna (tipo, id_usuario, título, dados_para_ia) de cada relatório a gerar."""
+    entradas = []
+    for tipo in tipos:
+        ids = _ids_alunos_das_turmas(ids_turmas) if (tipo == 'aluno' and ids_turmas) else None
+        for id_usuario, dados_para_ia in preparar_dados_para_ia_em_lote(tipo, ids).items():
+            entradas.append((tipo, id_usuario, _titulo_relatorio(tipo, id_usuario), dados_para_ia))
+    return entradas
+
+
+def _gerar_um(entrada: Tuple[str, str, str, Union[DadosRelatorio, str]], diretorio_saida: str, limitador: LimitadorTaxa) -> str:
+    tipo, id_usuario, titulo, dados_para_ia = entrada
+    texto = gerar_relatorio_ia(nome_usuario=titulo, dados_para_ia=dados_para_ia, tipo_usuario=tipo, aguardar_vez=limitador.aguardar)
+    caminho = os.path.join(diretorio_saida, nome_arquivo_relatorio(titulo, id_usuario))
+    return salvar_relatorio_pdf(caminho, titulo, texto)
+
+
+def gerar_relatorios_em_lote(tipos: List[str], diretorio_saida: str, ids_turmas: Optional[List[int]] = None,
+                             workers: int = WORKERS_PADRAO, taxa_por_segundo: float = TAXA_PADRAO_POR_SEGUNDO) -> Dict[str, float]:
+    """Gera e grava todos os relatórios. Retorna as métricas de vazão da execução."""
+    inicio = time.perf_counter()
+    get_dados_academicos()
+    entradas = preparar_entradas(tipos, ids_turmas)
+    tempo_preparo = time.perf_counter() - inicio
+
+    # Mesmo critério da interface: entradas com AVISO/ERRO não vão para a IA
+    validas = [e for e in entradas if not eh_dado_insuficiente(e[3])]
+    ignorados = len(entradas) - len(validas)
+
+    os.makedirs(diretorio_saida, exist_ok=True)
+    online = ai_module.obter_cliente_gemini() is not None
+    limitador = LimitadorTaxa(taxa_por_segundo if online else 0.0)
+    print(f"INFO: {len(validas)} relatório(s) a gerar ({'ONLINE' if online else 'OFFLINE'}, {workers} worker(s)); {ignorados} ignorado(s) por dados insuficientes.")
+
+    gerados, falhas = 0, 0
+    inicio_geracao = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="relatorio-lote") as executor:
+        futuros = {executor.submit(_gerar_um, entrada, diretorio_saida, limitador): entrada for entrada in validas}
+        for futuro in as_completed(futuros):
+            tipo, id_usuario = futuros[futuro][:2]
+            try:
+                futuro.result()
+                gerados += 1
+            except Exception as e:
+                falhas += 1
+                print(f"ERRO: Falha ao gerar o relatório de {tipo} {id_usuario}: {e}")
+            concluidos = gerados + falhas
+            if concluidos % 50 == 0 or concluidos == len(validas):
+                print(f"INFO: {concluidos}/{len(validas)} relatórios processados.")
+
+    tempo_geracao = time.perf_counter() - inicio_geracao
+    tempo_total = time.perf_counter() - inicio
+    metricas = {
+        'gerados': gerados,
+        'falhas': falhas,
+        'ignorados': ignorados,
+        'tempo_preparo_s': tempo_preparo,
+        'tempo_geracao_s': tempo_geracao,
+        'tempo_total_s': tempo_total,
+        'relatorios_por_segundo': gerados / tempo_geracao if tempo_geracao > 0 else 0.0,
+    }
+    print(
+        f"INFO: {gerados} PDF(s) em '{os.path.abspath(diretorio_saida)}' | falhas: {falhas} | "
+        f"preparo: {tempo_preparo:.2f}s | geração: {tempo_geracao:.2f}s | "
+        f"vazão: {metricas['relatorios_por_segundo']:.1f} relatórios/s"
+    )
+    return metricas
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Gera relatórios de IA em lote (PDF) para alunos, professores e administração.")
+    parser.add_argument('--tipos', nargs='+', choices=TIPOS_RELATORIO, default=list(TIPOS_RELATORIO), help="Tipos de relatório a gerar.")
+    parser.add_argument('--turmas', nargs='+', type=int, help="Restringe os relatórios de alunos aos matriculados nestas turmas (IDs).")
+    parser.add_argument('--saida', default=f"relatorios_lote_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}", help="Diretório de saída dos PDFs.")
+    parser.add_argument('--workers', type=int, default=WORKERS_PADRAO, help="Quantidade de threads de geração.")
+    parser.add_argument('--taxa', type=float, default=TAXA_PADRAO_POR_SEGUNDO, help="Máximo de requisições por segundo à API Gemini (0 = sem limite).")
+    args = parser.parse_args(argv)
+
+    gerar_relatorios_em_lote(args.tipos, args.saida, args.turmas, args.workers, args.taxa)
+
+
+if __name__ == '__main__':
+    main()
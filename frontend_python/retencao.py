@@ -0,0 +1,254 @@
+import argparse
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from visao_notas import conteiner_proprio
+
+# -----------------------------------------------------------------
+# --- VISÃO DE RETENÇÃO / EVASÃO POR SEMESTRE ---
+# -----------------------------------------------------------------
+#
+# A coorte de um semestre S é o conjunto de alunos com alguma matrícula em
+# turmas de S (turmas.csv -> Semestre). O aluno é "retido" se tiver matrícula
+# no semestre seguinte presente nos dados; caso contrário conta como evadido:
+#   taxa de evasão (S) = 1 - |coorte(S) ∩ coorte(seguinte)| / |coorte(S)|
+# Enquanto o semestre seguinte não tem nenhuma matrícula (ou não existe), S
+# ainda não tem taxa. Os dados não registram conclusão de curso: formandos
+# também contam como evadidos.
+#
+# Por turma (e por professor, somando as turmas dele) a taxa é a fração das
+# matrículas cujo aluno não aparece no semestre seguinte.
+#
+# A carga é vetorizada (merge + isin). Depois disso cada matrícula nova ajusta
+# só os contadores do aluno afetado, sem recalcular o histórico. Alterações em
+# turmas.csv (semestre/professor das turmas) exigem uma nova carga.
+# Como na visão de notas, a recarga a quente altera uma cópia (atualizada),
+# nunca a visão já publicada.
+
+COLUNAS_EVASAO_SEMESTRE = ['Semestre', 'Alunos', 'Retidos', 'Evadidos', 'Taxa_Evasao']
+COLUNAS_EVASAO_TURMA = ['ID_Turma', 'Semestre', 'ID_Professor', 'Matriculas', 'Retidos', 'Evadidos', 'Taxa_Evasao']
+COLUNAS_EVASAO_PROFESSOR = ['ID_Professor', 'Semestre', 'Turmas', 'Matriculas', 'Retidos', 'Evadidos', 'Taxa_Evasao']
+
+
+def chave_semestre(semestre: str) -> Tuple[int, int, str]:
+    """Ordem cronológica de "2025.2", "2025/2", "2025-2" ou "2025" (formatos desconhecidos vão ao final)."""
+    match = re.fullmatch(r'\s*(\d{4})\s*(?:[./-]\s*(\d{1,2}))?\s*', semestre)
+    if match is None:
+        return (10 ** 6, 0, semestre)
+    return (int(match.group(1)), int(match.group(2) or 0), semestre)
+
+
+def _taxa(total: int, retidos: int) -> float:
+    return (total - retidos) / total if total else float('nan')
+
+
+class VisaoRetencao:
+    """Coortes por semestre e contadores de retenção por semestre e por turma."""
+
+    def __init__(self):
+        self._turmas: Dict[int, Tuple[str, Optional[int]]] = {}          # ID_Turma -> (Semestre, ID_Professor)
+        self._semestres: List[str] = []                                   # Em ordem cronológica
+        self._seguinte: Dict[str, Optional[str]] = {}
+        self._anterior: Dict[str, Optional[str]] = {}
+
+        self._alunos_semestre: Dict[str, Set[int]] = {}                   # Semestre -> coorte
+        self._alunos_turma: Dict[int, Set[int]] = {}                      # ID_Turma -> {ID_Aluno}
+        self._turmas_aluno: Dict[Tuple[int, str], Set[int]] = {}          # (ID_Aluno, Semestre) -> {ID_Turma}
+
+        # Agregados mantidos incrementalmente
+        self._retidos_semestre: Dict[str, int] = {}
+        self._retidos_turma: Dict[int, int] = {}
+
+        # (atributo, chave) dos conjuntos já duplicados após uma cópia (None: nada compartilhado)
+        self._proprios: Optional[Set[Tuple[str, Any]]] = None
+
+    # --- Carga vetorizada ---
+
+    def carregar(self, df_matriculas: pd.DataFrame, df_turmas: pd.DataFrame) -> None:
+        """(Re)constrói toda a visão a partir das tabelas já tipadas."""
+        self.__init__()
+
+        turmas = df_turmas[['ID', 'Semestre', 'ID_Professor_Responsavel']].dropna(subset=['ID', 'Semestre'])
+        turmas = turmas.drop_duplicates('ID', keep='first')
+        semestres_turma = turmas['Semestre'].astype(str).str.strip()
+        professores = turmas['ID_Professor_Responsavel'].astype(object).where(turmas['ID_Professor_Responsavel'].notna(), None)
+        for id_turma, semestre, id_prof in zip(turmas['ID'].tolist(), semestres_turma.tolist(), professores.tolist()):
+            self._turmas[id_turma] = (semestre, None if id_prof is None else int(id_prof))
+        self._ordenar_semestres()
+
+        # Uma linha por matrícula válida (aluno, turma) com o semestre da turma
+        matriculas = df_matriculas[['ID_Aluno', 'ID_Turma']].dropna().drop_duplicates()
+        matriculas = matriculas[matriculas['ID_Turma'].isin(list(self._turmas))]
+        semestre = matriculas['ID_Turma'].map({id_turma: s for id_turma, (s, _) in self._turmas.items()})
+        seguinte = semestre.map(self._seguinte).fillna('')
+        coortes = pd.MultiIndex.from_arrays([matriculas['ID_Aluno'], semestre])
+        retido = pd.MultiIndex.from_arrays([matriculas['ID_Aluno'], seguinte]).isin(coortes)
+
+        for id_aluno, id_turma, sem, ret in zip(
+            matriculas['ID_Aluno'].tolist(), matriculas['ID_Turma'].tolist(), semestre.tolist(), retido.tolist()
+        ):
+            self._alunos_turma.setdefault(id_turma, set()).add(id_aluno)
+            self._turmas_aluno.setdefault((id_aluno, sem), set()).add(id_turma)
+            self._alunos_semestre.setdefault(sem, set()).add(id_aluno)
+            if ret:
+                self._retidos_turma[id_turma] = self._retidos_turma.get(id_turma, 0) + 1
+
+        por_aluno = pd.DataFrame({'ID_Aluno': matriculas['ID_Aluno'], 'Semestre': semestre, 'Retido': retido})
+        retidos = por_aluno.drop_duplicates(['ID_Aluno', 'Semestre']).groupby('Semestre')['Retido'].sum()
+        self._retidos_semestre = {sem: int(qtd) for sem, qtd in retidos.items()}
+
+    def _ordenar_semestres(self) -> None:
+        self._semestres = sorted({s for s, _ in self._turmas.values()}, key=chave_semestre)
+        self._seguinte = {s: (self._semestres[i + 1] if i + 1 < len(self._semestres) else None) for i, s in enumerate(self._semestres)}
+        self._anterior = {s: (self._semestres[i - 1] if i > 0 else None) for i, s in enumerate(self._semestres)}
+
+    # --- Atualização incremental (deltas) ---
+
+    def aplicar_matricula(self, id_aluno: int, id_turma: int) -> None:
+        """Inclui uma matrícula; ajusta a retenção do semestre dela e a do semestre anterior."""
+        turma = self._turmas.get(id_turma)
+        if turma is None:
+            return  # Turma desconhecida (ou sem semestre): fica fora da análise, como na carga
+        semestre = turma[0]
+        if id_aluno in self._alunos_turma.get(id_turma, ()):
+            return
+        conteiner_proprio(self, '_alunos_turma', id_turma, set).add(id_aluno)
+
+        seguinte, anterior = self._seguinte[semestre], self._anterior[semestre]
+        if seguinte is not None and id_aluno in self._alunos_semestre.get(seguinte, ()):
+            self._retidos_turma[id_turma] = self._retidos_turma.get(id_turma, 0) + 1
+
+        if id_aluno not in self._alunos_semestre.get(semestre, ()):
+            conteiner_proprio(self, '_alunos_semestre', semestre, set).add(id_aluno)
+            if seguinte is not None and id_aluno in self._alunos_semestre.get(seguinte, ()):
+                self._retidos_semestre[semestre] = self._retidos_semestre.get(semestre, 0) + 1
+            # O aluno passa a contar como retido no semestre anterior (e nas turmas que cursou nele)
+            if anterior is not None and id_aluno in self._alunos_semestre.get(anterior, ()):
+                self._retidos_semestre[anterior] = self._retidos_semestre.get(anterior, 0) + 1
+                for turma_anterior in self._turmas_aluno.get((id_aluno, anterior), ()):
+                    self._retidos_turma[turma_anterior] = self._retidos_turma.get(turma_anterior, 0) + 1
+
+        conteiner_proprio(self, '_turmas_aluno', (id_aluno, semestre), set).add(id_turma)
+
+    def aplicar_matriculas(self, df_matriculas: pd.DataFrame) -> None:
+        """Aplica um lote de linhas novas de matriculas.csv."""
+        for id_aluno, id_turma in zip(df_matriculas['ID_Aluno'].tolist(), df_matriculas['ID_Turma'].tolist()):
+            if not (pd.isna(id_aluno) or pd.isna(id_turma)):
+                self.aplicar_matricula(int(id_aluno), int(id_turma))
+
+    def copia(self) -> 'VisaoRetencao':
+        """Cópia rasa; alterar uma das duas não afeta a outra (ver visao_notas.conteiner_proprio)."""
+        nova = VisaoRetencao.__new__(VisaoRetencao)
+        nova._turmas = dict(self._turmas)
+        nova._semestres = list(self._semestres)
+        nova._seguinte = dict(self._seguinte)
+        nova._anterior = dict(self._anterior)
+        nova._alunos_semestre = dict(self._alunos_semestre)
+        nova._alunos_turma = dict(self._alunos_turma)
+        nova._turmas_aluno = dict(self._turmas_aluno)
+        nova._retidos_semestre = dict(self._retidos_semestre)
+        nova._retidos_turma = dict(self._retidos_turma)
+        nova._proprios = set()
+        self._proprios = set()  # Os conjuntos agora são compartilhados pelas duas
+        return nova
+
+    def atualizada(self, matriculas_novas: pd.DataFrame) -> 'VisaoRetencao':
+        """Nova visão com as matrículas acrescentadas; esta não muda (ver data_manager._aplicar_recarga)."""
+        nova = self.copia()
+        nova.aplicar_matriculas(matriculas_novas)
+        return nova
+
+    # --- Leitura ---
+
+    @property
+    def semestres(self) -> List[str]:
+        return list(self._semestres)
+
+    def _mensuravel(self, semestre: str) -> bool:
+        """O semestre seguinte existe e já tem matrículas."""
+        seguinte = self._seguinte.get(semestre)
+        return seguinte is not None and bool(self._alunos_semestre.get(seguinte))
+
+    def taxa_evasao(self, semestre: str) -> Optional[float]:
+        """Taxa de evasão da coorte do semestre (None se ainda não mensurável ou sem alunos)."""
+        total = len(self._alunos_semestre.get(semestre, ()))
+        if not total or not self._mensuravel(semestre):
+            return None
+        return _taxa(total, self._retidos_semestre.get(semestre, 0))
+
+    def ultimo_semestre_medido(self) -> Optional[str]:
+        """Semestre mais recente que já tem taxa de evasão."""
+        return next((s for s in reversed(self._semestres) if self.taxa_evasao(s) is not None), None)
+
+    def por_semestre(self) -> pd.DataFrame:
+        linhas = []
+        for semestre in self._semestres:
+            total = len(self._alunos_semestre.get(semestre, ()))
+            retidos = self._retidos_semestre.get(semestre, 0)
+            taxa = self.taxa_evasao(semestre)
+            linhas.append((semestre, total, retidos, total - retidos, float('nan') if taxa is None else taxa))
+        return pd.DataFrame(linhas, columns=COLUNAS_EVASAO_SEMESTRE)
+
+    def por_turma(self, semestre: Optional[str] = None) -> pd.DataFrame:
+        linhas = []
+        for id_turma, (sem, id_prof) in self._turmas.items():
+            if semestre is not None and sem != semestre:
+                continue
+            total = len(self._alunos_turma.get(id_turma, ()))
+            retidos = self._retidos_turma.get(id_turma, 0)
+            taxa = _taxa(total, retidos) if self._mensuravel(sem) else float('nan')
+            linhas.append((id_turma, sem, id_prof, total, retidos, total - retidos, taxa))
+        df = pd.DataFrame(linhas, columns=COLUNAS_EVASAO_TURMA)
+        ordem = df['Semestre'].map({s: i for i, s in enumerate(self._semestres)})
+        return df.assign(_ordem=ordem).sort_values(['_ordem', 'ID_Turma']).drop(columns='_ordem').reset_index(drop=True)
+
+    def por_professor(self, semestre: Optional[str] = None) -> pd.DataFrame:
+        """Matrículas das turmas de cada professor, por semestre."""
+        turmas = self.por_turma(semestre)
+        medidas = turmas[turmas['Taxa_Evasao'].notna()]
+        df = turmas.groupby(['ID_Professor', 'Semestre'], sort=False, dropna=False).agg(
+            Turmas=('ID_Turma', 'size'), Matriculas=('Matriculas', 'sum'))
+        df['Retidos'] = medidas.groupby(['ID_Professor', 'Semestre'], dropna=False)['Retidos'].sum()
+        df['Retidos'] = df['Retidos'].fillna(0).astype('int64')
+        df['Evadidos'] = df['Matriculas'] - df['Retidos']
+        df['Taxa_Evasao'] = [
+            _taxa(total, retidos) if self._mensuravel(sem) else float('nan')
+            for (_, sem), total, retidos in zip(df.index, df['Matriculas'], df['Retidos'])
+        ]
+        return df.reset_index()[COLUNAS_EVASAO_PROFESSOR]
+
+
+def construir_visao_retencao(df_matriculas: Optional[pd.DataFrame], df_turmas: Optional[pd.DataFrame]) -> VisaoRetencao:
+    """Constrói a visão a partir das tabelas de matrículas e turmas já tipadas."""
+    visao = VisaoRetencao()
+    colunas_ok = (
+        df_matriculas is not None and {'ID_Aluno', 'ID_Turma'}.issubset(df_matriculas.columns)
+        and df_turmas is not None and {'ID', 'Semestre', 'ID_Professor_Responsavel'}.issubset(df_turmas.columns)
+    )
+    if colunas_ok:
+        visao.carregar(df_matriculas, df_turmas)
+    return visao
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    # Importado aqui: o data_manager importa este módulo
+    from data_manager import get_visao_retencao
+
+    parser = argparse.ArgumentParser(description="Taxas de evasão por semestre, turma e professor.")
+    parser.add_argument('--semestre', help="Limita as quebras por turma/professor a um semestre.")
+    args = parser.parse_args(argv)
+
+    visao = get_visao_retencao()
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        for titulo, df in (("POR SEMESTRE", visao.por_semestre()), ("POR TURMA", visao.por_turma(args.semestre)),
+                           ("POR PROFESSOR", visao.por_professor(args.semestre))):
+            print(f"\n--- EVASÃO {titulo} ---")
+            print(df.to_string(index=False) if not df.empty else "Sem matrículas com semestre informado.")
+    if visao.ultimo_semestre_medido() is None:
+        print("\nINFO: Nenhum semestre tem matrículas no semestre seguinte: a evasão ainda não pode ser medida.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+import customtkinter as ctk
+import pandas as pd
+from tkinter import ttk
+from typing import Optional, Tuple, List
+
+# =================================================================
+# --- TABELA VIRTUALIZADA (ttk.Treeview + paginação) ---
+# =================================================================
+#
+# Substitui a grade de CTkLabels (um widget por célula) por um único
+# ttk.Treeview que recebe apenas as linhas da página atual. O custo de
+# desenhar a tabela depende do tamanho da página, não do DataFrame.
+# Ordenação e paginação são feitas sobre o DataFrame (sort_values / iloc).
+
+LINHAS_POR_PAGINA = 50
+MAX_COLUNAS_TABELA = 8
+
+
+class TabelaVirtual(ctk.CTkFrame):
+    """Tabela paginada e ordenável que renderiza somente as linhas visíveis."""
+
+    def __init__(self, master, df: pd.DataFrame, titulo: str,
+                 linhas_por_pagina: int = LINHAS_POR_PAGINA, max_colunas: int = MAX_COLUNAS_TABELA,
+                 cor_titulo: str = "#1F77B4", cor_texto: str = "#333333",
+                 cor_fundo: str = "#FFFFFF", cor_alternada: str = "#F5F5F5"):
+        super().__init__(master, fg_color=cor_fundo, corner_radius=10)
+        self.linhas_por_pagina = max(int(linhas_por_pagina), 1)
+        self.max_colunas = max_colunas
+        self._df_original = df
+        self._df = df
+        self._colunas: List[str] = [str(c) for c in df.columns[:max_colunas]]
+        self._pagina = 0
+        self._ordenacao: Optional[Tuple[str, bool]] = None  # (coluna, crescente)
+
+        self.grid_columnconfigure(0, weight=1)
+
+        ctk.CTkLabel(self, text=titulo, font=ctk.CTkFont(size=16, weight="bold"), text_color=cor_titulo).grid(row=0, column=0, padx=15, pady=10, sticky="w")
+
+        if df.empty:
+            ctk.CTkLabel(self, text="Nenhum dado para exibir.", text_color=cor_texto).grid(row=1, column=0, padx=15, pady=10, sticky="w")
+            self._tree = None
+            return
+
+        # Estilo próprio para não alterar outros Treeviews da aplicação
+        estilo = ttk.Style(self)
+        estilo.configure("TabelaVirtual.Treeview", background=cor_fundo, fieldbackground=cor_fundo, foreground=cor_texto, rowheight=24)
+        estilo.configure("TabelaVirtual.Treeview.Heading", background=cor_alternada, foreground=cor_texto, font=("TkDefaultFont", 10, "bold"))
+
+        area_tabela = ctk.CTkFrame(self, fg_color=cor_fundo)
+        area_tabela.grid(row=1, column=0, padx=10, pady=(0, 5), sticky="nsew")
+        area_tabela.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+
+        self._tree = ttk.Treeview(
+            area_tabela, columns=self._colunas, show="headings", style="TabelaVirtual.Treeview",
+            height=min(self.linhas_por_pagina, len(df)), selectmode="browse"
+        )
+        for coluna in self._colunas:
+            self._tree.heading(coluna, text=coluna.upper(), command=lambda c=coluna: self.ordenar_por(c))
+            self._tree.column(coluna, anchor="w", stretch=True, width=110)
+        self._tree.tag_configure("par", background=cor_fundo)
+        self._tree.tag_configure("impar", background=cor_alternada)
+        self._tree.grid(row=0, column=0, sticky="nsew")
+
+        barra = ttk.Scrollbar(area_tabela, orient="vertical", command=self._tree.yview)
+        self._tree.configure(yscrollcommand=barra.set)
+        barra.grid(row=0, column=1, sticky="ns")
+
+        # Navegação entre páginas
+        navegacao = ctk.CTkFrame(self, fg_color=cor_fundo)
+        navegacao.grid(row=2, column=0, padx=10, pady=(0, 10), sticky="ew")
+        navegacao.grid_columnconfigure(1, weight=1)
+        self._botao_anterior = ctk.CTkButton(navegacao, text="◀ Anterior", width=100, command=lambda: self.ir_para_pagina(self._pagina - 1))
+        self._botao_anterior.grid(row=0, column=0, padx=5)
+        self._rotulo_pagina = ctk.CTkLabel(navegacao, text="", text_color=cor_texto)
+        self._rotulo_pagina.grid(row=0, column=1, padx=5)
+        self._botao_proxima = ctk.CTkButton(navegacao, text="Próxima ▶", width=100, command=lambda: self.ir_para_pagina(self._pagina + 1))
+        self._botao_proxima.grid(row=0, column=2, padx=5)
+
+        self._renderizar_pagina()
+
+    # --- Paginação ---
+
+    @property
+    def total_paginas(self) -> int:
+        return max((len(self._df) + self.linhas_por_pagina - 1) // self.linhas_por_pagina, 1)
+
+    def ir_para_pagina(self, pagina: int) -> None:
+        pagina = min(max(pagina, 0), self.total_paginas - 1)
+        if pagina != self._pagina:
+            self._pagina = pagina
+            self._renderizar_pagina()
+
+    def _renderizar_pagina(self) -> None:
+        """Troca o conteúdo do Treeview pelas linhas da página atual."""
+        if self._tree is None:
+            return
+        self._tree.delete(*self._tree.get_children())
+
+        inicio = self._pagina * self.linhas_por_pagina
+        pagina = self._df.iloc[inicio:inicio + self.linhas_por_pagina, :len(self._colunas)]
+        # Conversão para texto apenas das linhas visíveis
+        for deslocamento, valores in enumerate(pagina.astype(str).itertuples(index=False, name=None)):
+            tag = "par" if (inicio + deslocamento) % 2 == 0 else "impar"
+            self._tree.insert("", "end", values=valores, tags=(tag,))
+
+        self._rotulo_pagina.configure(text=f"Página {self._pagina + 1} de {self.total_paginas} ({len(self._df)} registros)")
+        self._botao_anterior.configure(state="normal" if self._pagina > 0 else "disabled")
+        self._botao_proxima.configure(state="normal" if self._pagina < self.total_paginas - 1 else "disabled")
+
+    # --- Ordenação ---
+
+    def ordenar_por(self, coluna: str) -> None:
+        """Ordena pela coluna (clique no cabeçalho); um segundo clique inverte a ordem."""
+        crescente = self._ordenacao != (coluna, True)
+        posicao = self._colunas.index(coluna)
+        chave = self._df_original.columns[posicao]
+        try:
+            self._df = self._df_original.sort_values(chave, ascending=crescente, kind="stable", na_position="last")
+        except TypeError:
+            # Coluna com tipos misturados: ordena pelo texto exibido
+            self._df = self._df_original.sort_values(chave, ascending=crescente, kind="stable", na_position="last", key=lambda s: s.astype(str))
+        self._ordenacao = (coluna, crescente)
+
+        for c in self._colunas:
+            seta = (" ▲" if crescente else " ▼") if c == coluna else ""
+            self._tree.heading(c, text=c.upper() + seta)
+
+        self._pagina = 0
+        self._renderizar_pagina()
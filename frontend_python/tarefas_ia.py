@@ -0,0 +1,107 @@
+import itertools
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Any, Callable, Dict, List, Optional
+
+# =================================================================
+# --- EXECUÇÃO DE RELATÓRIOS DE IA EM SEGUNDO PLANO ---
+# =================================================================
+#
+# A chamada ao Gemini (ou o tempo até cair no modo offline) roda em um
+# ThreadPoolExecutor. A interface não espera: ela consulta periodicamente
+# (via after() do Tk) as tarefas finalizadas e exibe o resultado. Threads
+# bastam aqui, pois o trabalho é dominado por espera de rede.
+
+MAX_TAREFAS_SIMULTANEAS = 4
+
+ESTADO_PENDENTE = 'pendente'
+ESTADO_EXECUTANDO = 'executando'
+ESTADO_CONCLUIDA = 'concluida'
+ESTADO_FALHOU = 'falhou'
+ESTADO_CANCELADA = 'cancelada'
+
+
+class TarefaIA:
+    """Uma análise submetida ao executor, com seus metadados para a interface."""
+
+    def __init__(self, id_tarefa: int, descricao: str, future: Future, metadados: Optional[Dict[str, Any]] = None):
+        self.id = id_tarefa
+        self.descricao = descricao
+        self.future = future
+        self.metadados: Dict[str, Any] = metadados or {}
+        self.inicio = time.monotonic()
+        self.fim: Optional[float] = None
+        self._cancelada = False
+
+    @property
+    def estado(self) -> str:
+        if self._cancelada:
+            return ESTADO_CANCELADA
+        if self.future.done():
+            return ESTADO_FALHOU if self.future.exception() is not None else ESTADO_CONCLUIDA
+        return ESTADO_EXECUTANDO if self.future.running() else ESTADO_PENDENTE
+
+    @property
+    def finalizada(self) -> bool:
+        return self._cancelada or self.future.done()
+
+    @property
+    def tempo_decorrido(self) -> float:
+        return (self.fim if self.fim is not None else time.monotonic()) - self.inicio
+
+    @property
+    def resultado(self) -> Any:
+        return self.future.result() if self.estado == ESTADO_CONCLUIDA else None
+
+    @property
+    def erro(self) -> Optional[BaseException]:
+        return self.future.exception() if self.estado == ESTADO_FALHOU else None
+
+    def cancelar(self) -> None:
+        """
+        Cancela a tarefa. Se ainda estiver na fila, ela não chega a rodar;
+        se já estiver em execução, o resultado é descartado ao terminar.
+        """
+        if not self.finalizada:
+            self._cancelada = True
+            self.future.cancel()
+            self.fim = time.monotonic()
+
+
+class ExecutorTarefasIA:
+    """Fila de análises de IA executadas em threads de segundo plano."""
+
+    def __init__(self, max_tarefas: int = MAX_TAREFAS_SIMULTANEAS):
+        self._executor = ThreadPoolExecutor(max_workers=max_tarefas, thread_name_prefix="tarefa-ia")
+        self._ids = itertools.count(1)
+        self.tarefas: List[TarefaIA] = []
+        self._entregues: set = set()
+
+    def submeter(self, descricao: str, funcao: Callable[..., Any], *args,
+                 metadados: Optional[Dict[str, Any]] = None, **kwargs) -> TarefaIA:
+        """Envia `funcao(*args, **kwargs)` para uma thread e retorna a tarefa criada."""
+        future = self._executor.submit(funcao, *args, **kwargs)
+        tarefa = TarefaIA(next(self._ids), descricao, future, metadados)
+
+        def marcar_fim(_):
+            if tarefa.fim is None:
+                tarefa.fim = time.monotonic()
+        future.add_done_callback(marcar_fim)
+
+        self.tarefas.append(tarefa)
+        return tarefa
+
+    def em_andamento(self) -> List[TarefaIA]:
+        return [t for t in self.tarefas if not t.finalizada]
+
+    def coletar_finalizadas(self) -> List[TarefaIA]:
+        """Tarefas que terminaram desde a última chamada (cada uma é entregue uma única vez)."""
+        novas = [t for t in self.tarefas if t.finalizada and t.id not in self._entregues]
+        self._entregues.update(t.id for t in novas)
+        return novas
+
+    def encerrar(self) -> None:
+        """Cancela o que ainda está na fila e libera as threads sem bloquear a interface."""
+        for tarefa in self.em_andamento():
+            tarefa.cancelar()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+import data_manager
+from data_manager import ArmazenamentoCSV
+from diario_gravacoes import DiarioGravacoes
+
+CABECALHO_NOTAS = 'ID_Atividade,ID_Aluno,Nota\r\n'
+LINHAS_NOTAS = 'ID_Atividade,ID_Aluno,Nota\r\n2,2,10.00\r\n2,3,8.50\r\n'
+LOTE = {'notas': [
+    {'ID_Atividade': '1', 'ID_Aluno': '2', 'Nota': '9.00'},
+    {'ID_Atividade': '3', 'ID_Aluno': '3', 'Nota': '7.00'},
+]}
+
+
+class QuedaSimulada(Exception):
+    pass
+
+
+@pytest.fixture
+def base_dados(tmp_path, monkeypatch):
+    """Diretório de dados temporário com um notas.csv pequeno (CRLF, como o backend C grava)."""
+    (tmp_path / 'notas.csv').write_bytes(LINHAS_NOTAS.encode('utf-8'))
+    monkeypatch.setattr(data_manager, 'DIRETORIO_SCRIPT', str(tmp_path))
+    monkeypatch.setattr(data_manager, 'CAMINHO_BASE_DADOS', str(tmp_path))
+    monkeypatch.setattr(data_manager, 'DADOS_CARREGADOS', False)
+    return tmp_path
+
+
+def _linhas_csv(caminho):
+    return caminho.read_bytes().decode('utf-8').splitlines()
+
+
+def test_queda_entre_rename_e_marca_compactada_nao_duplica_linhas(base_dados):
+    caminho_diario = str(base_dados / 'diario.jsonl')
+    armazenamento = ArmazenamentoCSV(caminho_diario)
+    armazenamento.diario.registrar(LOTE)
+
+    # O CSV já foi trocado (os.replace), mas o processo cai antes da marca "compactada"
+    def queda(tabela):
+        raise QuedaSimulada(tabela)
+    armazenamento.diario.marcar_compactada = queda
+    with pytest.raises(QuedaSimulada):
+        armazenamento.compactar()
+    assert _linhas_csv(base_dados / 'notas.csv') == LINHAS_NOTAS.splitlines() + ['1,2,9.00', '3,3,7.00']
+
+    # Reinício: o diário interrompido não tem mais nada pendente para notas
+    retomado = ArmazenamentoCSV(caminho_diario)
+    assert retomado.diario.pendentes() == {}
+    retomado.compactar()
+
+    assert _linhas_csv(base_dados / 'notas.csv') == LINHAS_NOTAS.splitlines() + ['1,2,9.00', '3,3,7.00']
+    assert retomado.diario.vazio()
+
+
+def test_queda_antes_do_rename_reaplica_o_lote(base_dados, monkeypatch):
+    caminho_diario = str(base_dados / 'diario.jsonl')
+    armazenamento = ArmazenamentoCSV(caminho_diario)
+    armazenamento.diario.registrar(LOTE)
+
+    def queda(origem, destino):
+        raise QuedaSimulada(destino)
+    with monkeypatch.context() as m:
+        m.setattr(data_manager.os, 'replace', queda)
+        with pytest.raises(QuedaSimulada):
+            armazenamento.compactar()
+    assert _linhas_csv(base_dados / 'notas.csv') == LINHAS_NOTAS.splitlines()
+
+    retomado = ArmazenamentoCSV(caminho_diario)
+    assert retomado.diario.pendentes() == LOTE
+    assert retomado.compactar() == 2
+    assert _linhas_csv(base_dados / 'notas.csv') == LINHAS_NOTAS.splitlines() + ['1,2,9.00', '3,3,7.00']
+
+
+def test_ultima_linha_incompleta_do_diario_e_ignorada(tmp_path):
+    caminho = tmp_path / 'diario.jsonl'
+    diario = DiarioGravacoes(str(caminho))
+    diario.registrar(LOTE)
+
+    # Queda no meio da escrita do segundo lote: só parte da linha chegou ao disco
+    incompleta = json.dumps({'seq': 2, 'registros': {'notas': [{'ID_Atividade': '5', 'ID_Aluno': '2', 'Nota': '6.00'}]}})
+    with open(caminho, 'ab') as f:
+        f.write(incompleta[:len(incompleta) // 2].encode('utf-8'))
+
+    retomado = DiarioGravacoes(str(caminho))
+    assert retomado.pendentes() == LOTE
+
+    # O próximo lote começa em linha nova e recebe a sequência seguinte à do último lote confirmado
+    novo = {'notas': [{'ID_Atividade': '4', 'ID_Aluno': '3', 'Nota': '5.50'}]}
+    assert retomado.registrar(novo) == 2
+    assert DiarioGravacoes(str(caminho)).pendentes() == {'notas': LOTE['notas'] + novo['notas']}
@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from visao_notas import VisaoNotas
+
+# Três turmas com pesos diferentes e uma atividade repetida (vale a última linha)
+ATIVIDADES = pd.DataFrame({
+    'ID': [1, 2, 3, 4, 5, 6, 2],
+    'ID_Turma': [10, 10, 20, 20, 30, 30, 10],
+    'Peso': [1.0, 2.0, 0.5, 1.5, 3.0, 1.0, 4.0],
+})
+ALUNOS = list(range(1, 13))
+
+
+def _df_notas(notas):
+    return pd.DataFrame(
+        [(id_ativ, id_aluno, nota) for (id_ativ, id_aluno), nota in notas.items()],
+        columns=['ID_Atividade', 'ID_Aluno', 'Nota'],
+    ).astype({'ID_Atividade': 'int64', 'ID_Aluno': 'int64', 'Nota': 'float64'})
+
+
+def _medias_ordenadas(visao):
+    ids_alunos, ids_turmas, medias = visao.medias_em_arrays()
+    ordem = np.lexsort((ids_turmas, ids_alunos))
+    return ids_alunos[ordem], ids_turmas[ordem], medias[ordem]
+
+
+def _assert_visoes_iguais(incremental, reconstruida):
+    alunos_i, turmas_i, medias_i = _medias_ordenadas(incremental)
+    alunos_r, turmas_r, medias_r = _medias_ordenadas(reconstruida)
+    np.testing.assert_array_equal(alunos_i, alunos_r)
+    np.testing.assert_array_equal(turmas_i, turmas_r)
+    np.testing.assert_allclose(medias_i, medias_r, rtol=1e-12, atol=1e-12)
+
+    ids_turmas = sorted(set(ATIVIDADES['ID_Turma']))
+    for grupo in [[id_turma] for id_turma in ids_turmas] + [ids_turmas, ids_turmas[:2]]:
+        assert incremental.estatisticas_turmas(grupo) == pytest.approx(reconstruida.estatisticas_turmas(grupo), rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_lancamentos_incrementais_equivalem_a_recarga_completa(semente):
+    aleatorio = random.Random(semente)
+    notas = {(1, 1): 7.0, (3, 2): 5.5}
+    visao = VisaoNotas()
+    visao.carregar(_df_notas(notas), ATIVIDADES)
+
+    for passo in range(400):
+        chave = (aleatorio.choice(ATIVIDADES['ID'].tolist()), aleatorio.choice(ALUNOS))
+        if notas and aleatorio.random() < 0.3:
+            # Remove uma nota existente (às vezes a última de um aluno na turma)
+            chave = aleatorio.choice(sorted(notas))
+            visao.remover_nota(*chave)
+            del notas[chave]
+        else:
+            nota = round(aleatorio.uniform(0, 10), 2)
+            visao.aplicar_nota(*chave, nota)
+            notas[chave] = nota
+
+        if passo % 50 == 49:
+            reconstruida = VisaoNotas()
+            reconstruida.carregar(_df_notas(notas), ATIVIDADES)
+            _assert_visoes_iguais(visao, reconstruida)
+
+    # Remove tudo: a visão incremental tem de ficar igual a uma visão sem notas
+    for chave in list(notas):
+        visao.remover_nota(*chave)
+        del notas[chave]
+    vazia = VisaoNotas()
+    vazia.carregar(_df_notas(notas), ATIVIDADES)
+    _assert_visoes_iguais(visao, vazia)
+    assert visao.estatisticas_turmas([10, 20, 30]) == (0.0, 0.0, 0)
@@ -0,0 +1,420 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Optional, Dict, Tuple, Iterable, List, Set
+
+# -----------------------------------------------------------------
+# --- VISÃO MATERIALIZADA DE MÉDIAS PONDERADAS ---
+# -----------------------------------------------------------------
+#
+# Fórmula única usada por todo o sistema:
+#   média (aluno, turma) = Σ(Nota × Peso) / ΣPeso   (apenas atividades com nota lançada)
+#   média da turma       = média simples das médias dos alunos da turma
+#   desvio da turma      = desvio padrão amostral (ddof=1) das médias dos alunos
+#
+# Quando os pesos de uma turma somam 100 a fórmula coincide com Σ(Nota × Peso / 100).
+#
+# A carga inicial é vetorizada (merge + groupby). Depois disso a visão é mantida
+# de forma incremental: cada nota/atividade incluída, alterada ou removida ajusta
+# apenas as somas do par (aluno, turma) afetado e a variância da turma (Welford),
+# sem recalcular o restante dos dados.
+#
+# Uma visão já publicada (data_manager.VISAO_NOTAS) não é alterada: a recarga a
+# quente aplica os deltas em uma cópia (atualizada) e troca a referência junto
+# com as tabelas, então quem lê a visão antiga sem a trava continua consistente.
+# A cópia é rasa; cada lista/conjunto/dicionário interno só é duplicado na
+# primeira vez em que a cópia o altera (conteiner_proprio).
+
+COLUNAS_ALUNO_TURMA = ['ID_Aluno', 'ID_Turma', 'Soma_Ponderada', 'Soma_Pesos', 'Qtd_Notas', 'Media']
+COLUNAS_TURMA = ['ID_Turma', 'Media', 'Desvio_Padrao', 'Qtd_Alunos']
+
+
+def _valor(nota) -> float:
+    """Notas/pesos ausentes contam como 0 (mesma regra da carga vetorizada)."""
+    return 0.0 if pd.isna(nota) else float(nota)
+
+
+def _notas_com_peso(df_notas: pd.DataFrame, df_atividades: pd.DataFrame) -> pd.DataFrame:
+    """Cruza as notas com a turma e o peso de cada atividade (uma linha por nota válida)."""
+    notas = notas_efetivas(df_notas)
+    atividades = _atividades_efetivas(df_atividades).rename(columns={'ID': 'ID_Atividade'})
+    df = notas.merge(atividades, on='ID_Atividade', how='inner')
+    df['Nota'] = df['Nota'].fillna(0.0)
+    df['Peso'] = df['Peso'].fillna(0.0)
+    return df
+
+
+def _atividades_efetivas(df_atividades: pd.DataFrame) -> pd.DataFrame:
+    # ID repetido em atividades.csv: vale a última linha (como em sincronizar/aplicar_atividade)
+    return df_atividades[['ID', 'ID_Turma', 'Peso']].drop_duplicates('ID', keep='last')
+
+
+def notas_efetivas(df_notas: pd.DataFrame) -> pd.DataFrame:
+    """Uma linha (ID_Atividade, ID_Aluno, Nota) por par atividade/aluno."""
+    # O backend C acrescenta uma nova linha a cada lançamento: vale a nota mais recente
+    return df_notas[['ID_Atividade', 'ID_Aluno', 'Nota']].drop_duplicates(['ID_Atividade', 'ID_Aluno'], keep='last')
+
+
+def conteiner_proprio(visao: Any, atributo: str, chave: Any, novo: Callable[[], Any]) -> Any:
+    """
+    Contêiner `visao.<atributo>[chave]` que só esta visão referencia, pronto para ser
+    alterado. Depois de uma cópia rasa, o compartilhado é duplicado no primeiro uso.
+    visao._proprios é None quando nada é compartilhado (visão construída do zero).
+    """
+    tabela = getattr(visao, atributo)
+    atual = tabela.get(chave)
+    if atual is not None and (visao._proprios is None or (atributo, chave) in visao._proprios):
+        return atual
+    atual = tabela[chave] = novo() if atual is None else copy.copy(atual)
+    if visao._proprios is not None:
+        visao._proprios.add((atributo, chave))
+    return atual
+
+
+def somar_por_aluno_turma(df_notas_peso: pd.DataFrame) -> pd.DataFrame:
+    """Agrupa notas já cruzadas com o peso em Σ(Nota×Peso), ΣPeso e quantidade por (aluno, turma)."""
+    return (
+        df_notas_peso.assign(Soma_Ponderada=df_notas_peso['Nota'] * df_notas_peso['Peso'])
+        .groupby(['ID_Aluno', 'ID_Turma'], sort=False)
+        .agg(Soma_Ponderada=('Soma_Ponderada', 'sum'), Soma_Pesos=('Peso', 'sum'), Qtd_Notas=('Nota', 'size'))
+        .reset_index()
+    )
+
+
+class VisaoNotas:
+    """
+    Médias ponderadas por (aluno, turma) e estatísticas por turma.
+    Calculadas em uma passagem vetorizada na carga e atualizadas em O(1)
+    a cada nota lançada. Todas as telas e o módulo de IA leem daqui.
+    """
+
+    def __init__(self):
+        # Tabelas de origem, no formato mínimo necessário para calcular deltas
+        self._atividades: Dict[int, Tuple[int, float]] = {}         # ID_Atividade -> (ID_Turma, Peso)
+        self._qtd_atividades_turma: Dict[int, int] = {}              # ID_Turma -> nº de atividades
+        self._notas: Dict[Tuple[int, int], float] = {}               # (ID_Atividade, ID_Aluno) -> Nota
+        self._alunos_por_atividade: Dict[int, Set[int]] = {}         # ID_Atividade -> {ID_Aluno}
+
+        # Agregados mantidos incrementalmente
+        self._somas: Dict[Tuple[int, int], List[float]] = {}         # (ID_Aluno, ID_Turma) -> [Σ(N×P), ΣP, qtd]
+        self._medias_por_aluno: Dict[int, Dict[int, float]] = {}     # ID_Aluno -> {ID_Turma: média}
+        self._estatisticas_turma: Dict[int, List[float]] = {}        # ID_Turma -> [n, média, M2] (Welford)
+
+        # (atributo, chave) dos contêineres internos já duplicados após uma cópia (None: nada compartilhado)
+        self._proprios: Optional[Set[Tuple[str, Any]]] = None
+
+    # --- Carga vetorizada ---
+
+    def carregar(self, df_notas: pd.DataFrame, df_atividades: pd.DataFrame) -> None:
+        """(Re)constrói toda a visão a partir das tabelas já tipadas."""
+        self.__init__()
+
+        atividades = _atividades_efetivas(df_atividades)
+        pesos = atividades['Peso'].fillna(0.0).astype('float64')
+        for id_ativ, id_turma, peso in zip(atividades['ID'].tolist(), atividades['ID_Turma'].tolist(), pesos.tolist()):
+            self._registrar_atividade(id_ativ, id_turma, peso)
+
+        notas = notas_efetivas(df_notas)
+        valores = notas['Nota'].fillna(0.0).astype('float64')
+        for id_ativ, id_aluno, nota in zip(notas['ID_Atividade'].tolist(), notas['ID_Aluno'].tolist(), valores.tolist()):
+            self._notas[(id_ativ, id_aluno)] = nota
+            self._alunos_por_atividade.setdefault(id_ativ, set()).add(id_aluno)
+
+        somas = somar_por_aluno_turma(_notas_com_peso(df_notas, df_atividades))
+        pesos_somados = somas['Soma_Pesos'].astype('float64')
+        somas['Media'] = (somas['Soma_Ponderada'].astype('float64') / pesos_somados.where(pesos_somados > 0)).fillna(0.0)
+
+        for id_aluno, id_turma, soma_pond, soma_pesos, qtd, media in zip(
+            somas['ID_Aluno'].tolist(), somas['ID_Turma'].tolist(), somas['Soma_Ponderada'].tolist(),
+            somas['Soma_Pesos'].tolist(), somas['Qtd_Notas'].tolist(), somas['Media'].tolist()
+        ):
+            self._somas[(id_aluno, id_turma)] = [soma_pond, soma_pesos, qtd]
+            self._medias_por_aluno.setdefault(id_aluno, {})[id_turma] = media
+
+        agrupado = somas.groupby('ID_Turma', sort=False)['Media']
+        qtd_turma, media_turma, var_turma = agrupado.size(), agrupado.mean(), agrupado.var().fillna(0.0)
+        for id_turma in qtd_turma.index.tolist():
+            n = int(qtd_turma[id_turma])
+            self._estatisticas_turma[id_turma] = [n, float(media_turma[id_turma]), float(var_turma[id_turma]) * (n - 1)]
+
+    # --- Atualização incremental (deltas) ---
+
+    def copia(self) -> 'VisaoNotas':
+        """Cópia rasa; alterar uma das duas não afeta a outra (ver conteiner_proprio)."""
+        nova = VisaoNotas.__new__(VisaoNotas)
+        nova._atividades = dict(self._atividades)
+        nova._qtd_atividades_turma = dict(self._qtd_atividades_turma)
+        nova._notas = dict(self._notas)
+        nova._alunos_por_atividade = dict(self._alunos_por_atividade)
+        nova._somas = dict(self._somas)
+        nova._medias_por_aluno = dict(self._medias_por_aluno)
+        nova._estatisticas_turma = dict(self._estatisticas_turma)
+        nova._proprios = set()
+        self._proprios = set()  # Os contêineres internos agora são compartilhados pelas duas
+        return nova
+
+    def atualizada(self, notas_substituidas: Optional[pd.DataFrame] = None, atividades_substituidas: Optional[pd.DataFrame] = None,
+                   atividades_novas: Optional[pd.DataFrame] = None, notas_novas: Optional[pd.DataFrame] = None) -> 'VisaoNotas':
+        """
+        Nova visão com os deltas de uma recarga aplicados; esta não muda.
+        Tabelas substituídas são sincronizadas; linhas acrescentadas são aplicadas em ordem.
+        """
+        nova = self.copia()
+        if notas_substituidas is not None or atividades_substituidas is not None:
+            nova.sincronizar(notas_substituidas, atividades_substituidas)
+        if atividades_novas is not None and atividades_substituidas is None:
+            for id_ativ, id_turma, peso in zip(atividades_novas['ID'].tolist(), atividades_novas['ID_Turma'].tolist(), atividades_novas['Peso'].tolist()):
+                nova.aplicar_atividade(id_ativ, id_turma, peso)
+        if notas_novas is not None and notas_substituidas is None:
+            nova.aplicar_notas(notas_novas)
+        return nova
+
+    def aplicar_nota(self, id_atividade: int, id_aluno: int, nota) -> None:
+        """Inclui ou altera a nota de um aluno em uma atividade (a mais recente prevalece)."""
+        nota = _valor(nota)
+        chave = (id_atividade, id_aluno)
+        antiga = self._notas.get(chave)
+        if antiga == nota:
+            return
+
+        atividade = self._atividades.get(id_atividade)
+        if atividade is not None:
+            id_turma, peso = atividade
+            if antiga is None:
+                self._somar(id_aluno, id_turma, nota * peso, peso, 1)
+            else:
+                self._somar(id_aluno, id_turma, (nota - antiga) * peso, 0.0, 0)
+
+        self._notas[chave] = nota
+        conteiner_proprio(self, '_alunos_por_atividade', id_atividade, set).add(id_aluno)
+
+    def remover_nota(self, id_atividade: int, id_aluno: int) -> None:
+        """Remove a nota de um aluno em uma atividade."""
+        nota = self._notas.pop((id_atividade, id_aluno), None)
+        if nota is None:
+            return
+
+        if id_atividade in self._alunos_por_atividade:
+            alunos = conteiner_proprio(self, '_alunos_por_atividade', id_atividade, set)
+            alunos.discard(id_aluno)
+            if not alunos:
+                del self._alunos_por_atividade[id_atividade]
+
+        atividade = self._atividades.get(id_atividade)
+        if atividade is not None:
+            id_turma, peso = atividade
+            self._somar(id_aluno, id_turma, -nota * peso, -peso, -1)
+
+    def aplicar_notas(self, df_notas: pd.DataFrame) -> None:
+        """Aplica, na ordem do arquivo, um lote de linhas novas de notas.csv."""
+        valores = df_notas['Nota'].tolist()
+        for id_ativ, id_aluno, nota in zip(df_notas['ID_Atividade'].tolist(), df_notas['ID_Aluno'].tolist(), valores):
+            self.aplicar_nota(id_ativ, id_aluno, nota)
+
+    def aplicar_atividade(self, id_atividade: int, id_turma: int, peso) -> None:
+        """
+        Inclui ou altera uma atividade. Mudar o peso ou a turma reajusta
+        apenas as notas dessa atividade.
+        """
+        peso = _valor(peso)
+        if self._atividades.get(id_atividade) == (id_turma, peso):
+            return
+        self.remover_atividade(id_atividade)
+        self._registrar_atividade(id_atividade, id_turma, peso)
+        for id_aluno in self._alunos_por_atividade.get(id_atividade, ()):
+            nota = self._notas[(id_atividade, id_aluno)]
+            self._somar(id_aluno, id_turma, nota * peso, peso, 1)
+
+    def remover_atividade(self, id_atividade: int) -> None:
+        """Remove uma atividade; suas notas deixam de contar, mas ficam guardadas."""
+        atividade = self._atividades.pop(id_atividade, None)
+        if atividade is None:
+            return
+        id_turma, peso = atividade
+
+        restantes = self._qtd_atividades_turma.get(id_turma, 0) - 1
+        if restantes > 0:
+            self._qtd_atividades_turma[id_turma] = restantes
+        else:
+            self._qtd_atividades_turma.pop(id_turma, None)
+
+        for id_aluno in self._alunos_por_atividade.get(id_atividade, ()):
+            nota = self._notas[(id_atividade, id_aluno)]
+            self._somar(id_aluno, id_turma, -nota * peso, -peso, -1)
+
+    def sincronizar(self, df_notas: Optional[pd.DataFrame] = None, df_atividades: Optional[pd.DataFrame] = None) -> int:
+        """
+        Compara as tabelas recebidas com o estado atual e aplica somente
+        as diferenças (inclusões, alterações e remoções).
+        Retorna a quantidade de deltas aplicados.
+        """
+        deltas = 0
+
+        # Atividades primeiro: mudanças de peso usam as notas já conhecidas
+        if df_atividades is not None:
+            novas = {
+                id_ativ: (id_turma, _valor(peso))
+                for id_ativ, id_turma, peso in zip(df_atividades['ID'].tolist(), df_atividades['ID_Turma'].tolist(), df_atividades['Peso'].tolist())
+            }
+            for id_ativ in [a for a in self._atividades if a not in novas]:
+                self.remover_atividade(id_ativ)
+                deltas += 1
+            for id_ativ, (id_turma, peso) in novas.items():
+                if self._atividades.get(id_ativ) != (id_turma, peso):
+                    self.aplicar_atividade(id_ativ, id_turma, peso)
+                    deltas += 1
+
+        if df_notas is not None:
+            notas = notas_efetivas(df_notas)
+            novas = {
+                (id_ativ, id_aluno): _valor(nota)
+                for id_ativ, id_aluno, nota in zip(notas['ID_Atividade'].tolist(), notas['ID_Aluno'].tolist(), notas['Nota'].tolist())
+            }
+            for chave in [c for c in self._notas if c not in novas]:
+                self.remover_nota(*chave)
+                deltas += 1
+            for chave, nota in novas.items():
+                if self._notas.get(chave) != nota:
+                    self.aplicar_nota(chave[0], chave[1], nota)
+                    deltas += 1
+
+        return deltas
+
+    def _registrar_atividade(self, id_atividade: int, id_turma: int, peso: float) -> None:
+        self._atividades[id_atividade] = (id_turma, peso)
+        self._qtd_atividades_turma[id_turma] = self._qtd_atividades_turma.get(id_turma, 0) + 1
+
+    def _somar(self, id_aluno: int, id_turma: int, delta_ponderado: float, delta_peso: float, delta_qtd: int) -> None:
+        """Ajusta as somas de (aluno, turma) e propaga a nova média para a turma."""
+        chave = (id_aluno, id_turma)
+        media_antiga = self.media(id_aluno, id_turma)
+
+        somas = conteiner_proprio(self, '_somas', chave, lambda: [0.0, 0.0, 0])
+        somas[0] += delta_ponderado
+        somas[1] += delta_peso
+        somas[2] += delta_qtd
+
+        if somas[2] <= 0:
+            del self._somas[chave]
+            if id_aluno in self._medias_por_aluno:
+                medias = conteiner_proprio(self, '_medias_por_aluno', id_aluno, dict)
+                medias.pop(id_turma, None)
+                if not medias:
+                    del self._medias_por_aluno[id_aluno]
+            media_nova = None
+        else:
+            media_nova = somas[0] / somas[1] if somas[1] > 0 else 0.0
+            conteiner_proprio(self, '_medias_por_aluno', id_aluno, dict)[id_turma] = media_nova
+
+        if media_antiga is not None:
+            self._retirar_da_turma(id_turma, media_antiga)
+        if media_nova is not None:
+            self._incluir_na_turma(id_turma, media_nova)
+
+    def _incluir_na_turma(self, id_turma: int, x: float) -> None:
+        # Algoritmo de Welford: média e M2 atualizados em O(1)
+        estat = conteiner_proprio(self, '_estatisticas_turma', id_turma, lambda: [0, 0.0, 0.0])
+        estat[0] += 1
+        delta = x - estat[1]
+        estat[1] += delta / estat[0]
+        estat[2] += delta * (x - estat[1])
+
+    def _retirar_da_turma(self, id_turma: int, x: float) -> None:
+        # Welford invertido: desfaz a inclusão de x
+        if id_turma not in self._estatisticas_turma:
+            return
+        estat = conteiner_proprio(self, '_estatisticas_turma', id_turma, lambda: [0, 0.0, 0.0])
+        if estat[0] <= 1:
+            del self._estatisticas_turma[id_turma]
+            return
+        media_antiga = estat[1]
+        estat[0] -= 1
+        estat[1] = (media_antiga * (estat[0] + 1) - x) / estat[0]
+        estat[2] = max(estat[2] - (x - media_antiga) * (x - estat[1]), 0.0)
+
+    # --- Leitura ---
+
+    @property
+    def alunos_turmas(self) -> pd.DataFrame:
+        """Somas e média de cada par (aluno, turma) como DataFrame."""
+        linhas = [
+            (id_aluno, id_turma, s[0], s[1], s[2], self._medias_por_aluno[id_aluno][id_turma])
+            for (id_aluno, id_turma), s in self._somas.items()
+        ]
+        return pd.DataFrame(linhas, columns=COLUNAS_ALUNO_TURMA)
+
+    def medias_em_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ID_Aluno, ID_Turma, Média) de todos os pares como arrays NumPy, sem montar DataFrame."""
+        qtd = len(self._somas)
+        ids_alunos = np.fromiter((id_aluno for id_aluno, _ in self._somas), dtype=np.int64, count=qtd)
+        ids_turmas = np.fromiter((id_turma for _, id_turma in self._somas), dtype=np.int64, count=qtd)
+        medias = np.fromiter(
+            (self._medias_por_aluno[id_aluno][id_turma] for id_aluno, id_turma in self._somas), dtype=np.float64, count=qtd
+        )
+        return ids_alunos, ids_turmas, medias
+
+    @property
+    def turmas(self) -> pd.DataFrame:
+        """Média, desvio padrão e quantidade de alunos com nota de cada turma."""
+        linhas = [(id_turma,) + self.estatisticas_turma(id_turma) for id_turma in self._estatisticas_turma]
+        return pd.DataFrame(linhas, columns=COLUNAS_TURMA)
+
+    @property
+    def ids_turmas_com_atividades(self) -> Set[int]:
+        return set(self._qtd_atividades_turma)
+
+    def medias_do_aluno(self, id_aluno: Optional[int]) -> Dict[int, float]:
+        """Retorna {ID_Turma: média ponderada} das turmas em que o aluno tem nota."""
+        return dict(self._medias_por_aluno.get(id_aluno, {}))
+
+    def media(self, id_aluno: Optional[int], id_turma: Optional[int]) -> Optional[float]:
+        """Média ponderada do aluno na turma, ou None se não houver nota lançada."""
+        return self._medias_por_aluno.get(id_aluno, {}).get(id_turma)
+
+    def turma_tem_atividades(self, id_turma: Optional[int]) -> bool:
+        return id_turma in self._qtd_atividades_turma
+
+    def estatisticas_turma(self, id_turma: Optional[int]) -> Tuple[float, float, int]:
+        """Retorna (média, desvio padrão, quantidade de alunos com nota) da turma."""
+        estat = self._estatisticas_turma.get(id_turma)
+        if estat is None:
+            return 0.0, 0.0, 0
+        n, media, m2 = estat
+        desvio = (m2 / (n - 1)) ** 0.5 if n > 1 else 0.0
+        return media, desvio, int(n)
+
+    def estatisticas_turmas(self, ids_turmas: Iterable[int]) -> Tuple[float, float, int]:
+        """
+        Combina as estatísticas de várias turmas (ex: todas as de um professor)
+        como se fossem uma única população de médias de alunos.
+        """
+        total, media_total, m2_total = 0, 0.0, 0.0
+        for id_turma in ids_turmas:
+            estat = self._estatisticas_turma.get(id_turma)
+            if estat is None:
+                continue
+            qtd, media, m2 = estat
+            # Combinação de médias e variâncias de duas populações (Chan et al.)
+            delta = media - media_total
+            novo_total = total + qtd
+            media_total += delta * qtd / novo_total
+            m2_total += m2 + delta ** 2 * total * qtd / novo_total
+            total = novo_total
+
+        if total == 0:
+            return 0.0, 0.0, 0
+        desvio_total = (m2_total / (total - 1)) ** 0.5 if total > 1 else 0.0
+        return media_total, desvio_total, int(total)
+
+
+def construir_visao_notas(df_notas: Optional[pd.DataFrame], df_atividades: Optional[pd.DataFrame]) -> VisaoNotas:
+    """Constrói a visão a partir das tabelas de notas e atividades já tipadas."""
+    visao = VisaoNotas()
+    colunas_ok = (
+        df_notas is not None and {'ID_Atividade', 'ID_Aluno', 'Nota'}.issubset(df_notas.columns)
+        and df_atividades is not None and {'ID', 'ID_Turma', 'Peso'}.issubset(df_atividades.columns)
+    )
+    if colunas_ok:
+        visao.carregar(df_notas, df_atividades)
+    return visao